@@ -0,0 +1,20 @@
+"""python -m medinote 진입점 (저장소 최상위에서 실행할 때)
+
+medinote.py를 바로 실행한 것과 같게 동작하도록 이 폴더를 import 경로에 넣고, 데이터 파일
+(medications.xlsx, my_medications.* 등)이 있는 이 폴더로 옮겨 간 뒤 medinote.py의 main()을 부른다.
+명령줄에서 준 상대 경로(--catalog, --db, --sink log:경로)는 실행한 위치 기준으로 바꾼다.
+
+    python -m medinote daemon
+"""
+import os
+import runpy
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+invoked_from = os.getcwd()
+sys.path.insert(0, APP_DIR)
+os.chdir(APP_DIR)
+# 모듈 이름 medinote는 이 패키지가 쓰고 있으므로 다른 이름으로 읽는다
+app = runpy.run_path(os.path.join(APP_DIR, 'medinote.py'), run_name='medinote_app')
+app['main'](invoked_from=invoked_from)
@@ -0,0 +1,130 @@
+"""복용 기록(확인/미루기/놓침) 로그
+
+기록은 고정 길이 바이너리 레코드로 시간 순서대로 덧붙인다. 기간은 예정 복용 시각으로 조회한다
+(23:50 알림을 다음 날 확인해도 예정일의 기록). 기록 시각은 예정 시각보다 이르지 않으므로
+기록 시각 컬럼에서 이분 탐색으로 시작 위치를 찾고 그 뒤만 훑는다.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from storage import atomic_write
+
+
+TAKEN = 1
+SNOOZED = 2
+MISSED = 3
+
+EVENT_NAMES = {TAKEN: '복용', SNOOZED: '미룸', MISSED: '놓침'}
+
+RECORD_DTYPE = np.dtype([
+    ('time', '<i8'),   # 기록 시각 (unix seconds)
+    ('due', '<i8'),    # 예정 복용 시각 (unix seconds)
+    ('med', '<i4'),    # 약물 번호 (names 목록의 위치)
+    ('event', 'i1'),
+])
+
+
+def to_timestamp(value):
+    return int(value.timestamp())
+
+
+class AdherenceLog:
+    def __init__(self, base_path='adherence'):
+        self.log_path = base_path + '.log'
+        self.names_path = base_path + '_meds.json'
+        self.lock = threading.Lock()
+
+        self.truncate_partial()
+        self.names = []
+        if os.path.exists(self.names_path):
+            with open(self.names_path, 'r', encoding='utf-8') as f:
+                self.names = json.load(f)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def truncate_partial(self):
+        """기록 도중 종료되어 잘린 마지막 레코드를 잘라 낸다 (남겨 두면 뒤에 붙는 레코드가 모두 밀린다)"""
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return
+        if size % RECORD_DTYPE.itemsize:
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(size - size % RECORD_DTYPE.itemsize)
+
+    def medication_id(self, product_name):
+        med_id = self.ids.get(product_name)
+        if med_id is None:
+            med_id = len(self.names)
+            self.names.append(product_name)
+            self.ids[product_name] = med_id
+            atomic_write(self.names_path,
+                         lambda f: json.dump(self.names, f, ensure_ascii=False))
+        return med_id
+
+    def record(self, product_name, event, due_at, at=None):
+        at = at or datetime.now()
+        with self.lock:
+            record = np.array([(to_timestamp(at), to_timestamp(due_at),
+                                self.medication_id(product_name), event)],
+                              dtype=RECORD_DTYPE)
+            # 기록 시각이 예정 시각보다 이르지 않고, 시계가 되돌아간 경우에도
+            # 시각 컬럼이 정렬된 상태를 유지하도록 보정 (records()가 이 두 가지에 기댄다)
+            last = self.last_time()
+            record['time'][0] = max(record['time'][0], record['due'][0],
+                                    last if last is not None else record['time'][0])
+            with open(self.log_path, 'ab') as f:
+                f.write(record.tobytes())
+
+    def last_time(self):
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return None
+        if size < RECORD_DTYPE.itemsize:
+            return None
+        with open(self.log_path, 'rb') as f:
+            f.seek(size - size % RECORD_DTYPE.itemsize - RECORD_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(RECORD_DTYPE.itemsize), dtype=RECORD_DTYPE)['time'][0])
+
+    def all_records(self):
+        try:
+            count = os.path.getsize(self.log_path) // RECORD_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.log_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def records(self, start, end):
+        """start <= 예정 복용 시각 < end 인 레코드
+
+        예정 시각이 start 이후인 기록은 기록 시각도 start 이후이므로 그 앞은 건너뛴다.
+        """
+        records = self.all_records()
+        lo = np.searchsorted(records['time'], to_timestamp(start), side='left')
+        tail = records[lo:]
+        due = tail['due']
+        return tail[(due >= to_timestamp(start)) & (due < to_timestamp(end))]
+
+    def summary(self, start, end):
+        """예정 복용 시각이 기간 안인 약물별 {'taken', 'snoozed', 'missed', 'rate'} (rate = 복용 / (복용 + 놓침))"""
+        records = self.records(start, end)
+        size = len(self.names)
+        counts = {event: np.bincount(records['med'][records['event'] == event], minlength=size)
+                  for event in (TAKEN, SNOOZED, MISSED)}
+
+        result = {}
+        for med_id in np.flatnonzero(counts[TAKEN] + counts[SNOOZED] + counts[MISSED]):
+            taken = int(counts[TAKEN][med_id])
+            missed = int(counts[MISSED][med_id])
+            result[self.names[med_id]] = {
+                'taken': taken,
+                'snoozed': int(counts[SNOOZED][med_id]),
+                'missed': missed,
+                'rate': taken / (taken + missed) if taken + missed else None,
+            }
+        return result
@@ -0,0 +1,326 @@
+"""성능 측정 스크립트 (화면 없이 실행, 결과는 JSON)
+
+    python benchmark.py suite --output bench.json
+    python benchmark.py suite --scales 1000x10,10000x100
+    python benchmark.py memory --rows 100000
+
+suite는 규모별로 합성 medications.xlsx/my_medications.xlsx를 임시 디렉터리에 만들고
+프로그램과 같은 코드 경로(카탈로그 로드, 검색어 한 글자마다의 검색, 변경 저장, 알림 확인)를 잰다.
+시간은 밀리초, 같은 작업을 여러 번 잰 최소/중앙값/최대값이다.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from catalog_cache import load_catalog
+from column_store import RESIDENT_COLUMNS
+from fuzzy import FuzzyIndex
+from medication_table import CONDITIONS, MedicationTable, compact_catalog
+from profiles import DEFAULT_PROFILE
+from schedule_view import ScheduleView
+from scheduler import DoseScheduler
+from storage import JournalStore
+
+
+DEFAULT_SCALES = '1000x10,10000x100,100000x1000'
+# 알림 확인은 하루치(1분 간격) 틱을 돌린다
+TICKS = 24 * 60
+
+
+USER_COLUMNS = ['Product Name', 'Company Name', 'Main Ingredient', 'Effectiveness',
+                'How to Take It', 'Notification Time', 'Notifications_Enabled',
+                'Taking_Condition', 'Recurrence']
+
+INGREDIENTS = ['아세트아미노펜', '이부프로펜', '나프록센', '아스피린', '카페인무수물', '클로르페니라민말레산염',
+               '슈도에페드린염산염', '덱스트로메토르판', '구아이페네신', '시메티콘', '판크레아틴',
+               '비스무트', '로페라미드', '마그네슘', '비타민C', '비타민B1', '니코틴산아미드', '아연']
+SYMPTOMS = ['두통', '치통', '생리통', '발열', '감기', '콧물', '기침', '소화불량', '설사', '변비',
+            '근육통', '관절통', '피로', '위산과다', '알레르기성 비염']
+FORMS = ['정', '캡슐', '연질캡슐', '시럽', '과립', '액']
+
+
+def synthetic_catalog(rows, seed=0):
+    """medications.xlsx와 같은 컬럼 구성의 합성 카탈로그 (제조사/성분/효능은 반복이 많다)"""
+    rng = random.Random(seed)
+    companies = [f'합성제약{i:03d}(주)' for i in range(max(8, rows // 200))]
+    mixes = [','.join(rng.sample(INGREDIENTS, rng.randint(1, 4))) for _ in range(max(20, rows // 3))]
+    uses = [f"이 약은 {', '.join(rng.sample(SYMPTOMS, rng.randint(1, 4)))}에 사용합니다."
+            for _ in range(max(20, rows // 3))]
+    records = []
+    for i in range(rows):
+        mix = rng.choice(mixes)
+        records.append({
+            'Product Name': f'{mix.split(",")[0][:4]}{i}{rng.choice(FORMS)}',
+            'Company Name': rng.choice(companies),
+            'Main Ingredient': mix,
+            'Effectiveness': rng.choice(uses),
+            'How to Take It': f'성인 1회 {rng.randint(1, 3)}정, 1일 {rng.randint(1, 3)}회 복용합니다.',
+            'Precautions': '복용 전 의사 또는 약사와 상의하십시오. ' * rng.randint(1, 5),
+            'Warnings': '정해진 용법과 용량을 지키십시오.',
+            'Medications to Avoid': f'{rng.choice(INGREDIENTS)}을 포함한 다른 약과 함께 복용하지 마십시오.',
+            'Major Side Effects': '발진, 구역, 구토, 어지러움이 나타날 수 있습니다.',
+            'Storage Instructions': '실온에서 보관하십시오.',
+        })
+    return pd.DataFrame(records)
+
+
+def synthetic_medications(catalog, count, seed=0, columns=None):
+    """my_medications 형식의 합성 복용 약물 레코드: 카탈로그 행(columns만) + 하루 1~3회 복용 시각"""
+    rng = random.Random(seed)
+    sample = catalog.sample(n=min(count, len(catalog)), random_state=seed)
+    if columns is not None:
+        sample = sample[[column for column in columns if column in sample]]
+    records = sample.to_dict('records')
+    for record in records:
+        record['Notification Time'] = ', '.join(
+            f'{minute // 60:02d}:{minute % 60:02d}'
+            for minute in sorted(rng.sample(range(0, 24 * 60, 5), rng.randint(1, 3))))
+        record['Notifications_Enabled'] = rng.random() > 0.1
+        record['Taking_Condition'] = rng.choice(CONDITIONS)
+        record['Recurrence'] = None
+    return records
+
+
+def catalog_columns(frame):
+    return list(frame.columns) + ['Notification Time', 'Notifications_Enabled',
+                                  'Taking_Condition', 'Recurrence']
+
+
+def write_fixtures(directory, rows, meds, seed=0):
+    catalog = synthetic_catalog(rows, seed)
+    catalog_path = os.path.join(directory, 'medications.xlsx')
+    user_path = os.path.join(directory, 'my_medications.xlsx')
+    catalog.to_excel(catalog_path, index=False)
+    pd.DataFrame(synthetic_medications(catalog, meds, seed)).to_excel(user_path, index=False)
+    # 같은 --keep 디렉터리로 다시 돌릴 때 지난 실행의 스냅샷/저널 대신 새 엑셀을 읽게 한다
+    for name in ('my_medications.snapshot.json', 'my_medications.journal'):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+    return catalog_path, user_path
+
+
+def timings(samples):
+    """초 단위 측정값 목록 -> 밀리초 요약"""
+    samples = [sample * 1000 for sample in samples]
+    return {'runs': len(samples),
+            'min_ms': round(min(samples), 3),
+            'median_ms': round(statistics.median(samples), 3),
+            'max_ms': round(max(samples), 3)}
+
+
+def measure(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return timings(samples)
+
+
+def keystroke_queries(catalog, count, seed=0):
+    """실제로 입력하는 것처럼 제품명/성분명 앞부분을 한 글자씩 늘린 검색어 목록"""
+    rng = random.Random(seed)
+    words = ([name[:6] for name in rng.sample(list(catalog['Product Name']), count)]
+             + rng.sample(INGREDIENTS, min(count, len(INGREDIENTS))))
+    return [word[:length] for word in words for length in range(1, len(word) + 1)]
+
+
+def bench_load(catalog_path):
+    """__init__의 카탈로그 로드: 캐시 없이(xlsx 파싱 + 색인 생성) / 캐시가 있을 때"""
+    def cold():
+        load_catalog(catalog_path, rebuild=True)
+
+    result = {'cold': measure(cold, 1), 'warm': measure(lambda: load_catalog(catalog_path), 5)}
+    catalog = load_catalog(catalog_path)
+    result['resident_mb'] = megabytes(catalog.frame)
+    return result, catalog
+
+
+def bench_search(catalog, queries):
+    """검색어 한 글자마다: 색인 검색 + 결과 목록에 넣을 행 읽기 (SearchController.run과 같은 순서)"""
+    fuzzy = catalog.fuzzy or FuzzyIndex.build(catalog.frame)
+    columns = ['Product Name', 'Main Ingredient', 'Effectiveness']
+
+    def run(index):
+        samples, hits = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            doc_ids = index.search(query)
+            rows = list(catalog.frame.loc[doc_ids, columns].itertuples(index=False, name=None))
+            samples.append(time.perf_counter() - started)
+            hits += len(rows)
+        result = timings(samples)
+        result['mean_results'] = round(hits / len(queries), 1)
+        return result
+
+    return {'keystrokes': len(queries), 'substring': run(catalog.index), 'fuzzy': run(fuzzy)}
+
+
+def bench_persistence(directory, user_path, columns, repeat=50):
+    """약 정보 한 건 변경 저장: 저널 한 줄 추가 / 예전처럼 표 전체를 to_excel로 다시 쓰기"""
+    store = JournalStore(os.path.join(directory, 'my_medications'), legacy_xlsx=user_path)
+    frame = store.load(columns)
+    names = list(frame['Product Name'])
+    rng = random.Random(0)
+    try:
+        journal = measure(lambda: store.update(rng.choice(names),
+                                               {'Notification Time': '08:00'}), repeat)
+        excel_path = os.path.join(directory, 'export.xlsx')
+        excel = measure(lambda: frame.to_excel(excel_path, index=False), 3)
+    finally:
+        store.close()
+    return {'medications': len(names), 'journal_update': journal, 'to_excel': excel}
+
+
+def bench_notifications(user_path, columns, ticks=TICKS):
+    """check_notifications 한 번: 도래한 알림 꺼내기 + 약 정보 찾기 (하루치 1분 간격 틱)"""
+    table = MedicationTable.from_frame(pd.read_excel(user_path), columns)
+    view = ScheduleView.from_frame(table.frame)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    scheduler = DoseScheduler()
+
+    started = time.perf_counter()
+    # 프로그램과 같이 (프로필 id, 약물명)을 키로 쓴다
+    scheduler.load(((DEFAULT_PROFILE, name), recurrence, fire_at)
+                   for name, recurrence, fire_at in view.scheduler_entries(start))
+    load_seconds = time.perf_counter() - started
+
+    samples, fired = [], 0
+    for tick in range(ticks):
+        now = start + timedelta(minutes=tick)
+        started = time.perf_counter()
+        due = scheduler.pop_due(now)
+        for (_, product_name), _ in due:
+            rows = table.rows_of(product_name)
+            if len(rows):
+                table.row(rows[0])
+        samples.append(time.perf_counter() - started)
+        fired += len(due)
+    result = timings(samples)
+    result.update({'medications': len(table), 'reminders': fired,
+                   'scheduler_load_ms': round(load_seconds * 1000, 3)})
+    return result
+
+
+def parse_scales(text):
+    """'1000x10,10000x100' -> [(카탈로그 행 수, 복용 약물 수), ...]"""
+    scales = []
+    for item in text.split(','):
+        rows, _, meds = item.strip().partition('x')
+        scales.append((int(rows), int(meds or 10)))
+    return scales
+
+
+def bench_suite(scales, seed=0, keep=None):
+    results = []
+    for rows, meds in scales:
+        if keep is None:
+            directory = tempfile.mkdtemp(prefix='medinote-bench-')
+        else:
+            # 규모마다 따로 둔다: 앞 규모의 스냅샷이 남아 있으면 그 복용 약물 목록을 읽게 된다
+            directory = os.path.join(keep, f'{rows}x{meds}')
+            os.makedirs(directory, exist_ok=True)
+        try:
+            catalog_path, user_path = write_fixtures(directory, rows, meds, seed)
+            load, catalog = bench_load(catalog_path)
+            columns = catalog_columns(synthetic_catalog(1, seed))
+            results.append({
+                'catalog_rows': rows,
+                'medications': meds,
+                'catalog_load': load,
+                'search': bench_search(catalog, keystroke_queries(catalog.frame, 5, seed)),
+                'persistence': bench_persistence(directory, user_path, columns),
+                'notifications': bench_notifications(user_path, columns),
+            })
+            catalog.details.close()
+        finally:
+            if keep is None:
+                shutil.rmtree(directory, ignore_errors=True)
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def megabytes(frame):
+    return round(frame.memory_usage(deep=True).sum() / 1e6, 3)
+
+
+def bench_memory(rows, meds, seed=0):
+    """카탈로그 좁은 컬럼과 복용 약물 표의 메모리, 약 추가 시간 (pd.concat vs 버퍼 추가)"""
+    catalog = synthetic_catalog(rows, seed)[RESIDENT_COLUMNS]
+    plain = catalog.astype(object)
+    compact = compact_catalog(catalog)
+
+    records = synthetic_medications(synthetic_catalog(max(rows, meds), seed), meds, seed, USER_COLUMNS)
+    started = time.perf_counter()
+    frame = pd.DataFrame(columns=USER_COLUMNS)
+    for record in records:
+        frame = pd.concat([frame, pd.DataFrame([record])], ignore_index=True)
+    concat_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    table = MedicationTable(USER_COLUMNS)
+    for record in records:
+        table.append(record)
+        table.row(len(table) - 1)  # 화면은 추가한 행의 배너를 그린다
+    append_seconds = time.perf_counter() - started
+
+    return {
+        'catalog_rows': rows,
+        'catalog_object_mb': megabytes(plain),
+        'catalog_typed_mb': megabytes(compact),
+        'catalog_dtypes': {column: str(dtype) for column, dtype in compact.dtypes.items()},
+        'medications': meds,
+        'medications_object_mb': megabytes(frame.astype(object)),
+        'medications_typed_mb': megabytes(table.frame),
+        'add_concat_seconds': round(concat_seconds, 4),
+        'add_append_seconds': round(append_seconds, 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medinote 성능 측정")
+    commands = parser.add_subparsers(dest='command', required=True)
+    suite = commands.add_parser('suite', help="규모별 카탈로그 로드/검색/저장/알림 확인 시간")
+    suite.add_argument('--scales', default=DEFAULT_SCALES,
+                       help=f"카탈로그 행 수x복용 약물 수, 쉼표로 구분 (기본값: {DEFAULT_SCALES})")
+    suite.add_argument('--output', help="결과 JSON 파일 (기본값: 표준 출력)")
+    suite.add_argument('--keep', help="합성 파일을 지우지 않고 남길 디렉터리")
+    suite.add_argument('--seed', type=int, default=0)
+    memory = commands.add_parser('memory', help="타입을 정한 표의 메모리/추가 시간")
+    memory.add_argument('--rows', type=int, default=100000, help="합성 카탈로그 행 수")
+    memory.add_argument('--meds', type=int, default=1000, help="추가할 복용 약물 수")
+    memory.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'suite':
+        result = bench_suite(parse_scales(args.scales), args.seed, args.keep)
+    else:
+        result = bench_memory(args.rows, args.meds, args.seed)
+
+    if getattr(args, 'output', None):
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""medications.xlsx(또는 csv)를 한 번 변환해 두는 바이너리(pickle) 캐시"""
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import namedtuple
+
+import pandas as pd
+
+from catalog_import import import_catalog
+from column_store import heavy_path_for, remove_stale_heavy
+from search_index import file_signature
+
+
+CACHE_VERSION = 8
+
+# frame: 검색/목록용 좁은 컬럼 (반복이 많은 컬럼은 범주형), details: 긴 텍스트 컬럼 (행 id로 필요할 때 읽음)
+Catalog = namedtuple('Catalog', ['frame', 'index', 'interactions', 'fuzzy', 'details'])
+
+
+def cache_path_for(path):
+    root, _ = os.path.splitext(path)
+    return root + '.cache.pkl'
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_cache(cache_path, version=CACHE_VERSION):
+    try:
+        with open(cache_path, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != version:
+        return None
+    return data
+
+
+def write_cache(cache_path, data):
+    """임시 파일에 쓴 뒤 rename 해서 중간에 끊겨도 깨진 캐시가 남지 않게 한다"""
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.catalog-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_catalog(path='medications.xlsx', cache_path=None, progress=None, rebuild=False):
+    """카탈로그(Catalog: 좁은 컬럼 DataFrame, 검색/상호작용/오타 허용 색인, 긴 텍스트 저장소)를 반환한다.
+
+    원본 파일의 (mtime, size)가 캐시와 같으면 캐시를 그대로 쓰고, mtime만 바뀌었으면
+    내용 해시로 한 번 더 확인한다. 원본이 실제로 바뀐 경우에만 xlsx를 다시 읽고, 이때 제품의
+    doc id는 이전 캐시와 같게 유지한다.
+    원본(xlsx 또는 csv)은 catalog_import로 조금씩 읽고, progress(읽은 행 수, 전체 행 수 또는 None)로
+    진행 상황을 알린다. rebuild=True이면 캐시를 무시하고 다시 읽는다. 원본이 없으면 FileNotFoundError.
+    """
+    signature = file_signature(path)
+    if signature is None:
+        raise FileNotFoundError(path)
+
+    cache_path = cache_path or cache_path_for(path)
+    cached = None if rebuild else read_cache(cache_path)
+
+    # 이전 캐시: 원본이 바뀌었어도 바뀌지 않은 행의 doc id와 색인 값은 다시 쓴다
+    previous = cached
+    if cached is not None and not cached['details'].is_valid():
+        cached = None  # 긴 텍스트 파일이 없거나 캐시와 맞지 않음
+
+    if cached is not None:
+        if cached['signature'] == signature:
+            return catalog_from(cached)
+
+        digest = file_digest(path)
+        if cached['digest'] == digest:
+            # 내용은 같고 mtime만 바뀜 (복사, touch 등)
+            cached['signature'] = cached['index'].signature = signature
+            write_cache(cache_path, cached)
+            return catalog_from(cached)
+    else:
+        digest = file_digest(path)
+
+    # 긴 텍스트 파일은 내용마다 이름을 달리해, 이전 파일을 메모리 맵으로 읽는 중에도 새로 쓸 수 있게 한다
+    imported = import_catalog(path, heavy_path_for(cache_path, digest), signature, progress, previous)
+    data = {
+        'version': CACHE_VERSION,
+        'signature': signature,
+        'digest': digest,
+        'frame': imported.frame,
+        'index': imported.index,
+        'interactions': imported.interactions,
+        'fuzzy': imported.fuzzy,
+        'details': imported.details,
+        'hashes': imported.hashes,
+    }
+    write_cache(cache_path, data)
+    remove_stale_heavy(cache_path, imported.details.path)
+    return catalog_from(data)
+
+
+def catalog_from(data):
+    return Catalog(data['frame'], data['index'], data['interactions'], data['fuzzy'],
+                   data['details'])
+
+
+def full_frame(catalog):
+    """좁은 컬럼과 긴 텍스트 컬럼을 합친 전체 카탈로그 (SQLite로 옮길 때처럼 모든 값이 필요할 때)"""
+    details = catalog.details.frame(catalog.details.columns)
+    return pd.concat([catalog.frame, details], axis=1)
@@ -0,0 +1,201 @@
+"""큰 카탈로그(xlsx/csv)를 조금씩 읽어 캐시를 만드는 가져오기
+
+xlsx는 openpyxl 읽기 전용 모드로, csv는 csv 모듈로 CHUNK_ROWS행씩 읽는다. 긴 텍스트 컬럼은
+읽는 대로 메모리 맵 파일에 쓰고 검색 색인도 그때그때 채우므로, 메모리에 남는 것은 좁은
+컬럼과 색인뿐이다. 약물명은 정규화하고 같은 제품이 다시 나오면 처음 행만 남긴다.
+
+이전 캐시가 있으면 약물명이 같은 제품은 같은 doc id를 받고, 행 해시가 같은 행은 검색/상호작용
+색인을 다시 계산하지 않고 이전 값을 쓴다 (원본이 조금 바뀌었을 때 다시 읽는 비용을 줄인다).
+"""
+import csv
+import hashlib
+import itertools
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from column_store import HEAVY_COLUMNS, RESIDENT_COLUMNS, HeavyColumnStore
+from fuzzy import FuzzyIndex
+from interactions import InteractionIndex
+from medication_table import compact_catalog
+from search_index import SEARCH_FIELDS, SearchIndex, product_key
+
+
+CHUNK_ROWS = 2000
+
+
+# catalog_cache.Catalog의 필드 + hashes: frame 행 순서의 행 해시 (int64)
+ImportResult = namedtuple('ImportResult', ['frame', 'index', 'interactions', 'fuzzy', 'details', 'hashes'])
+
+
+def clean_name(value):
+    """약물명 원문 정리: NFC 조합형, 앞뒤/연속 공백 제거 (값이 없으면 None)"""
+    if value is None or value != value:
+        return None
+    name = ' '.join(unicodedata.normalize('NFC', str(value)).split())
+    return name or None
+
+
+def row_hash(values):
+    """행 값 tuple의 64비트 해시 (다시 읽었을 때 바뀐 행을 찾는 용도)"""
+    digest = hashlib.blake2b(repr(values).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def previous_rows(previous):
+    """이전 캐시 -> ({약물명 키: (doc id, 행 해시)}, 다음에 쓸 doc id)"""
+    if previous is None:
+        return {}, 0
+    frame = previous['frame']
+    rows = {product_key(name): (doc_id, row_hash)
+            for name, doc_id, row_hash in zip(frame['Product Name'], frame.index.tolist(),
+                                               previous['hashes'].tolist())}
+    return rows, (int(frame.index.max()) + 1 if len(frame) else 0)
+
+
+def read_source(path):
+    """(헤더를 뺀 행 수 또는 None, 행 반복자); 반복자의 첫 행은 헤더"""
+    if path.lower().endswith('.csv'):
+        return None, csv_rows(path)
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    sheet = workbook.active
+    total = sheet.max_row - 1 if sheet.max_row else None
+    return total, sheet_rows(workbook, sheet)
+
+
+def csv_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.reader(f):
+            yield [value if value != '' else None for value in row]
+
+
+def sheet_rows(workbook, sheet):
+    try:
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def import_catalog(path, heavy_path, signature=None, progress=None, previous=None):
+    """카탈로그 파일을 읽어 ImportResult를 만든다 (긴 텍스트는 heavy_path에 쓴다)
+
+    progress(읽은 행 수, 전체 행 수 또는 None)는 CHUNK_ROWS행마다, 그리고 마지막에 한 번 호출된다.
+    previous는 이전 캐시(dict); 주어지면 바뀌지 않은 행의 doc id와 색인 값을 그대로 쓴다.
+    """
+    total, rows = read_source(path)
+    header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+    positions = {name: number for number, name in enumerate(header) if name}
+    resident = [column for column in RESIDENT_COLUMNS if column in positions]
+    heavy = [column for column in HEAVY_COLUMNS if column in positions]
+
+    values = {column: [] for column in resident}
+    shared = {column: {} for column in resident if column != 'Product Name'}
+    known, next_id = previous_rows(previous)
+    old_texts = previous['index'].texts if previous is not None else {}
+    doc_ids, hashes, texts = [], [], {}
+    changed = set()  # 새로 생겼거나 내용이 바뀐 doc id
+    index = SearchIndex()
+    postings = {}
+    seen = set()
+    counts = {'read': 0, 'next_id': next_id}
+
+    def cell(row, column):
+        number = positions.get(column)
+        value = row[number] if number is not None and number < len(row) else None
+        if column == 'Product Name':
+            return clean_name(value)
+        if value is None or isinstance(value, str):
+            return value
+        return str(value)
+
+    def kept_rows():
+        # 긴 텍스트 저장소가 소비하는 행 반복자: 좁은 컬럼과 검색 색인은 여기서 같이 채운다
+        while True:
+            chunk = list(itertools.islice(rows, CHUNK_ROWS))
+            if not chunk:
+                break
+            for row in chunk:
+                name = cell(row, 'Product Name')
+                if name is None:
+                    continue
+                key = product_key(name)
+                if key in seen:
+                    continue
+                seen.add(key)
+                record = {}
+                for column in resident:
+                    # 반복되는 값(제조사, 성분 등)은 처음 나온 문자열 하나를 같이 쓴다
+                    value = cell(row, column)
+                    if column in shared:
+                        value = shared[column].setdefault(value, value)
+                    record[column] = value
+                    values[column].append(value)
+                heavy_values = tuple(cell(row, column) for column in heavy)
+
+                row_id = row_hash(tuple(record.values()) + heavy_values)
+                doc_id, old_hash = known.get(key, (None, None))
+                if doc_id is None:
+                    doc_id = counts['next_id']
+                    counts['next_id'] += 1
+                doc_ids.append(doc_id)
+                hashes.append(row_id)
+                if old_hash == row_id:
+                    texts[doc_id] = old_texts[doc_id]
+                else:
+                    changed.add(doc_id)
+                    index.add(doc_id, [record.get(field) for field in SEARCH_FIELDS], postings)
+                    texts[doc_id] = index.texts[doc_id]
+                yield doc_id, heavy_values
+            counts['read'] += len(chunk)
+            if progress is not None:
+                progress(counts['read'], total)
+
+    try:
+        details = HeavyColumnStore.write_rows(heavy_path, heavy, kept_rows())
+    finally:
+        rows.close()
+    frame = pd.DataFrame(values, columns=resident, index=pd.Index(doc_ids, dtype=np.int64))
+    if progress is not None:
+        progress(counts['read'], counts['read'])
+
+    if previous is None:
+        index.pack(postings, signature)
+    else:
+        # 없어졌거나 바뀐 문서만 빼고 바뀐/새 문서를 더한다
+        stale = (set(known_id for known_id, _ in known.values()) - set(doc_ids)) | changed
+        index = previous['index'].updated(texts, stale, postings, signature)
+
+    ingredients = frame['Main Ingredient'] if 'Main Ingredient' in frame else [None] * len(frame)
+    interactions = InteractionIndex()
+    interactions.learn(ingredients)
+    # 성분 어휘가 바뀌면 성분 번호가 달라지므로 모든 제품을 다시 계산한다
+    old = previous['interactions'] if previous is not None else None
+    if old is not None and old.vocabulary != interactions.vocabulary:
+        old = None
+    avoid_column = (details.columns.index('Medications to Avoid')
+                    if 'Medications to Avoid' in details.columns else None)
+    for position, (doc_id, main_ingredient) in enumerate(zip(doc_ids, ingredients)):
+        if old is not None and doc_id not in changed:
+            interactions.set_product(doc_id, old.product_ingredients.get(doc_id, ()),
+                                     old.product_avoids.get(doc_id, ()))
+        else:
+            avoid_text = details.cell(position, avoid_column) if avoid_column is not None else None
+            interactions.add_product(doc_id, main_ingredient, avoid_text)
+    interactions.link(doc_ids)
+    details.close()
+
+    # 제품명과 순서가 그대로면 오타 허용 색인도 그대로 쓴다
+    fuzzy = None
+    if previous is not None and previous['fuzzy'] is not None:
+        old_frame = previous['frame']
+        if (old_frame.index.tolist() == doc_ids
+                and old_frame['Product Name'].tolist() == values.get('Product Name')):
+            fuzzy = previous['fuzzy']
+    if fuzzy is None:
+        fuzzy = FuzzyIndex.build(frame)
+
+    return ImportResult(compact_catalog(frame), index, interactions, fuzzy, details,
+                        np.array(hashes, dtype=np.int64))
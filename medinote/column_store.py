@@ -0,0 +1,128 @@
+"""카탈로그의 긴 텍스트 컬럼을 메모리 밖에 두는 저장소
+
+검색/목록에 쓰는 좁은 컬럼만 DataFrame으로 들고 있고, 복용 방법/주의사항/경고 같은 긴 텍스트는
+UTF-8로 이어 붙인 파일 하나에 쓴 뒤 메모리 맵으로 열어 행 id로 필요한 칸만 읽는다.
+"""
+import glob
+import mmap
+import os
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from storage import atomic_write
+
+
+# 검색 결과/색인에 쓰여 항상 메모리에 두는 컬럼
+RESIDENT_COLUMNS = ['Product Name', 'Company Name', 'Main Ingredient', 'Effectiveness']
+# 약을 추가하거나 선별 결과를 다시 만들 때만 읽는 컬럼
+HEAVY_COLUMNS = ['How to Take It', 'Precautions', 'Warnings', 'Medications to Avoid',
+                 'Major Side Effects', 'Storage Instructions']
+
+
+def heavy_path_for(cache_path, digest=None):
+    root, _ = os.path.splitext(cache_path)
+    return root + (f'.{digest[:12]}' if digest else '') + '.heavy.bin'
+
+
+def remove_stale_heavy(cache_path, keep):
+    """이전 원본으로 만든 긴 텍스트 파일을 지운다 (아직 열려 있어 지울 수 없으면 다음에 지운다)"""
+    root = glob.escape(os.path.splitext(cache_path)[0])
+    for path in glob.glob(root + '.heavy.bin') + glob.glob(root + '.*.heavy.bin'):
+        if os.path.abspath(path) != os.path.abspath(keep):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class HeavyColumnStore:
+    """(행, 컬럼) 칸마다 텍스트 파일 안의 [시작, 끝) 오프셋을 들고 있다 (값이 없으면 missing)"""
+
+    def __init__(self, path, columns, index, offsets, missing):
+        self.path = path
+        self.columns = list(columns)
+        self.index = index  # doc id -> 행 위치
+        self.offsets = offsets  # int64, 길이 = 칸 수 + 1
+        self.missing = missing  # bool, 길이 = 칸 수
+        self.data = None
+
+    @classmethod
+    def write_rows(cls, path, columns, rows):
+        """rows = (doc id, columns 순서의 값 tuple) 반복자; 읽는 대로 파일에 써서 텍스트를 메모리에 모으지 않는다
+
+        None/NaN은 값 없음으로, 문자열이 아닌 값(숫자, 날짜 등)은 str()로 바꿔 쓴다.
+        """
+        doc_ids, sizes, missing = [], array('q'), array('b')
+
+        def write(f):
+            for doc_id, values in rows:
+                doc_ids.append(doc_id)
+                for value in values:
+                    if isinstance(value, str) or not (value is None or pd.isna(value)):
+                        encoded = str(value).encode('utf-8')
+                        f.write(encoded)
+                        sizes.append(len(encoded))
+                        missing.append(False)
+                    else:
+                        sizes.append(0)
+                        missing.append(True)
+
+        atomic_write(path, write, mode='wb')
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(sizes, dtype=np.int64), out=offsets[1:])
+        return cls(path, columns, pd.Index(doc_ids), offsets,
+                   np.frombuffer(missing, dtype=np.int8).astype(bool))
+
+    @classmethod
+    def empty(cls, columns=HEAVY_COLUMNS):
+        return cls(None, columns, pd.Index([]), np.zeros(1, dtype=np.int64),
+                   np.zeros(0, dtype=bool))
+
+    def __getstate__(self):
+        # 캐시에는 오프셋만 저장하고, 메모리 맵은 다시 열 때 만든다
+        state = dict(self.__dict__)
+        state['data'] = None
+        return state
+
+    def is_valid(self):
+        """텍스트 파일이 오프셋과 맞는지 (지워졌거나 다른 버전이면 False)"""
+        try:
+            return os.path.getsize(self.path) == int(self.offsets[-1])
+        except OSError:
+            return False
+
+    def open(self):
+        if self.data is None:
+            if self.offsets[-1] == 0:
+                self.data = b''
+            else:
+                with open(self.path, 'rb') as f:
+                    self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.data
+
+    def cell(self, position, column_number):
+        slot = position * len(self.columns) + column_number
+        if self.missing[slot]:
+            return None
+        data = self.open()
+        return data[self.offsets[slot]:self.offsets[slot + 1]].decode('utf-8')
+
+    def fetch(self, doc_id):
+        """한 행의 긴 텍스트 컬럼 {컬럼: 값}"""
+        position = self.index.get_loc(doc_id)
+        return {column: self.cell(position, number) for number, column in enumerate(self.columns)}
+
+    def frame(self, columns):
+        """카탈로그 전체의 지정한 컬럼 (선별/상호작용 색인을 다시 만들 때만 쓴다)"""
+        rows = range(len(self.index))
+        data = {column: ([self.cell(position, self.columns.index(column)) for position in rows]
+                         if column in self.columns else [None] * len(rows))
+                for column in columns}
+        return pd.DataFrame(data, index=self.index, columns=list(columns))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = None
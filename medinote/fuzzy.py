@@ -0,0 +1,200 @@
+"""오타/띄어쓰기/초성 검색을 허용하는 제품명 검색
+
+한글은 자모로 풀어서 비교한다 ('타이래놀' -> 'ㅌㅏㅇㅣㄹㅐㄴㅗㄹ'). 자모 3-gram 색인으로 후보를
+먼저 추리고(q-gram 필터), 후보들만 '검색어와 제품명 일부 사이의 편집 거리'를 배열 연산으로
+한꺼번에 계산해 거리 -> 일치 위치 -> 이름 길이 순으로 정렬한다.
+초성만 입력하면('ㅌㅇㄹㄴ') 제품명의 초성 문자열에서 찾는다.
+"""
+import numpy as np
+
+from search_index import SearchCancelled, normalize_text
+
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+CHOSEONG_SET = frozenset(CHOSEONG)
+
+GRAM_SIZE = 3
+
+
+def compact(text):
+    """정규화 후 공백 제거 (띄어쓰기 차이를 무시)"""
+    return ''.join(normalize_text(text).split())
+
+
+def decompose(text):
+    """한글 음절을 초성/중성/종성 자모로 푼 문자열"""
+    letters = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            offset = code - HANGUL_BASE
+            letters.append(CHOSEONG[offset // 588])
+            letters.append(JUNGSEONG[offset % 588 // 28])
+            letters.append(JONGSEONG[offset % 28])
+        else:
+            letters.append(char)
+    return ''.join(letters)
+
+
+def initials(text):
+    """한글 음절은 초성만, 나머지 문자는 그대로"""
+    letters = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            letters.append(CHOSEONG[(code - HANGUL_BASE) // 588])
+        else:
+            letters.append(char)
+    return ''.join(letters)
+
+
+def max_distance(length):
+    """검색어 자모 길이에 따라 허용하는 편집 횟수"""
+    return min(3, max(1, length // 4))
+
+
+class FuzzyIndex:
+    MAX_CANDIDATES = 1500
+    BATCH_SIZE = 500
+    RESULT_LIMIT = 200
+
+    def __init__(self):
+        self.doc_ids = np.empty(0, dtype=np.int64)
+        self.initials = []  # 행 -> 초성 문자열
+        self.codes = np.empty(0, dtype=np.int32)  # 모든 제품명의 자모 코드를 이어 붙인 배열
+        self.offsets = np.zeros(1, dtype=np.int64)  # 행 i의 자모: codes[offsets[i]:offsets[i + 1]]
+        self.grams = {}  # 자모 3-gram -> posting 번호
+        self.posting_bounds = np.zeros(1, dtype=np.int64)
+        self.posting_data = np.empty(0, dtype=np.int32)  # 행 번호
+
+    @classmethod
+    def build(cls, frame):
+        index = cls()
+        names = frame['Product Name'] if 'Product Name' in frame else []
+        index.doc_ids = np.asarray(frame.index, dtype=np.int64)
+
+        jamo_names = []
+        postings = {}
+        for row, name in enumerate(names):
+            name = compact(name)
+            index.initials.append(initials(name))
+            jamo = decompose(name)
+            jamo_names.append(jamo)
+            for gram in {jamo[i:i + GRAM_SIZE] for i in range(len(jamo) - GRAM_SIZE + 1)}:
+                postings.setdefault(gram, []).append(row)
+
+        lengths = np.fromiter((len(jamo) for jamo in jamo_names), dtype=np.int64,
+                              count=len(jamo_names))
+        index.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        index.codes = np.frombuffer(''.join(jamo_names).encode('utf-32-le'), dtype=np.int32).copy()
+
+        sizes = []
+        for slot, (gram, rows) in enumerate(postings.items()):
+            index.grams[gram] = slot
+            sizes.append(len(rows))
+        index.posting_bounds = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        index.posting_data = np.fromiter((row for rows in postings.values() for row in rows),
+                                         dtype=np.int32, count=int(index.posting_bounds[-1]))
+        return index
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def search(self, query, cancelled=None):
+        """관련도 순으로 정렬한 doc id 목록 (최대 RESULT_LIMIT개)"""
+        query = compact(query)
+        if not query:
+            return list(self.doc_ids[:self.RESULT_LIMIT])
+        if all(char in CHOSEONG_SET for char in query):
+            return self.search_initials(query)
+
+        jamo = decompose(query)
+        limit = max_distance(len(jamo))
+        candidates = self.candidates(jamo, limit)
+
+        scored = []
+        for start in range(0, len(candidates), self.BATCH_SIZE):
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+            rows = candidates[start:start + self.BATCH_SIZE]
+            distance, position = self.substring_distance(jamo, rows)
+            keep = distance <= limit
+            scored.append((distance[keep], position[keep], rows[keep]))
+        if not scored:
+            return []
+
+        distance, position, rows = (np.concatenate(parts) for parts in zip(*scored))
+        lengths = self.offsets[rows + 1] - self.offsets[rows]
+        order = np.lexsort((lengths, position, distance))[:self.RESULT_LIMIT]
+        return list(self.doc_ids[rows[order]])
+
+    def search_initials(self, query):
+        found = []
+        for row, text in enumerate(self.initials):
+            position = text.find(query)
+            if position >= 0:
+                found.append((position, len(text), row))
+        found.sort()
+        return [self.doc_ids[row] for _, _, row in found[:self.RESULT_LIMIT]]
+
+    def candidates(self, jamo, limit):
+        """공유하는 자모 3-gram이 많은 행부터 최대 MAX_CANDIDATES개"""
+        slots = [self.grams[gram] for gram in {jamo[i:i + GRAM_SIZE]
+                                               for i in range(len(jamo) - GRAM_SIZE + 1)}
+                 if gram in self.grams]
+        if not slots:
+            # 검색어가 짧으면 3-gram이 없다 -> 전체가 후보 (짧은 이름부터)
+            rows = np.arange(len(self.doc_ids), dtype=np.int32)
+            lengths = self.offsets[1:] - self.offsets[:-1]
+            return rows[np.argsort(lengths, kind='stable')][:self.MAX_CANDIDATES]
+
+        hits = np.concatenate([self.posting_data[self.posting_bounds[slot]:self.posting_bounds[slot + 1]]
+                               for slot in slots])
+        counts = np.bincount(hits, minlength=len(self.doc_ids))
+        # q-gram 보조정리: 편집 limit번 안쪽이면 최소 이만큼의 3-gram을 공유한다
+        needed = max(1, len(jamo) - GRAM_SIZE + 1 - GRAM_SIZE * limit)
+        rows = np.flatnonzero(counts >= needed).astype(np.int32)
+        if len(rows) > self.MAX_CANDIDATES:
+            best = np.argpartition(-counts[rows], self.MAX_CANDIDATES)[:self.MAX_CANDIDATES]
+            rows = rows[best]
+        return rows
+
+    def substring_distance(self, jamo, rows):
+        """행마다 (검색어와 가장 가까운 이름 일부와의 편집 거리, 그 부분이 끝나는 위치)
+
+        이름의 어느 위치에서 시작해도 되는 편집 거리(Sellers)를 후보 전체에 대해 열 단위로 계산한다.
+        """
+        query = np.frombuffer(jamo.encode('utf-32-le'), dtype=np.int32)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        width = int(lengths.max()) if len(rows) else 0
+        columns = np.arange(width)
+        inside = columns[None, :] < lengths[:, None]
+        text = np.where(inside,
+                        self.codes[np.minimum(starts[:, None] + columns[None, :], len(self.codes) - 1)],
+                        -1)
+
+        m = len(query)
+        steps = np.arange(m + 1)
+        # previous[:, i] = 검색어 앞 i글자를 지금까지 본 이름의 어느 부분과 맞출 때의 최소 편집 수
+        previous = np.broadcast_to(steps, (len(rows), m + 1)).copy()
+        best = previous[:, m].copy()
+        best_at = np.zeros(len(rows), dtype=np.int64)
+        for column in range(width):
+            mismatch = (query[None, :] != text[:, column, None]).astype(np.int64)
+            current = np.empty_like(previous)
+            current[:, 0] = 0
+            current[:, 1:] = np.minimum(previous[:, :-1] + mismatch, previous[:, 1:] + 1)
+            # 같은 열 안에서 위쪽 칸 + 1 (삽입): 누적 최소로 한 번에 처리
+            current = np.minimum.accumulate(current - steps, axis=1) + steps
+            valid = inside[:, column]
+            improved = valid & (current[:, m] < best)
+            best = np.where(improved, current[:, m], best)
+            best_at = np.where(improved, column, best_at)
+            previous = np.where(valid[:, None], current, previous)
+        return best, best_at
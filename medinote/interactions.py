@@ -0,0 +1,148 @@
+"""약물 상호작용 확인: 성분 색인과 '함께 복용하지 말아야 할 성분' 집합
+
+카탈로그의 'Main Ingredient'에서 성분 어휘를 만들고, 'Medications to Avoid' 문장의 단어를
+어휘와 맞춰 제품마다 피해야 할 성분 번호를 미리 계산해 둔다. 약을 추가할 때는 자유 문장을
+다시 훑지 않고 성분 번호 집합만 비교한다.
+"""
+import re
+
+from search_index import normalize_text
+
+
+TOKEN_PATTERN = re.compile(r'[0-9a-z가-힣]+')
+
+# 성분명 뒤에 붙는 조사/접미사 (짧은 성분명은 이것만 허용해 '건강', '사인' 같은 일반 단어 오인을 막는다)
+PARTICLES = frozenset(['', '을', '를', '이', '가', '은', '는', '와', '과', '의', '도', '로', '으로',
+                       '에', '등', '과의', '와의', '이나', '나', '제', '제제', '류', '계'])
+SHORT_NAME = 2
+
+
+def split_ingredients(value):
+    """'Main Ingredient' 값 -> 정규화한 성분명 목록"""
+    if not isinstance(value, str):
+        return []
+    names = (normalize_text(part).replace(' ', '') for part in value.split(','))
+    return [name for name in names if len(name) >= SHORT_NAME]
+
+
+class InteractionIndex:
+    """카탈로그 전체의 성분 어휘, 제품별 성분/피해야 할 성분, 성분 -> 제품 색인"""
+
+    def __init__(self):
+        self.vocabulary = {}  # 정규화한 성분명 -> 성분 번호
+        self.names = []  # 성분 번호 -> 성분명 (원문 표기)
+        self.longest = 0
+        self.product_ingredients = {}  # doc id -> 성분 번호 tuple
+        self.product_avoids = {}  # doc id -> 피해야 할 성분 번호 tuple
+        self.ingredient_products = {}  # 성분 번호 -> doc id tuple
+
+    @classmethod
+    def build(cls, frame):
+        columns = [frame[column] if column in frame else [None] * len(frame)
+                   for column in ('Main Ingredient', 'Medications to Avoid')]
+        return cls.from_values(columns[0], zip(frame.index, *columns))
+
+    @classmethod
+    def from_values(cls, ingredient_values, rows):
+        """ingredient_values: 모든 'Main Ingredient' 값 (어휘), rows: (doc id, 성분, 피해야 할 약) 반복자"""
+        index = cls()
+        index.learn(ingredient_values)
+        doc_ids = []
+        for doc_id, main_ingredient, avoid_text in rows:
+            index.add_product(doc_id, main_ingredient, avoid_text)
+            doc_ids.append(doc_id)
+        index.link(doc_ids)
+        return index
+
+    def learn(self, ingredient_values):
+        """성분 어휘를 만든다 (어휘가 같으면 성분 번호도 같다)"""
+        for value in ingredient_values:
+            if not isinstance(value, str):
+                continue
+            for raw in value.split(','):
+                name = normalize_text(raw).replace(' ', '')
+                if len(name) >= SHORT_NAME and name not in self.vocabulary:
+                    self.vocabulary[name] = len(self.names)
+                    self.names.append(raw.strip())
+        self.longest = max(map(len, self.vocabulary), default=0)
+
+    def add_product(self, doc_id, main_ingredient, avoid_text):
+        self.set_product(doc_id, self.ingredients_in(main_ingredient), self.avoided_in(avoid_text))
+
+    def set_product(self, doc_id, ingredients, avoids):
+        if ingredients:
+            self.product_ingredients[doc_id] = ingredients
+        if avoids:
+            self.product_avoids[doc_id] = avoids
+
+    def link(self, doc_ids):
+        """성분 -> 제품 색인 (doc_ids 순서 = 카탈로그 순서)"""
+        holders = {}
+        for doc_id in doc_ids:
+            for ingredient in self.product_ingredients.get(doc_id, ()):
+                holders.setdefault(ingredient, []).append(doc_id)
+        self.ingredient_products = {ingredient: tuple(ids) for ingredient, ids in holders.items()}
+
+    def ingredients_in(self, value):
+        ids = (self.vocabulary.get(name) for name in split_ingredients(value))
+        return tuple(sorted({i for i in ids if i is not None}))
+
+    def avoided_in(self, text):
+        """'Medications to Avoid' 문장에 나오는 성분 번호 (단어 앞부분이 성분명과 같으면 일치)"""
+        if not isinstance(text, str):
+            return ()
+        found = set()
+        for token in TOKEN_PATTERN.findall(normalize_text(text)):
+            for length in range(SHORT_NAME, min(len(token), self.longest) + 1):
+                ingredient = self.vocabulary.get(token[:length])
+                if ingredient is not None and (length > SHORT_NAME or token[length:] in PARTICLES):
+                    found.add(ingredient)
+        return tuple(sorted(found))
+
+    def profile_of(self, doc_id=None, main_ingredient=None, avoid_text=None):
+        """(성분 번호, 피해야 할 성분 번호); 카탈로그 행이면 미리 계산한 값을 쓴다"""
+        if doc_id in self.product_ingredients or doc_id in self.product_avoids:
+            return (self.product_ingredients.get(doc_id, ()),
+                    self.product_avoids.get(doc_id, ()))
+        return self.ingredients_in(main_ingredient), self.avoided_in(avoid_text)
+
+
+class MedicationInteractions:
+    """복용 중인 약 목록의 성분 -> 약, 피해야 할 성분 -> 약 색인 (추가/삭제 시 그 약만 반영)"""
+
+    def __init__(self, index):
+        self.index = index
+        self.holders = {}  # 성분 번호 -> 그 성분이 든 약 이름 set
+        self.avoiders = {}  # 성분 번호 -> 그 성분을 피하라고 한 약 이름 set
+        self.profiles = {}  # 약 이름 -> (성분, 피해야 할 성분)
+
+    def add(self, product_name, ingredients, avoids):
+        self.remove(product_name)
+        self.profiles[product_name] = (ingredients, avoids)
+        for ingredient in ingredients:
+            self.holders.setdefault(ingredient, set()).add(product_name)
+        for ingredient in avoids:
+            self.avoiders.setdefault(ingredient, set()).add(product_name)
+
+    def remove(self, product_name):
+        ingredients, avoids = self.profiles.pop(product_name, ((), ()))
+        for table, ids in ((self.holders, ingredients), (self.avoiders, avoids)):
+            for ingredient in ids:
+                names = table.get(ingredient)
+                if names is not None:
+                    names.discard(product_name)
+                    if not names:
+                        del table[ingredient]
+
+    def conflicts(self, ingredients, avoids):
+        """새 약과 부딪히는 복용 중인 약: {약 이름: 문제가 되는 성분명 목록}"""
+        found = {}
+        # 새 약이 피하라고 한 성분이 든 약
+        for ingredient in avoids:
+            for name in self.holders.get(ingredient, ()):
+                found.setdefault(name, set()).add(ingredient)
+        # 새 약의 성분을 피하라고 한 약
+        for ingredient in ingredients:
+            for name in self.avoiders.get(ingredient, ()):
+                found.setdefault(name, set()).add(ingredient)
+        return {name: [self.index.names[i] for i in sorted(ids)] for name, ids in found.items()}
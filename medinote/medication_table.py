@@ -0,0 +1,204 @@
+"""타입을 정한 약물 표: 반복되는 문자열은 범주형, 알림 여부는 bool
+
+복용 약물 표는 컬럼마다 NumPy 버퍼를 미리 넉넉히 잡아 두고 앞부분만 쓴다. 약을 추가하면
+버퍼 끝에 한 칸 쓰고, 꽉 찼을 때만 두 배로 늘리므로 추가할 때마다 표 전체를 복사하지 않는다.
+"""
+import numpy as np
+import pandas as pd
+
+from recurrence import is_enabled
+from search_index import product_key
+
+
+CONDITIONS = ('식전', '식후', '공복')
+# 범주형 컬럼 -> 처음 범주 (새 값이 나오면 범주를 늘린다)
+CATEGORY_COLUMNS = {'Company Name': (), 'Taking_Condition': CONDITIONS}
+BOOL_COLUMNS = ('Notifications_Enabled',)
+
+# 카탈로그에서 서로 다른 값이 행 수의 이 비율 이하인 문자열 컬럼은 범주형으로 둔다
+CATEGORY_RATIO = 0.5
+
+
+def compact_catalog(frame):
+    """카탈로그의 반복이 많은 문자열 컬럼(제조사, 성분, 효능)을 범주형으로 바꾼다"""
+    frame = frame.copy()
+    for column in frame.columns:
+        values = frame[column]
+        if values.dtype == object or pd.api.types.is_string_dtype(values):
+            if values.nunique(dropna=True) <= len(values) * CATEGORY_RATIO:
+                frame[column] = values.astype('category')
+    return frame
+
+
+def missing(value):
+    return value is None or value != value
+
+
+class MedicationTable:
+    """복용 약물 표 (행 순서 = 추가한 순서 = ScheduleView의 행 번호)
+
+    frame은 버퍼 앞부분을 복사 없이 감싼 DataFrame이다. 표를 바꾸면 새로 만들어지므로
+    바꾼 뒤에는 frame을 다시 읽는다. 약물명 키(product_key) -> 행 번호 색인을 같이 고쳐 두므로
+    약물명으로 행을 찾을 때 표 전체를 훑지 않는다.
+    """
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.column_index = pd.Index(self.columns)
+        self.length = 0
+        self.capacity = 0
+        self.data = {}  # 컬럼 -> 버퍼 (범주형은 범주 번호, 값 없음 = -1)
+        self.categories = {}  # 범주형 컬럼 -> 범주 목록
+        self.codes = {}  # 범주형 컬럼 -> {값: 범주 번호}
+        for column in self.columns:
+            if column in CATEGORY_COLUMNS:
+                self.categories[column] = list(CATEGORY_COLUMNS[column])
+                self.codes[column] = {value: code for code, value in enumerate(self.categories[column])}
+        self.keys = []  # 행 -> 약물명 키
+        self.positions = {}  # 약물명 키 -> 행 번호 목록 (보통 하나)
+        self.cached = None
+        self.reserve(self.INITIAL_CAPACITY)
+
+    @classmethod
+    def from_frame(cls, frame, columns=None):
+        table = cls(columns if columns is not None else frame.columns)
+        table.reserve(len(frame))
+        for record in frame.to_dict('records'):
+            table.append(record)
+        return table
+
+    def __len__(self):
+        return self.length
+
+    def empty_buffer(self, column, capacity):
+        if column in self.categories:
+            return np.full(capacity, -1, dtype=np.int32)
+        if column in BOOL_COLUMNS:
+            return np.ones(capacity, dtype=bool)
+        return np.full(capacity, None, dtype=object)
+
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2, self.INITIAL_CAPACITY)
+        for column in self.columns:
+            buffer = self.empty_buffer(column, capacity)
+            if column in self.data:
+                buffer[:self.length] = self.data[column][:self.length]
+            self.data[column] = buffer
+        self.capacity = capacity
+
+    def encode(self, column, value):
+        if column in self.categories:
+            if missing(value):
+                return -1
+            code = self.codes[column].get(value)
+            if code is None:
+                code = self.codes[column][value] = len(self.categories[column])
+                self.categories[column].append(value)
+            return code
+        if column in BOOL_COLUMNS:
+            return is_enabled(value)
+        return None if missing(value) else value
+
+    def append(self, record):
+        """record(dict)를 마지막 행으로 추가하고 행 번호를 반환한다"""
+        self.reserve(self.length + 1)
+        row = self.length
+        for column in self.columns:
+            self.data[column][row] = self.encode(column, record.get(column))
+        self.index_row(row)
+        self.length += 1
+        self.cached = None
+        return row
+
+    def index_row(self, row):
+        key = product_key(self.data['Product Name'][row])
+        if row < len(self.keys):
+            self.keys[row] = key
+        else:
+            self.keys.append(key)
+        self.positions.setdefault(key, []).append(row)
+
+    def unindex_row(self, row):
+        rows = self.positions[self.keys[row]]
+        rows.remove(row)
+        if not rows:
+            del self.positions[self.keys[row]]
+
+    def contains(self, product_name):
+        """공백/대소문자만 다른 약물명도 같은 약으로 본다 (중복 추가 확인용)"""
+        return product_key(product_name) in self.positions
+
+    def rows_of(self, product_name):
+        names = self.data['Product Name']
+        return np.array(sorted(row for row in self.positions.get(product_key(product_name), ())
+                               if names[row] == product_name), dtype=np.intp)
+
+    def update(self, product_name, fields):
+        """약물명이 같은 행의 필드를 바꾸고 바뀐 행 번호들을 반환한다"""
+        unknown = set(fields) - set(self.columns)
+        if unknown:
+            raise KeyError(f'알 수 없는 필드: {sorted(unknown)}')
+        rows = self.rows_of(product_name)
+        for column, value in fields.items():
+            self.data[column][rows] = self.encode(column, value)
+        if 'Product Name' in fields:
+            for row in rows:
+                self.unindex_row(row)
+                self.index_row(row)
+        self.cached = None
+        return rows
+
+    def delete(self, product_name):
+        """약물명이 같은 행을 지우고 지운 행 번호들을 반환한다 (뒤 행은 앞으로 당겨진다)"""
+        rows = self.rows_of(product_name)
+        if len(rows):
+            keep = np.ones(self.length, dtype=bool)
+            keep[rows] = False
+            remaining = self.length - len(rows)
+            for column in self.columns:
+                buffer = self.data[column]
+                buffer[:remaining] = buffer[:self.length][keep]
+                buffer[remaining:self.length] = self.empty_buffer(column, len(rows))
+
+            # 지운 첫 행부터 뒤쪽 행 번호가 당겨지므로 그 부분만 색인을 다시 만든다
+            start = int(rows[0])
+            for row in range(start, self.length):
+                self.unindex_row(row)
+            del self.keys[start:]
+            self.length = remaining
+            for row in range(start, remaining):
+                self.index_row(row)
+            self.cached = None
+        return rows
+
+    def value(self, column, row):
+        value = self.data[column][row]
+        if column in self.categories:
+            return self.categories[column][value] if value >= 0 else None
+        if column in BOOL_COLUMNS:
+            return bool(value)
+        return value
+
+    def row(self, row):
+        """한 행 (표 전체를 DataFrame으로 만들지 않고 읽는다)"""
+        return pd.Series([self.value(column, row) for column in self.columns],
+                         index=self.column_index, dtype=object, name=row)
+
+    @property
+    def frame(self):
+        if self.cached is None:
+            series = {}
+            for column in self.columns:
+                values = self.data[column][:self.length]
+                if column in self.categories:
+                    dtype = pd.CategoricalDtype(self.categories[column])
+                    values = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+                    series[column] = pd.Series(values, copy=False)
+                else:
+                    series[column] = pd.Series(values, dtype=values.dtype, copy=False)
+            self.cached = pd.DataFrame(series, columns=self.columns, copy=False)
+        return self.cached
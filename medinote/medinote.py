@@ -1,10 +1,81 @@
+import time
+STARTED_AT = time.perf_counter()  # --startup-timing 기준 시각 (다른 import보다 먼저)
+
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
-from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime, timedelta
 from tkinter.scrolledtext import ScrolledText
+import argparse
 import json
 import os
+import queue
+import sys
+import threading
+
+from notify_daemon import DaemonClient, add_daemon_arguments, run_daemon
+from interactions import InteractionIndex, MedicationInteractions
+from recurrence import EVERY_DAY, INTERVAL_HOURS, WEEKDAY_NAMES, Recurrence, is_enabled, recurrence_of
+from scheduler import DoseScheduler
+from search_index import SearchCancelled, file_signature, product_key
+
+# pandas/numpy를 쓰는 모듈(프로필, 저장소, 카탈로그)은 창을 띄운 뒤 백그라운드 스레드에서 읽는다
+
+
+MY_MEDICATION_COLUMNS = [
+    'Product Name', 'Company Name', 'Main Ingredient',
+    'Effectiveness', 'How to Take It', 'Precautions',
+    'Warnings', 'Medications to Avoid', 'Major Side Effects',
+    'Storage Instructions', 'Notification Time', 'Notifications_Enabled',
+    'Taking_Condition', 'Recurrence'
+]
+
+
+def has_value(value):
+    """None/NaN이 아닌 값 (pandas 없이 확인)"""
+    return value is not None and value == value
+
+
+def run_in_background(root, work, done, failed, poll_ms=50):
+    """work()를 작업 스레드에서 실행하고, 끝나면 Tk 스레드에서 done(결과) 또는 failed(예외)를 부른다"""
+    results = queue.Queue(maxsize=1)
+
+    def target():
+        try:
+            results.put((True, work()))
+        except Exception as e:
+            results.put((False, e))
+
+    def poll():
+        try:
+            succeeded, value = results.get_nowait()
+        except queue.Empty:
+            root.after(poll_ms, poll)
+            return
+        (done if succeeded else failed)(value)
+
+    threading.Thread(target=target, daemon=True).start()
+    root.after(poll_ms, poll)
+
+
+class StartupTiming:
+    """--startup-timing: 프로세스 시작부터 단계별 경과 시간(ms)을 재서 출력한다"""
+
+    def __init__(self, root):
+        self.root = root
+        self.marks = {}
+        root.bind('<Expose>', self.on_expose, add='+')
+
+    def mark(self, name):
+        self.marks.setdefault(name, round((time.perf_counter() - STARTED_AT) * 1000, 1))
+
+    def on_expose(self, event):
+        if event.widget is self.root:
+            self.mark('first_paint_ms')
+            # 첫 화면을 그리는 시점에 pandas가 이미 읽혔는지
+            self.marks.setdefault('pandas_loaded_at_first_paint', 'pandas' in sys.modules)
+
+    def report(self):
+        print(json.dumps(self.marks, ensure_ascii=False))
 
 
 class CustomStyle:
@@ -196,10 +267,58 @@ class UserInfoDialog:
         self.window.destroy()
 
 
+class RecurrenceInputs:
+    """복용 간격/요일 선택 위젯 (복용 시간 설정 창에서 공용)"""
+
+    NO_INTERVAL = '없음'
+
+    def __init__(self, parent, recurrence=None):
+        frame = ttk.Frame(parent, style='Card.TFrame')
+        frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(frame,
+                  text="복용 간격:",
+                  style='Body.TLabel').pack()
+
+        interval = self.NO_INTERVAL
+        if recurrence is not None and recurrence.interval:
+            interval = f"{recurrence.interval // 60}시간"
+        self.interval_var = tk.StringVar(value=interval)
+        ttk.Combobox(frame,
+                     textvariable=self.interval_var,
+                     values=[self.NO_INTERVAL] + [f"{hours}시간" for hours in INTERVAL_HOURS],
+                     state='readonly',
+                     width=10).pack(pady=5)
+
+        ttk.Label(frame,
+                  text="복용 요일:",
+                  style='Body.TLabel').pack()
+
+        day_frame = ttk.Frame(frame, style='Card.TFrame')
+        day_frame.pack(pady=5)
+
+        weekdays = recurrence.weekdays if recurrence is not None else EVERY_DAY
+        self.day_vars = []
+        for i, day in enumerate(WEEKDAY_NAMES):
+            var = tk.BooleanVar(value=bool(weekdays >> i & 1))
+            ttk.Checkbutton(day_frame, text=day, variable=var).pack(side=tk.LEFT)
+            self.day_vars.append(var)
+
+    def parse(self, times_text):
+        """입력한 시간과 선택한 간격/요일로 Recurrence 생성 (시간이 비어 있으면 None)"""
+        interval = self.interval_var.get()
+        interval_hours = 0 if interval == self.NO_INTERVAL else int(interval.replace('시간', ''))
+        weekdays = sum(1 << i for i, var in enumerate(self.day_vars) if var.get())
+        return Recurrence.parse(times_text, interval_hours, weekdays)
+
+
 class MedicationBanner(ttk.Frame):
+    # 목록 행 높이를 고정하기 위해 배너에 보여주는 항목 길이를 자른다 (전체 내용은 상세정보에서 확인)
+    SUMMARY_LENGTH = 45
+
     def __init__(self, parent, medication_data, manager, **kwargs):
         super().__init__(parent, **kwargs)
-        self.medication_data = medication_data
+        self.medication_data = None
         self.manager = manager
         self.style = CustomStyle()
 
@@ -218,35 +337,22 @@ class MedicationBanner(ttk.Frame):
         name_frame = ttk.Frame(header_frame, style='Card.TFrame')
         name_frame.pack(side=tk.LEFT)
 
-        ttk.Label(name_frame,
-                  text="💊 " + medication_data['Product Name'],
-                  style='Heading.TLabel').pack(side=tk.LEFT)
+        self.name_label = ttk.Label(name_frame, style='Heading.TLabel')
+        self.name_label.pack(side=tk.LEFT)
 
         # Time with clock icon (only if notification time is set)
-        if pd.notna(medication_data['Notification Time']):
-            time_frame = ttk.Frame(header_frame, style='Card.TFrame')
-            time_frame.pack(side=tk.RIGHT)
-
-            notification_status = "🔔" if medication_data.get('Notifications_Enabled', True) else "🔕"
-            time_text = f"{notification_status} 복용시간: {medication_data['Notification Time']}"
-            ttk.Label(time_frame,
-                      text=time_text,
-                      style='Body.TLabel').pack(side=tk.RIGHT)
+        self.time_frame = ttk.Frame(header_frame, style='Card.TFrame')
+        self.time_label = ttk.Label(self.time_frame, style='Body.TLabel')
+        self.time_label.pack(side=tk.RIGHT)
 
         # Medication details
         details_frame = ttk.Frame(content_frame, style='Card.TFrame')
         details_frame.pack(fill=tk.X, pady=(10, 0))
 
-        # Icons for different types of information
-        info_text = f"🧬 주요성분: {medication_data['Main Ingredient']}\n"
-        info_text += f"✨ 효능: {medication_data['Effectiveness']}\n"
-        info_text += f"📝 복용방법: {medication_data['How to Take It']}\n"
-        info_text += f"⚠️ 주의사항: {medication_data['Medications to Avoid']}"
-
-        ttk.Label(details_frame,
-                  text=info_text,
-                  style='Body.TLabel',
-                  wraplength=400).pack(fill=tk.X)
+        self.info_label = ttk.Label(details_frame,
+                                    style='Body.TLabel',
+                                    wraplength=400)
+        self.info_label.pack(fill=tk.X)
 
         # Action buttons
         button_frame = ttk.Frame(content_frame, style='Card.TFrame')
@@ -267,6 +373,44 @@ class MedicationBanner(ttk.Frame):
                    style='Danger.TButton',
                    command=self.delete_medication).pack(side=tk.LEFT, padx=2)
 
+        if medication_data is not None:
+            self.set_medication(medication_data)
+
+    def summarize(self, value):
+        text = ' '.join(str(value).split())
+        if len(text) > self.SUMMARY_LENGTH:
+            text = text[:self.SUMMARY_LENGTH - 1] + '…'
+        return text
+
+    def set_medication(self, medication_data):
+        """위젯을 새로 만들지 않고 다른 약물 정보로 다시 채운다 (목록 스크롤 시 배너 재사용)"""
+        self.name_label.configure(text="💊 " + medication_data['Product Name'])
+        self.update_schedule(medication_data)
+
+        # Icons for different types of information
+        info_text = f"🧬 주요성분: {self.summarize(medication_data['Main Ingredient'])}\n"
+        info_text += f"✨ 효능: {self.summarize(medication_data['Effectiveness'])}\n"
+        info_text += f"📝 복용방법: {self.summarize(medication_data['How to Take It'])}\n"
+        info_text += f"⚠️ 주의사항: {self.summarize(medication_data['Medications to Avoid'])}"
+        self.info_label.configure(text=info_text)
+
+    def update_schedule(self, medication_data):
+        """복용 시간/알림/복용 조건 표시만 갱신한다"""
+        self.medication_data = medication_data
+
+        if has_value(medication_data['Notification Time']):
+            notification_status = "🔔" if medication_data.get('Notifications_Enabled', True) else "🔕"
+            recurrence = recurrence_of(medication_data)
+            schedule_text = recurrence.describe() if recurrence else medication_data['Notification Time']
+            time_text = f"{notification_status} 복용시간: {schedule_text}"
+            condition = medication_data.get('Taking_Condition')
+            if isinstance(condition, str):
+                time_text += f" ({condition})"
+            self.time_label.configure(text=time_text)
+            self.time_frame.pack(side=tk.RIGHT)
+        else:
+            self.time_frame.pack_forget()
+
     def show_details(self):
         details_window = tk.Toplevel(self)
         details_window.title(f"약물 상세 정보 - {self.medication_data['Product Name']}")
@@ -314,9 +458,11 @@ class MedicationBanner(ttk.Frame):
         return icons.get(field, '📌')
 
     def change_time(self):
+        # 창이 열려 있는 동안 배너가 다른 행에 재사용될 수 있으므로 지금 데이터를 붙잡아 둔다
+        medication_data = self.medication_data
         time_window = tk.Toplevel(self)
         time_window.title("복용 시간 설정")
-        time_window.geometry("400x550")
+        time_window.geometry("400x700")
         time_window.configure(bg=self.style.colors['background'])
 
         # Card-like container
@@ -329,7 +475,7 @@ class MedicationBanner(ttk.Frame):
                   style='Title.TLabel').pack(pady=(0, 20))
 
         # Enable/Disable notifications
-        notifications_var = tk.BooleanVar(value=pd.notna(self.medication_data['Notification Time']))
+        notifications_var = tk.BooleanVar(value=has_value(medication_data['Notification Time']))
         notifications_check = ttk.Checkbutton(
             card_frame,
             text="알림 설정",
@@ -349,14 +495,18 @@ class MedicationBanner(ttk.Frame):
         time_entry.pack(pady=5)
 
         # 기존 시간이 있으면 입력
-        if pd.notna(self.medication_data['Notification Time']):
-            time_entry.insert(0, self.medication_data['Notification Time'])
+        if has_value(medication_data['Notification Time']):
+            time_entry.insert(0, medication_data['Notification Time'])
 
         ttk.Label(time_frame,
-                  text="형식: HH:MM (예: 09:00)\n알림을 받지 않으려면 비워두세요",
+                  text="형식: HH:MM (예: 09:00)\n"
+                       "하루 여러 번이면 쉼표로 구분 (예: 08:00, 13:00, 19:00)\n"
+                       "알림을 받지 않으려면 비워두세요",
                   style='Body.TLabel',
                   justify='center').pack()
 
+        recurrence_inputs = RecurrenceInputs(time_frame, recurrence_of(medication_data))
+
         # Condition selection
         condition_frame = ttk.Frame(card_frame, style='Card.TFrame')
         condition_frame.pack(fill=tk.X, pady=20)
@@ -365,7 +515,7 @@ class MedicationBanner(ttk.Frame):
                   text="복용 조건:",
                   style='Body.TLabel').pack()
 
-        current_condition = self.medication_data.get('Taking_Condition', '식후')
+        current_condition = medication_data.get('Taking_Condition', '식후')
         condition_var = tk.StringVar(value=current_condition)
 
         conditions = {
@@ -395,26 +545,25 @@ class MedicationBanner(ttk.Frame):
         condition_var.trace('w', update_explanation)
 
         def save_new_time():
-            time_str = time_entry.get().strip()
             notifications_enabled = notifications_var.get()
 
-            if time_str:  # 시간이 입력된 경우
-                try:
-                    datetime.strptime(time_str, "%H:%M")
-                except ValueError:
-                    messagebox.showerror("오류", "올바른 시간 형식을 입력하세요 (HH:MM)")
-                    return
-            else:  # 시간이 입력되지 않은 경우
-                time_str = None
+            try:
+                recurrence = recurrence_inputs.parse(time_entry.get())
+            except ValueError as e:
+                messagebox.showerror("오류", str(e))
+                return
+            # 시간이 입력되지 않은 경우 None
+            time_str = recurrence.time_text() if recurrence else None
 
             updates = {
                 'Notification Time': time_str,
+                'Recurrence': recurrence.rule_text() if recurrence else None,
                 'Taking_Condition': condition_var.get(),
                 'Notifications_Enabled': notifications_enabled
             }
 
             self.manager.update_medication(
-                self.medication_data['Product Name'],
+                medication_data['Product Name'],
                 updates
             )
 
@@ -432,49 +581,652 @@ class MedicationBanner(ttk.Frame):
     def delete_medication(self):
         if messagebox.askyesno("확인", "이 약물을 삭제하시겠습니까?"):
             self.manager.delete_medication(self.medication_data['Product Name'])
-            self.destroy()
+
+
+class VirtualMedicationList:
+    """캔버스에 보이는 행에만 MedicationBanner를 붙이고, 스크롤하면 배너를 재사용한다
+
+    행 높이를 고정해 두어 스크롤 위치만으로 보이는 행 범위를 계산한다. 배너 수는 화면에
+    보이는 행 수 + 여유분으로 제한되고, 목록이 바뀌어도 배너를 새로 만들지 않고 다시 채운다.
+    """
+
+    ROW_HEIGHT = 210
+    ROW_PADDING = 5
+    OVERSCAN = 2
+    HIDDEN_Y = -10000
+
+    def __init__(self, canvas, scrollbar, manager):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.manager = manager
+        self.row_count = 0
+        self.width = 1
+        self.bound = {}  # row -> (banner, canvas item)
+        self.free = []  # 화면 밖에 숨겨 둔 (banner, canvas item)
+
+        canvas.configure(yscrollcommand=self.on_scroll)
+        canvas.bind('<Configure>', self.on_configure)
+
+    def row_data(self, row):
+        return self.manager.profile.medications.row(row)
+
+    def banner_width(self):
+        return max(self.width - 2 * self.ROW_PADDING, 1)
+
+    def update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.width, self.row_count * self.ROW_HEIGHT))
+
+    def set_row_count(self, count):
+        """목록 전체가 바뀌었을 때: 보이는 행의 배너만 다시 채운다"""
+        self.row_count = count
+        self.update_scrollregion()
+        for row in list(self.bound):
+            self.release(row)
+        self.refresh()
+
+    def update_row(self, row):
+        """한 행의 복용 시간/알림/조건이 바뀐 경우: 그 행이 화면에 있을 때만 해당 배너를 고친다"""
+        if row in self.bound:
+            banner, _ = self.bound[row]
+            banner.update_schedule(self.row_data(row))
+
+    def insert_row(self, row):
+        """row 위치에 행이 추가된 경우: 아래쪽 배너는 자리만 옮기고 새 행만 채운다"""
+        self.row_count += 1
+        self.shift_rows(row, 1)
+        self.update_scrollregion()
+        self.refresh()
+
+    def remove_row(self, row):
+        """row 위치의 행이 삭제된 경우: 그 배너만 반납하고 아래쪽 배너는 한 칸씩 올린다"""
+        if row in self.bound:
+            self.release(row)
+        self.row_count -= 1
+        self.shift_rows(row + 1, -1)
+        self.update_scrollregion()
+        self.refresh()
+
+    def shift_rows(self, start, offset):
+        moved = {}
+        for row in list(self.bound):
+            if row >= start:
+                banner, item = self.bound.pop(row)
+                self.canvas.move(item, 0, offset * self.ROW_HEIGHT)
+                moved[row + offset] = (banner, item)
+        self.bound.update(moved)
+
+    def release(self, row):
+        banner, item = self.bound.pop(row)
+        self.canvas.coords(item, 0, self.HIDDEN_Y)
+        self.free.append((banner, item))
+
+    def acquire(self):
+        if self.free:
+            return self.free.pop()
+        banner = MedicationBanner(self.canvas, None, self.manager)
+        item = self.canvas.create_window(0, self.HIDDEN_Y,
+                                         window=banner,
+                                         anchor='nw',
+                                         width=self.banner_width(),
+                                         height=self.ROW_HEIGHT - 2 * self.ROW_PADDING)
+        return banner, item
+
+    def visible_rows(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(int(top // self.ROW_HEIGHT) - self.OVERSCAN, 0)
+        last = min(int(bottom // self.ROW_HEIGHT) + 1 + self.OVERSCAN, self.row_count)
+        return range(first, last)
+
+    def refresh(self):
+        rows = self.visible_rows()
+        for row in [row for row in self.bound if row not in rows]:
+            self.release(row)
+
+        for row in rows:
+            if row in self.bound:
+                continue
+            banner, item = self.acquire()
+            banner.set_medication(self.row_data(row))
+            self.canvas.coords(item, self.ROW_PADDING, row * self.ROW_HEIGHT + self.ROW_PADDING)
+            self.bound[row] = (banner, item)
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def on_configure(self, event):
+        self.width = event.width
+        for banner, item in list(self.bound.values()) + self.free:
+            self.canvas.itemconfigure(item, width=self.banner_width())
+        self.update_scrollregion()
+        self.refresh()
+
+
+class NotificationWindow:
+    """복용 알림 창: 미리 한 번 만들어 숨겨 두고, 같은 시각의 약을 체크리스트 하나로 보여준다
+
+    알림이 올 때마다 창과 위젯을 새로 만들지 않고 행 위젯을 재사용한다. 창이 떠 있는 동안
+    다른 시각의 알림이 도착하면 대기열에 넣었다가 확인을 누르면 이어서 보여준다.
+    알림은 프로필(복용자)별로 따로 묶는다.
+    확인/미루기를 누르면 on_result(due_at, medications, taken_flags, snoozed, profile)가 호출된다.
+    TIMEOUT_MS 동안 답이 없으면 확인을 누른 것으로 보고 체크하지 않은 약은 놓침으로 기록한다.
+    """
+
+    CONDITION_TEXT = {
+        '식전': '식사하기 30분 전에 복용하세요.',
+        '식후': '식사 직후에 복용하세요.',
+        '공복': '식사와 식사 사이 충분한 시간이 지난 후 복용하세요.'
+    }
+    HOW_TO_LENGTH = 80
+    TIMEOUT_MS = 60 * 60 * 1000
+
+    def __init__(self, root, style, on_result):
+        self.style = style
+        self.on_result = on_result
+        self.window = tk.Toplevel(root)
+        self.window.withdraw()
+        self.window.title("복용 알림")
+        self.window.minsize(420, 250)
+        self.window.configure(bg=style.colors['background'])
+        self.window.protocol('WM_DELETE_WINDOW', self.confirm)
+
+        # Card container
+        card_frame = ttk.Frame(self.window, style='Card.TFrame', padding="20")
+        card_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        # Notification icon and title
+        ttk.Label(card_frame,
+                  text="⏰ 복용 시간 알림",
+                  style='Title.TLabel').pack(pady=(0, 10))
+
+        self.time_label = ttk.Label(card_frame, style='Body.TLabel')
+        self.time_label.pack(pady=(0, 10))
+
+        self.list_frame = ttk.Frame(card_frame, style='Card.TFrame')
+        self.list_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(card_frame,
+                  text="복용한 약에 체크한 뒤 확인을 눌러주세요",
+                  style='Body.TLabel').pack(pady=(10, 0))
+
+        button_frame = ttk.Frame(card_frame, style='Card.TFrame')
+        button_frame.pack(pady=(10, 0))
+
+        # Close button
+        ttk.Button(button_frame,
+                   text="✔️ 확인",
+                   style='Primary.TButton',
+                   command=self.confirm).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(button_frame,
+                   text="⏰ 10분 후 다시 알림",
+                   style='Primary.TButton',
+                   command=self.snooze).pack(side=tk.LEFT, padx=5)
+
+        self.rows = []  # 재사용하는 (frame, check_var, name_check, detail_label)
+        self.batches = []  # 아직 보여주지 않은 (due_at, medications, now, profile)
+        self.current = None
+        self.timeout_id = None
+
+    def add_batch(self, due_at, medications, now, profile):
+        if self.current is not None and self.current[0] == due_at and self.current[3].id == profile.id:
+            # 같은 시각 알림이 나눠 도착하면 현재 목록에 합친다 (이미 한 체크는 그대로 둔다)
+            start = len(self.current[1])
+            self.current[1].extend(medications)
+            self.show(*self.current, start=start)
+            return
+        for queued_at, queued, _, queued_profile in self.batches:
+            if queued_at == due_at and queued_profile.id == profile.id:
+                queued.extend(medications)
+                return
+        self.batches.append((due_at, list(medications), now, profile))
+        if self.current is None:
+            self.show_next()
+
+    def show_next(self):
+        if self.timeout_id is not None:
+            self.window.after_cancel(self.timeout_id)
+            self.timeout_id = None
+        if not self.batches:
+            self.current = None
+            self.window.withdraw()
+            return
+        self.current = self.batches.pop(0)
+        self.show(*self.current)
+        self.timeout_id = self.window.after(self.TIMEOUT_MS, self.expire)
+
+    def expire(self):
+        self.timeout_id = None
+        self.confirm()
+
+    def finish_all(self):
+        """종료할 때: 보여 주던 알림은 확인한 것으로, 대기 중인 알림은 모두 놓침으로 기록한다"""
+        if self.timeout_id is not None:
+            self.window.after_cancel(self.timeout_id)
+            self.timeout_id = None
+        if self.current is not None:
+            due_at, medications, _, profile = self.current
+            taken = [self.rows[index][1].get() for index in range(len(medications))]
+            self.on_result(due_at, medications, taken, False, profile)
+        for due_at, medications, _, profile in self.batches:
+            self.on_result(due_at, medications, [False] * len(medications), False, profile)
+        self.current, self.batches = None, []
+
+    def row(self, index):
+        while len(self.rows) <= index:
+            frame = ttk.Frame(self.list_frame, style='Card.TFrame')
+            check_var = tk.BooleanVar(value=False)
+            name_check = ttk.Checkbutton(frame, variable=check_var)
+            name_check.pack(anchor='w')
+            detail_label = ttk.Label(frame, style='Body.TLabel', wraplength=360)
+            detail_label.pack(anchor='w', padx=(24, 0))
+            self.rows.append((frame, check_var, name_check, detail_label))
+        return self.rows[index]
+
+    def show(self, due_at, medications, now, profile, start=0):
+        """medications[start:]의 행만 새로 채운다 (앞의 행은 체크 상태와 함께 그대로 둔다)"""
+        time_text = f"👤 {profile.name} · {due_at.strftime('%H:%M')} 복용 약 {len(medications)}개"
+        # 프로그램이 멈춰 있던 사이 지나간 알림
+        if now - due_at >= timedelta(minutes=1):
+            time_text += f"\n({due_at.strftime('%H:%M')} 예정이었던 알림입니다)"
+        self.time_label.configure(text=time_text)
+
+        for index, medication in enumerate(medications[start:], start):
+            frame, check_var, name_check, detail_label = self.row(index)
+            check_var.set(False)
+            name_check.configure(text=f"💊 {medication['Product Name']}")
+
+            details = []
+            condition_text = self.CONDITION_TEXT.get(medication.get('Taking_Condition'), '')
+            if condition_text:
+                details.append(condition_text)
+            how_to = ' '.join(str(medication['How to Take It']).split())
+            if len(how_to) > self.HOW_TO_LENGTH:
+                how_to = how_to[:self.HOW_TO_LENGTH - 1] + '…'
+            details.append(f"📝 {how_to}")
+            detail_label.configure(text='\n'.join(details))
+            frame.pack(fill=tk.X, pady=(0, 8))
+
+        for frame, *_ in self.rows[len(medications):]:
+            frame.pack_forget()
+
+        self.window.deiconify()
+        self.window.lift()
+        self.window.focus_force()
+
+    def finish(self, snoozed):
+        if self.current is None:
+            return
+        due_at, medications, _, profile = self.current
+        taken = [self.rows[index][1].get() for index in range(len(medications))]
+        self.on_result(due_at, medications, taken, snoozed, profile)
+        self.show_next()
+
+    def confirm(self):
+        """체크한 약은 복용, 체크하지 않은 약은 놓침으로 기록"""
+        self.finish(snoozed=False)
+
+    def snooze(self):
+        """체크한 약은 복용으로 기록하고 나머지는 잠시 뒤 다시 알림"""
+        self.finish(snoozed=True)
+
+
+class SearchController:
+    """검색어 입력을 디바운스하고, 작업 스레드에서 검색한 뒤 결과를 페이지 단위로 Treeview에 채운다"""
+
+    DEBOUNCE_MS = 150
+    POLL_MS = 20
+    PAGE_SIZE = 200
+    COLUMNS = ['Product Name', 'Main Ingredient', 'Effectiveness']
+
+    def __init__(self, tree, search_var, fuzzy_var, manager):
+        self.tree = tree
+        self.search_var = search_var
+        self.fuzzy_var = fuzzy_var
+        self.manager = manager
+
+        # 새 입력이 들어올 때마다 증가; 이전 세대의 검색과 화면 갱신은 모두 버려진다
+        self.generation = 0
+        self.pending = 0
+        self.results = queue.Queue()
+        self.debounce_id = None
+        self.poll_id = None
+
+        search_var.trace('w', self.schedule)
+        fuzzy_var.trace('w', self.schedule)
+        tree.bind('<Destroy>', self.cancel, add='+')
+        manager.search_controllers.add(self)
+
+    def schedule(self, *args):
+        self.generation += 1
+        if self.debounce_id is not None:
+            self.tree.after_cancel(self.debounce_id)
+        self.debounce_id = self.tree.after(self.DEBOUNCE_MS, self.start)
+
+    def cancel(self, event=None):
+        self.generation += 1
+        self.manager.search_controllers.discard(self)
+        for after_id in (self.debounce_id, self.poll_id):
+            if after_id is not None:
+                self.tree.after_cancel(after_id)
+        self.debounce_id = self.poll_id = None
+
+    def start(self):
+        self.debounce_id = None
+        generation = self.generation
+        worker = threading.Thread(target=self.run,
+                                  args=(generation,
+                                        self.search_var.get(),
+                                        self.fuzzy_var.get(),
+                                        self.manager.medication_db,
+                                        self.manager.search_index,
+                                        self.manager.screening_table()),
+                                  daemon=True)
+        self.pending += 1
+        worker.start()
+        if self.poll_id is None:
+            self.poll_id = self.tree.after(self.POLL_MS, self.poll)
+
+    def run(self, generation, query, fuzzy, db, search_index, screening):
+        def cancelled():
+            return generation != self.generation
+
+        rows = None
+        try:
+            # 오타 허용 검색은 관련도 순, 일반 검색은 카탈로그 순
+            # 카탈로그를 다시 읽는 중이어도 시작할 때의 카탈로그(db, search_index)로 끝까지 검색한다
+            if fuzzy:
+                # 오타 허용 색인은 새 카탈로그 것일 수 있으므로 db에 없는 약은 뺀다 (결과는 최대 수백 개)
+                doc_ids = [doc_id for doc_id in self.manager.fuzzy_search_index().search(query, cancelled=cancelled)
+                           if doc_id in db.index]
+            else:
+                doc_ids = search_index.search(query, cancelled=cancelled)
+            if not cancelled():
+                # 마지막 값: 사용자 특이사항과 겹치는 단어 (없거나 선별 결과를 아직 만드는 중이면 빈 문자열)
+                rows = [values + (', '.join(screening.get(doc_id)) if screening is not None else '',)
+                        for doc_id, values in zip(doc_ids, db.loc[doc_ids, self.COLUMNS]
+                                                  .itertuples(index=False, name=None))]
+        except SearchCancelled:
+            pass
+        self.results.put((generation, rows))
+
+    def poll(self):
+        self.poll_id = None
+        latest = None
+        while True:
+            try:
+                generation, rows = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if generation == self.generation and rows is not None:
+                latest = rows
+
+        if latest is not None:
+            self.tree.delete(*self.tree.get_children())
+            self.insert_page(self.generation, latest, 0)
+
+        if self.pending:
+            self.poll_id = self.tree.after(self.POLL_MS, self.poll)
+
+    def insert_page(self, generation, rows, start):
+        if generation != self.generation:
+            return
+        for values in rows[start:start + self.PAGE_SIZE]:
+            self.tree.insert('', tk.END, values=values, tags=('flagged',) if values[-1] else ())
+        start += self.PAGE_SIZE
+        if start < len(rows):
+            # 다음 페이지는 이벤트 루프에 양보한 뒤 이어서 넣는다
+            self.tree.after(1, self.insert_page, generation, rows, start)
 
 
 class MedicationManager:
-    def __init__(self, root):
+    # 시스템 시계 변경/절전 복귀에 대비해 이 이상은 한 번에 잠들지 않는다
+    MAX_NOTIFICATION_SLEEP_MS = 5 * 60 * 1000
+    SNOOZE_MS = 10 * 60 * 1000
+    DAEMON_POLL_MS = 1000
+    EVICT_CHECK_MS = 60 * 1000
+    CATALOG_CHECK_MS = 5 * 1000
+
+    def __init__(self, root, backend='journal', db_path='medinote.db', timing=None,
+                 catalog_path='medications.xlsx'):
         self.root = root
         self.root.title("복용 약물 관리")
         self.root.geometry("800x600")
         self.style = CustomStyle()
         self.root.configure(bg=self.style.colors['background'])
+        self.backend = backend
+        self.db_path = db_path
+        self.catalog_path = catalog_path
+        self.timing = timing
+
+        self.daemon_client = None
+        self.registry = None
+        self.profile = None
+
+        # 카탈로그와 검색 색인: 약물 추가 화면을 처음 열 때 백그라운드에서 읽는다
+        self.medication_db = None
+        self.search_index = None
+        self.catalog_ids = None  # 약물명 키 -> doc id
+        self.catalog_details = None
+        self.catalog_store = None
+        self.catalog_version = None
+        self.catalog_waiters = None  # 읽는 중이면 다 읽은 뒤 부를 함수 목록
+        self.screening_pending = None  # 백그라운드에서 만드는 선별 결과의 (프로필 id, key)
+        # 카탈로그 파일 감시: 지난번에 본 서명, 읽다가 실패한 서명 (같은 파일을 계속 다시 읽지 않게)
+        self.catalog_seen = None
+        self.catalog_failed = None
+        self.search_controllers = set()  # 열려 있는 검색 창 (카탈로그가 바뀌면 다시 검색)
+        # 상호작용/오타 허용 검색 색인: 캐시가 없으면 처음 쓸 때 만든다
+        self.interaction_index = None
+        self.fuzzy_index = None
+        self.fuzzy_lock = threading.Lock()
+
+        # 알림: 모든 프로필의 다음 복용 시각을 힙 하나로 관리하는 스케줄러 (key = (프로필 id, 약물명))
+        self.scheduler = DoseScheduler()
+        self.notification_after_id = None
+        self.snoozed = {}  # after id -> 미뤄서 다시 알릴 (due_at, 약 목록, 프로필)
+        self.notification_window = NotificationWindow(self.root, self.style, self.record_doses)
+        self.root.protocol('WM_DELETE_WINDOW', self.on_close)
+
+        # 창은 바로 띄우고, pandas와 복용 약물 데이터는 백그라운드에서 읽는다
+        self.placeholder = self.loading_frame(self.root, "복용 약물을 불러오는 중…")
+        self.placeholder.pack(fill=tk.BOTH, expand=True)
+        run_in_background(self.root, self.load_profiles, self.on_profiles_loaded, self.on_load_failed)
+
+    def loading_frame(self, parent, text):
+        frame = ttk.Frame(parent, style='Main.TFrame', padding="40")
+        ttk.Label(frame, text=text, style='Subtitle.TLabel').pack(pady=(0, 10))
+        progress = ttk.Progressbar(frame, mode='indeterminate', length=240)
+        progress.pack()
+        progress.start(15)
+        return frame
+
+    def load_profiles(self):
+        """작업 스레드: 프로필 목록과 선택된 프로필 데이터, 모든 프로필의 알림 일정을 읽는다"""
+        from profiles import DEFAULT_PROFILE, ProfileRegistry
+
+        # 프로필 목록만 읽고, 프로필별 복용 약물/일정/기록은 선택할 때 읽는다
+        # (변경 내용은 백그라운드에서 저장하고, 저장을 마칠 때마다 데몬에 알린다)
+        registry = ProfileRegistry('profiles.json', self.backend, self.db_path, MY_MEDICATION_COLUMNS,
+                                   on_flush=self.notify_daemon)
+        profile = registry.activate(
+            registry.active if registry.active in registry.ids() else DEFAULT_PROFILE)
+        entries = registry.scheduler_entries(datetime.now())
+        # 알림 데몬이 떠 있으면 알림은 데몬에게 받고, 없으면 직접 스케줄러를 돌린다
+        return registry, profile, entries, DaemonClient.connect()
+
+    def on_profiles_loaded(self, result):
+        self.registry, self.profile, entries, self.daemon_client = result
 
         # 사용자 정보 로드 또는 입력 받기
         self.load_or_create_user_info()
 
-        # 데이터 로드
+        self.placeholder.destroy()
+        self.create_main_screen()
+        self.scheduler.load(entries)
+        self.arm_notifications()
+        self.root.after(self.EVICT_CHECK_MS, self.evict_idle_profiles)
+
+        if self.timing is not None:
+            self.timing.mark('data_ready_ms')
+            self.root.after_idle(self.on_close)
+
+    def on_load_failed(self, error):
+        messagebox.showerror("오류", f"데이터를 불러오지 못했습니다: {error}")
+        self.root.destroy()
+
+    def with_catalog(self, callback):
+        """카탈로그가 준비되면 callback()을 부른다 (처음이면 백그라운드에서 읽는 동안 안내 창을 띄운다)"""
+        if self.medication_db is not None:
+            callback()
+            return
+        if self.catalog_waiters is not None:
+            self.catalog_waiters.append(callback)
+            return
+        self.catalog_waiters = [callback]
+
+        notice = tk.Toplevel(self.root)
+        notice.title("약물 정보")
+        notice.transient(self.root)
+        self.loading_frame(notice, "약물 정보를 불러오는 중…").pack(fill=tk.BOTH, expand=True)
+
+        def done(catalog):
+            notice.destroy()
+            self.install_catalog(catalog)
+            if self.catalog_store is None:
+                # xlsx/csv 카탈로그는 파일이 바뀌면 다시 읽는다 (SQLite 카탈로그는 migrate-sqlite로 바꾼다)
+                self.catalog_seen = self.search_index.signature
+                self.root.after(self.CATALOG_CHECK_MS, self.check_catalog)
+            waiters, self.catalog_waiters = self.catalog_waiters, None
+            for waiter in waiters:
+                waiter()
+
+        def failed(error):
+            notice.destroy()
+            self.catalog_waiters = None
+            messagebox.showerror("오류", f"약물 정보를 불러오지 못했습니다: {error}")
+
+        run_in_background(self.root, self.load_catalog_data, done, failed)
+
+    def install_catalog(self, catalog):
+        """카탈로그와 색인을 한 번에 바꿔 넣는다 (Tk 스레드에서만 호출)
+
+        진행 중인 검색은 시작할 때 잡아 둔 이전 카탈로그로 끝나고, 열린 검색 창은 새 카탈로그로 다시 검색한다.
+        """
+        previous = self.catalog_details
+        (self.medication_db, self.search_index, self.interaction_index, self.fuzzy_index,
+         self.catalog_details, self.catalog_store, self.catalog_ids) = catalog
+        # 카탈로그가 바뀌었는지 구분하는 값 (특이사항 선별 결과 캐시의 키)
+        self.catalog_version = self.search_index.signature or len(self.medication_db)
+        if previous is None:
+            return
+
+        previous.close()
+        # 성분 번호가 바뀌었을 수 있으므로 복용 약 상호작용 색인은 처음 쓸 때 다시 만든다
+        for profile in self.registry.loaded.values():
+            profile.interactions = None
+        for controller in list(self.search_controllers):
+            controller.schedule()
+
+    def check_catalog(self):
+        """카탈로그 파일의 (mtime, size)를 주기적으로 보고, 바뀌었으면 백그라운드에서 다시 읽는다"""
+        signature = file_signature(self.catalog_path)
+        if (signature is not None and signature != self.search_index.signature
+                and signature != self.catalog_failed and signature == self.catalog_seen):
+            # 두 번 연속 같은 서명일 때만 읽는다 (아직 쓰는 중인 파일은 다음 확인까지 기다린다)
+            run_in_background(self.root, self.load_catalog_data,
+                              self.on_catalog_reloaded,
+                              lambda error: self.on_catalog_reload_failed(signature))
+            return
+        self.catalog_seen = signature
+        self.root.after(self.CATALOG_CHECK_MS, self.check_catalog)
+
+    def on_catalog_reloaded(self, catalog):
+        self.install_catalog(catalog)
+        self.catalog_seen = self.search_index.signature
+        self.root.after(self.CATALOG_CHECK_MS, self.check_catalog)
+
+    def on_catalog_reload_failed(self, signature):
+        # 읽을 수 없는 파일이면 이전 카탈로그를 계속 쓰고, 파일이 다시 바뀔 때까지 기다린다
+        self.catalog_failed = signature
+        self.root.after(self.CATALOG_CHECK_MS, self.check_catalog)
+
+    def load_catalog_data(self):
+        """작업 스레드: (카탈로그, 검색 색인, 상호작용 색인, 오타 허용 색인, 긴 텍스트 저장소, SQLite 저장소,
+        약물명 키 -> doc id)"""
+        from search_index import product_ids
+
+        if self.backend == 'sqlite':
+            from sqlite_store import SQLiteStore
+
+            # 카탈로그와 복용 약물 모두 SQLite에서 읽고, 검색은 FTS5로 처리
+            store = SQLiteStore(self.db_path)
+            frame = store.load_catalog()
+            # 성분 색인은 약을 처음 추가할 때 Tk 스레드에서 만들지 않도록 여기서 만든다
+            interactions = InteractionIndex.build(
+                store.load_catalog(['Main Ingredient', 'Medications to Avoid']))
+            return (frame, store.catalog_search(), interactions, None,
+                    store.catalog_details(), store, product_ids(frame))
+
+        import pandas as pd
+        from catalog_cache import load_catalog
+        from column_store import RESIDENT_COLUMNS, HeavyColumnStore
+        from search_index import SearchIndex
+
+        # 카탈로그와 검색 색인은 캐시에서 읽고, 원본이 바뀐 경우에만 xlsx를 다시 파싱한다
+        # (긴 텍스트 컬럼은 메모리 맵 파일에 두고 약을 추가할 때만 읽는다)
         try:
-            self.medication_db = pd.read_excel('medications.xlsx')
+            catalog = load_catalog(self.catalog_path)
         except FileNotFoundError:
-            self.medication_db = pd.DataFrame(columns=[
-                'Product Name', 'Company Name', 'Main Ingredient',
-                'Effectiveness', 'How to Take It', 'Precautions',
-                'Warnings', 'Medications to Avoid', 'Major Side Effects',
-                'Storage Instructions'
-            ])
+            frame = pd.DataFrame(columns=RESIDENT_COLUMNS)
+            return frame, SearchIndex.build(frame), None, None, HeavyColumnStore.empty(), None, {}
+        return (catalog.frame, catalog.index, catalog.interactions, catalog.fuzzy,
+                catalog.details, None, product_ids(catalog.frame))
 
+    def on_close(self):
+        """창을 닫기 전에 아직 저장하지 않은 변경을 모두 쓴다"""
         try:
-            self.my_medications = pd.read_excel('my_medications.xlsx')
-        except FileNotFoundError:
-            self.my_medications = pd.DataFrame(columns=[
-                'Product Name', 'Company Name', 'Main Ingredient',
-                'Effectiveness', 'How to Take It', 'Precautions',
-                'Warnings', 'Medications to Avoid', 'Major Side Effects',
-                'Storage Instructions', 'Notification Time', 'Notifications_Enabled'
-            ])
+            if self.registry is not None:
+                self.registry.flush()
+        except Exception as e:
+            if not messagebox.askyesno("저장 오류",
+                                       f"변경 내용을 저장하지 못했습니다: {e}\n그래도 종료할까요?"):
+                return
+        self.record_unanswered()
+        self.root.destroy()
 
-        self.create_main_screen()
-        self.check_notifications()
+    def record_unanswered(self):
+        """종료할 때 답하지 않은 알림과 미뤄 둔 약을 놓침으로 기록한다"""
+        from adherence import MISSED
+
+        self.notification_window.finish_all()
+        for after_id, (due_at, pending, profile) in self.snoozed.items():
+            self.root.after_cancel(after_id)
+            for medication in pending:
+                profile.adherence.record(medication['Product Name'], MISSED, due_at)
+        self.snoozed.clear()
+
+    # 선택된 프로필의 데이터 (프로필을 바꾸면 함께 바뀐다)
+    @property
+    def store(self):
+        return self.profile.store
+
+    @property
+    def my_medications(self):
+        return self.profile.medications.frame
+
+    @property
+    def schedule_view(self):
+        return self.profile.schedule_view
+
+    @property
+    def user_info(self):
+        return self.profile.user_info
 
     def load_or_create_user_info(self):
-        if os.path.exists('user_info.json'):
-            with open('user_info.json', 'r', encoding='utf-8') as f:
-                self.user_info = json.load(f)
-        else:
+        if self.user_info is None:
             dialog = UserInfoDialog(self.root)
             self.root.wait_window(dialog.window)
 
@@ -483,9 +1235,7 @@ class MedicationManager:
                 self.root.quit()
                 return
 
-            self.user_info = dialog.result
-            with open('user_info.json', 'w', encoding='utf-8') as f:
-                json.dump(self.user_info, f, ensure_ascii=False, indent=2)
+            self.registry.save_user_info(self.profile.id, dialog.result)
 
     def create_main_screen(self):
         # Main container with background
@@ -509,6 +1259,25 @@ class MedicationManager:
                    style='Primary.TButton',
                    command=self.edit_user_info).pack(side=tk.RIGHT)
 
+        ttk.Button(user_header,
+                   text="👥 프로필 추가",
+                   style='Primary.TButton',
+                   command=self.add_profile).pack(side=tk.RIGHT, padx=5)
+
+        # 프로필 선택
+        self.profile_var = tk.StringVar(value=self.profile.name)
+        profile_combo = ttk.Combobox(user_header, textvariable=self.profile_var,
+                                     values=[profile['name'] for profile in self.registry.profiles],
+                                     state='readonly', width=12, font=self.style.fonts['body'])
+        profile_combo.pack(side=tk.RIGHT, padx=5)
+        profile_combo.bind('<<ComboboxSelected>>',
+                           lambda e: self.switch_profile(self.registry.ids()[profile_combo.current()]))
+
+        ttk.Button(user_header,
+                   text="📤 엑셀 내보내기",
+                   style='Primary.TButton',
+                   command=self.export_medications).pack(side=tk.RIGHT, padx=5)
+
         # User details
         user_details = f"나이: {self.user_info['age']}세 | " \
                        f"성별: {self.user_info['gender']} | " \
@@ -518,6 +1287,10 @@ class MedicationManager:
                   text=user_details,
                   style='Body.TLabel').pack(pady=(10, 0))
 
+        self.next_dose_label = ttk.Label(user_card, style='Body.TLabel')
+        self.next_dose_label.pack(pady=(5, 0))
+        self.update_next_dose()
+
         # Add medication button
         ttk.Button(self.main_frame,
                    text="➕ 복용 약물 추가",
@@ -543,14 +1316,50 @@ class MedicationManager:
         self.root.wait_window(dialog.window)
 
         if dialog.result:
-            self.user_info = dialog.result
-            with open('user_info.json', 'w', encoding='utf-8') as f:
-                json.dump(self.user_info, f, ensure_ascii=False, indent=2)
+            self.registry.save_user_info(self.profile.id, dialog.result)
 
             # 메인 화면 새로고침
             self.main_frame.destroy()
             self.create_main_screen()
 
+    def add_profile(self):
+        dialog = UserInfoDialog(self.root)
+        self.root.wait_window(dialog.window)
+        if dialog.result:
+            profile_id = self.registry.add_profile(dialog.result)
+            self.notify_daemon()
+            self.switch_profile(profile_id)
+
+    def switch_profile(self, profile_id):
+        """선택한 프로필의 데이터를 (필요하면 읽어서) 메인 화면에 보여준다"""
+        if profile_id != self.profile.id:
+            self.profile = self.registry.activate(profile_id)
+        self.main_frame.destroy()
+        self.create_main_screen()
+
+    def evict_idle_profiles(self):
+        try:
+            self.registry.evict_idle()
+        except Exception as e:
+            # 저장하지 못한 프로필은 메모리에 남아 있고 다음 확인 때 다시 내려 본다
+            print(f"쓰지 않는 프로필을 내리지 못했습니다: {e}", file=sys.stderr)
+        finally:
+            self.root.after(self.EVICT_CHECK_MS, self.evict_idle_profiles)
+
+    def export_medications(self):
+        path = filedialog.asksaveasfilename(parent=self.root,
+                                            title="엑셀로 내보내기",
+                                            initialfile='my_medications.xlsx',
+                                            defaultextension='.xlsx',
+                                            filetypes=[("Excel", "*.xlsx")])
+        if not path:
+            return
+        try:
+            self.store.export_xlsx(path, MY_MEDICATION_COLUMNS)
+            messagebox.showinfo("성공", f"{os.path.basename(path)}(으)로 내보냈습니다.")
+        except Exception as e:
+            messagebox.showerror("오류", f"내보내기 중 오류가 발생했습니다: {str(e)}")
+
     def create_scrollable_frame(self):
         # Create canvas
         self.canvas = tk.Canvas(self.main_frame,
@@ -559,31 +1368,18 @@ class MedicationManager:
         scrollbar = ttk.Scrollbar(self.main_frame,
                                   orient=tk.VERTICAL,
                                   command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas, style='Main.TFrame')
-
-        # Configure scrolling
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-
-        self.canvas.create_window((0, 0),
-                                  window=self.scrollable_frame,
-                                  anchor="nw",
-                                  width=self.canvas.winfo_width())
-
-        # Update canvas width when medinote frame is resized
-        def on_frame_configure(event):
-            canvas_width = event.width - scrollbar.winfo_width()
-            self.canvas.itemconfig(1, width=canvas_width)
 
-        self.main_frame.bind('<Configure>', on_frame_configure)
+        # 보이는 행만 배너로 그리는 가상 목록 (캔버스 크기/스크롤도 여기서 처리)
+        self.medication_list = VirtualMedicationList(self.canvas, scrollbar, self)
 
-        self.canvas.configure(yscrollcommand=scrollbar.set)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
     def show_add_screen(self):
+        if self.medication_db is None:
+            # 카탈로그는 약물 추가 화면을 처음 열 때 읽는다
+            self.with_catalog(self.show_add_screen)
+            return
         add_window = tk.Toplevel(self.root)
         add_window.title("복용 약물 추가")
         add_window.geometry("600x500")
@@ -612,8 +1408,14 @@ class MedicationManager:
                                  font=self.style.fonts['body'])
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
+        # 오타/띄어쓰기/초성 검색 허용
+        fuzzy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame,
+                        text="오타 허용",
+                        variable=fuzzy_var).pack(side=tk.LEFT, padx=(10, 0))
+
         # Treeview for search results
-        columns = ('제품명', '주요 성분', '효능')
+        columns = ('제품명', '주요 성분', '효능', '주의')
         search_tree = ttk.Treeview(card_frame,
                                    columns=columns,
                                    show='headings',
@@ -622,25 +1424,14 @@ class MedicationManager:
         for col in columns:
             search_tree.heading(col, text=col)
             search_tree.column(col, width=120)
+        # 사용자 특이사항(알레르기/지병)이 주의사항/경고/부작용에 나오는 약
+        search_tree.tag_configure('flagged', background='#FDECEA')
+        # 선별 결과가 없으면 지금 백그라운드에서 만들기 시작한다
+        self.screening_table()
 
         search_tree.pack(fill=tk.BOTH, expand=True, pady=10)
 
-        def search_medications(*args):
-            search_text = search_var.get().lower()
-            for item in search_tree.get_children():
-                search_tree.delete(item)
-
-            for _, row in self.medication_db.iterrows():
-                if (search_text in str(row['Product Name']).lower() or
-                        search_text in str(row['Main Ingredient']).lower() or
-                        search_text in str(row['Effectiveness']).lower()):
-                    search_tree.insert('', tk.END, values=(
-                        row['Product Name'],
-                        row['Main Ingredient'],
-                        row['Effectiveness']
-                    ))
-
-        search_var.trace('w', search_medications)
+        SearchController(search_tree, search_var, fuzzy_var, self)
 
         def add_selected_medication():
             selected_item = search_tree.selection()
@@ -651,15 +1442,21 @@ class MedicationManager:
             selected_values = search_tree.item(selected_item)['values']
             selected_name = selected_values[0]
 
-            if not self.my_medications[
-                self.my_medications['Product Name'] == selected_name
-            ].empty:
+            if self.profile.medications.contains(selected_name):
                 messagebox.showwarning("경고", "이미 추가된 약물입니다.")
                 return
 
-            medication_info = self.medication_db[
-                self.medication_db['Product Name'] == selected_name
-                ].iloc[0]
+            doc_id = self.catalog_ids.get(product_key(selected_name))
+            if doc_id is None:
+                # 검색한 뒤에 카탈로그 파일이 바뀌어 약이 빠짐
+                messagebox.showwarning("경고", "약물 정보가 바뀌었습니다. 다시 검색해주세요.")
+                return
+            medication_info = self.catalog_row(doc_id)
+
+            conflicts = self.medication_interactions().conflicts(
+                *self.interaction_profile(medication_info))
+            if conflicts and not self.confirm_interactions(selected_name, conflicts, add_window):
+                return
 
             self.set_notification_time(medication_info, add_window)
 
@@ -668,10 +1465,117 @@ class MedicationManager:
                    style='Primary.TButton',
                    command=add_selected_medication).pack(pady=10)
 
+    def catalog_row(self, doc_id):
+        """카탈로그 한 행의 모든 컬럼 (긴 텍스트는 이때 저장소에서 읽는다), name = doc id"""
+        row = self.medication_db.loc[doc_id].copy()
+        for column, value in self.catalog_details.fetch(doc_id).items():
+            row[column] = value
+        return row
+
+    def catalog_columns(self, columns, db=None, details=None):
+        """카탈로그 전체의 지정한 컬럼 (색인/선별 결과를 다시 만들 때만 쓴다)
+
+        db/details를 주면 그 카탈로그에서 읽는다 (작업 스레드가 시작할 때 잡아 둔 카탈로그).
+        """
+        from column_store import HEAVY_COLUMNS
+
+        db = self.medication_db if db is None else db
+        details = self.catalog_details if details is None else details
+        heavy = [column for column in columns if column in HEAVY_COLUMNS]
+        frame = db[[column for column in columns if column not in heavy]]
+        if heavy:
+            frame = frame.join(details.frame(heavy))
+        return frame[list(columns)]
+
+    def fuzzy_search_index(self):
+        """오타 허용 검색 색인 (검색 작업 스레드에서 처음 필요할 때 만든다)"""
+        from fuzzy import FuzzyIndex
+
+        with self.fuzzy_lock:
+            if self.fuzzy_index is None:
+                db = self.medication_db
+                index = FuzzyIndex.build(db)
+                if db is not self.medication_db:
+                    return index  # 만드는 동안 카탈로그가 바뀜: 새 카탈로그의 색인은 다음에 만든다
+                self.fuzzy_index = index
+            return self.fuzzy_index
+
+    def screening_table(self):
+        """선택된 프로필의 특이사항으로 카탈로그를 선별한 결과 (메모나 카탈로그가 바뀔 때만 다시 만든다)
+
+        결과가 없거나 오래되었으면 None을 반환하고 백그라운드에서 만든다. 다 만들면 열린 검색 창이
+        다시 검색해 주의 표시를 채운다.
+        """
+        from screening import load_screening, note_terms
+
+        profile = self.profile
+        notes = (self.user_info or {}).get('notes', '')
+        key = (self.catalog_version, note_terms(notes))
+        if profile.screening is not None and profile.screening.key == key:
+            return profile.screening
+        if self.screening_pending == (profile.id, key):
+            return None
+        self.screening_pending = (profile.id, key)
+
+        # 만드는 동안 카탈로그가 바뀌어도 시작할 때의 카탈로그로 끝까지 만든다
+        db, details = self.medication_db, self.catalog_details
+        cache_path = self.registry.data_path(profile.id, 'screening.cache.pkl')
+
+        def work():
+            return load_screening(cache_path, lambda columns: self.catalog_columns(columns, db, details),
+                                  notes, key[0])
+
+        def done(table):
+            if self.screening_pending == (profile.id, key):
+                self.screening_pending = None
+            profile.screening = table
+            for controller in list(self.search_controllers):
+                controller.schedule()
+
+        def failed(error):
+            # 카탈로그를 다시 읽는 중에 이전 파일이 닫힌 경우 등: 다음 검색 때 다시 만든다
+            if self.screening_pending == (profile.id, key):
+                self.screening_pending = None
+
+        run_in_background(self.root, work, done, failed)
+        return None
+
+    def catalog_interactions(self):
+        """카탈로그의 성분 색인 (로더가 만들지 않았으면 처음 쓸 때 만든다)"""
+        if self.interaction_index is None:
+            self.interaction_index = InteractionIndex.build(
+                self.catalog_columns(['Main Ingredient', 'Medications to Avoid']))
+        return self.interaction_index
+
+    def interaction_profile(self, medication, from_catalog=True):
+        """(성분 번호, 피해야 할 성분 번호); 카탈로그 행은 미리 계산한 값을 쓴다"""
+        return self.catalog_interactions().profile_of(medication.name if from_catalog else None,
+                                                 medication.get('Main Ingredient'),
+                                                 medication.get('Medications to Avoid'))
+
+    def medication_interactions(self):
+        """선택된 프로필의 복용 약 상호작용 색인 (처음 필요할 때 만든다)"""
+        if self.profile.interactions is None:
+            checker = MedicationInteractions(self.catalog_interactions())
+            for _, medication in self.my_medications.iterrows():
+                checker.add(medication['Product Name'],
+                            *self.interaction_profile(medication, from_catalog=False))
+            self.profile.interactions = checker
+        return self.profile.interactions
+
+    def confirm_interactions(self, product_name, conflicts, parent):
+        lines = [f"• {name}: {', '.join(ingredients)}" for name, ingredients in sorted(conflicts.items())]
+        return messagebox.askyesno(
+            "상호작용 주의",
+            f"{product_name}은(는) 복용 중인 약과 함께 복용 시 주의가 필요합니다.\n\n"
+            + '\n'.join(lines)
+            + "\n\n의사 또는 약사와 상의하세요. 그래도 추가하시겠습니까?",
+            icon='warning', parent=parent)
+
     def set_notification_time(self, medication_info, parent_window):
         time_window = tk.Toplevel(parent_window)
         time_window.title("복용 시간 설정")
-        time_window.geometry("400x550")
+        time_window.geometry("400x700")
         time_window.configure(bg=self.style.colors['background'])
 
         # Card container
@@ -704,10 +1608,14 @@ class MedicationManager:
         time_entry.pack(pady=5)
 
         ttk.Label(time_frame,
-                  text="형식: HH:MM (예: 09:00)\n알림을 받지 않으려면 비워두세요",
+                  text="형식: HH:MM (예: 09:00)\n"
+                       "하루 여러 번이면 쉼표로 구분 (예: 08:00, 13:00, 19:00)\n"
+                       "알림을 받지 않으려면 비워두세요",
                   style='Body.TLabel',
                   justify='center').pack()
 
+        recurrence_inputs = RecurrenceInputs(time_frame)
+
         # Condition selection
         condition_frame = ttk.Frame(card_frame, style='Card.TFrame')
         condition_frame.pack(fill=tk.X, pady=20)
@@ -745,30 +1653,32 @@ class MedicationManager:
         condition_var.trace('w', update_explanation)
 
         def save_with_time():
-            time_str = time_entry.get().strip()
             notifications_enabled = notifications_var.get()
 
-            if time_str:  # If time is provided
-                try:
-                    datetime.strptime(time_str, "%H:%M")
-                except ValueError:
-                    messagebox.showerror("오류", "올바른 시간 형식을 입력하세요 (HH:MM)")
-                    return
-            else:  # If no time is provided
-                time_str = None
+            try:
+                recurrence = recurrence_inputs.parse(time_entry.get())
+            except ValueError as e:
+                messagebox.showerror("오류", str(e))
+                return
+            # If no time is provided, None
+            time_str = recurrence.time_text() if recurrence else None
 
             medication_info_dict = medication_info.to_dict()
             medication_info_dict['Notification Time'] = time_str
+            medication_info_dict['Recurrence'] = recurrence.rule_text() if recurrence else None
             medication_info_dict['Taking_Condition'] = condition_var.get()
             medication_info_dict['Notifications_Enabled'] = notifications_enabled
 
-            self.my_medications = pd.concat([
-                self.my_medications,
-                pd.DataFrame([medication_info_dict])
-            ], ignore_index=True)
+            row = self.profile.medications.append(medication_info_dict)
 
-            self.my_medications.to_excel('my_medications.xlsx', index=False)
-            self.update_medication_list()
+            self.store.add(medication_info_dict)
+            if self.profile.interactions is not None:
+                self.profile.interactions.add(medication_info['Product Name'],
+                                              *self.interaction_profile(medication_info))
+            self.schedule_view.append(medication_info_dict)
+            self.schedule_medication(medication_info_dict)
+            self.arm_notifications()
+            self.medication_list.insert_row(row)
 
             time_window.destroy()
             parent_window.destroy()
@@ -784,126 +1694,260 @@ class MedicationManager:
                    command=save_with_time).pack(pady=20)
 
     def update_medication_list(self):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        for _, medication in self.my_medications.iterrows():
-            banner = MedicationBanner(self.scrollable_frame,
-                                      medication,
-                                      self)
-            banner.pack(fill=tk.X, padx=5, pady=5)
+        self.medication_list.set_row_count(len(self.my_medications))
 
     def update_medication(self, product_name, updates):
-        mask = self.my_medications['Product Name'] == product_name
-        for field, value in updates.items():
-            self.my_medications.loc[mask, field] = value
-        self.my_medications.to_excel('my_medications.xlsx', index=False)
-        self.update_medication_list()
-
-        def delete_medication(self, product_name):
-            self.my_medications = self.my_medications[
-                self.my_medications['Product Name'] != product_name
-                ]
-            self.my_medications.to_excel('my_medications.xlsx', index=False)
+        rows = self.profile.medications.update(product_name, updates)
+        self.store.update(product_name, updates)
+        for row in rows:
+            medication = self.profile.medications.row(row)
+            self.schedule_view.set_row(row, medication)
+            self.schedule_medication(medication)
+            # 바뀐 행의 배너만 고친다
+            self.medication_list.update_row(int(row))
+        if len(rows):
+            self.arm_notifications()
 
     def delete_medication(self, product_name):
         """약물을 삭제하는 메소드"""
         try:
             # 해당 약물을 제외한 데이터만 남김
-            self.my_medications = self.my_medications[
-                self.my_medications['Product Name'] != product_name
-                ]
-            # 파일 저장 - 직접 파일명 사용
-            self.my_medications.to_excel('my_medications.xlsx', index=False)
-            # UI 업데이트
-            self.update_medication_list()
+            removed_rows = self.profile.medications.delete(product_name)
+            self.schedule_view.delete_rows(removed_rows)
+            # 변경 내용만 저널에 기록
+            self.store.delete(product_name)
+            self.scheduler.remove((self.profile.id, product_name))
+            if self.profile.interactions is not None:
+                self.profile.interactions.remove(product_name)
+            self.arm_notifications()
+            # UI 업데이트: 삭제된 행만 목록에서 빼낸다
+            for row in reversed(removed_rows):
+                self.medication_list.remove_row(int(row))
 
             messagebox.showinfo("성공", f"{product_name}이(가) 삭제되었습니다.")
         except Exception as e:
             messagebox.showerror("오류", f"약물 삭제 중 오류가 발생했습니다: {str(e)}")
 
+    def schedule_medication(self, medication, now=None):
+        """약물 한 건의 다음 알림 시각을 스케줄러에 (재)등록"""
+        self.scheduler.schedule((self.profile.id, medication['Product Name']),
+                                recurrence_of(medication),
+                                now or datetime.now(),
+                                enabled=is_enabled(medication.get('Notifications_Enabled')))
+
+    def reschedule_all(self):
+        """모든 프로필의 일정 배열에서 다음 알림 시각을 한 번에 계산해 힙을 다시 만든다"""
+        self.scheduler.load(self.registry.scheduler_entries(datetime.now()))
+        self.arm_notifications()
+
+    def update_next_dose(self):
+        now = datetime.now()
+        upcoming = self.schedule_view.next_due(now)
+        if upcoming is None:
+            self.next_dose_label.configure(text="⏭ 예정된 복용 알림이 없습니다")
+            return
+        rows, minutes_left = upcoming
+        due_at = now + timedelta(minutes=minutes_left)
+        text = f"⏭ 다음 복용: {due_at.strftime('%H:%M')} · {self.schedule_view.names[rows[0]]}"
+        if len(rows) > 1:
+            text += f" 외 {len(rows) - 1}개"
+        self.next_dose_label.configure(text=text)
+
+    def arm_notifications(self):
+        """다음 알림 시각까지 정확히 기다리도록 타이머를 다시 건다"""
+        if self.notification_after_id is not None:
+            self.root.after_cancel(self.notification_after_id)
+
+        if self.daemon_client is not None:
+            self.notification_after_id = self.root.after(self.DAEMON_POLL_MS, self.poll_daemon)
+            self.update_next_dose()
+            return
+
+        delay = self.MAX_NOTIFICATION_SLEEP_MS
+        next_at = self.scheduler.next_fire_time()
+        if next_at is not None:
+            remaining_ms = (next_at - datetime.now()).total_seconds() * 1000
+            delay = int(min(max(remaining_ms, 0), delay))
+        self.notification_after_id = self.root.after(delay, self.check_notifications)
+        self.update_next_dose()
+
+    def notify_daemon(self):
+        """저장소를 바꿨으면 데몬이 바로 다시 읽도록 알린다 (저장 스레드에서 호출된다)"""
+        client = self.daemon_client
+        if client is not None:
+            client.request_reload()
+
+    def find_medication(self, profile, product_name):
+        rows = profile.medications.rows_of(product_name)
+        return profile.medications.row(rows[0]) if len(rows) else None
+
+    def poll_daemon(self):
+        """데몬 소켓으로 받은 알림을 알림 창에 넘긴다"""
+        self.notification_after_id = None
+        client = self.daemon_client
+        now = datetime.now()
+        while True:
+            try:
+                reminder = client.reminders.get_nowait()
+            except queue.Empty:
+                break
+            profile = self.registry.get(reminder['profile'])
+            medications = []
+            for sent in reminder['medications']:
+                medication = self.find_medication(profile, sent['Product Name'])
+                medications.append(sent if medication is None else medication)
+            self.notification_window.add_batch(reminder['due_at'], medications, now, profile)
+
+        if not client.connected:
+            # 데몬이 종료되면 이 프로그램이 직접 알림을 맡는다
+            self.daemon_client = None
+            self.reschedule_all()
+            return
+        self.arm_notifications()
+
+    def record_doses(self, due_at, medications, taken, snoozed, profile):
+        """알림 창의 결과를 복용 기록에 남기고, 미룬 약은 잠시 뒤 다시 알린다"""
+        from adherence import MISSED, SNOOZED, TAKEN
+
+        pending = []
+        for medication, was_taken in zip(medications, taken):
+            if was_taken:
+                event = TAKEN
+            elif snoozed:
+                event = SNOOZED
+                pending.append(medication)
+            else:
+                event = MISSED
+            profile.adherence.record(medication['Product Name'], event, due_at)
+
+        if pending:
+            def remind():
+                self.snoozed.pop(after_id, None)
+                self.notification_window.add_batch(due_at, pending, datetime.now(), profile)
+
+            after_id = self.root.after(self.SNOOZE_MS, remind)
+            self.snoozed[after_id] = (due_at, pending, profile)
+
     def check_notifications(self):
-        current_time = datetime.now().strftime("%H:%M")
-        for _, medication in self.my_medications.iterrows():
-            # Only check medications with enabled notifications and set times
-            if (medication.get('Notifications_Enabled', True) and
-                    pd.notna(medication['Notification Time']) and
-                    medication['Notification Time'] == current_time):
-                # Create styled notification window
-                notif_window = tk.Toplevel(self.root)
-                notif_window.title("복용 알림")
-                notif_window.geometry("400x300")
-                notif_window.configure(bg=self.style.colors['background'])
-
-                # Card container
-                card_frame = ttk.Frame(notif_window, style='Card.TFrame', padding="20")
-                card_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-
-                # Notification icon and title
-                ttk.Label(card_frame,
-                          text="⏰ 복용 시간 알림",
-                          style='Title.TLabel').pack(pady=(0, 20))
-
-                # Medication name
-                ttk.Label(card_frame,
-                          text=f"💊 {medication['Product Name']}",
-                          style='Heading.TLabel').pack(pady=(0, 10))
-
-                # Taking condition
-                if 'Taking_Condition' in medication:
-                    condition_text = {
-                        '식전': '식사하기 30분 전에 복용하세요.',
-                        '식후': '식사 직후에 복용하세요.',
-                        '공복': '식사와 식사 사이 충분한 시간이 지난 후 복용하세요.'
-                    }.get(medication['Taking_Condition'], '')
-
-                    if condition_text:
-                        ttk.Label(card_frame,
-                                  text=condition_text,
-                                  style='Body.TLabel',
-                                  wraplength=300).pack(pady=(0, 10))
-
-                # How to take it
-                ttk.Label(card_frame,
-                          text=f"📝 {medication['How to Take It']}",
-                          style='Body.TLabel',
-                          wraplength=300).pack(pady=(0, 20))
-
-                # Close button
-                ttk.Button(card_frame,
-                           text="✔️ 확인",
-                           style='Primary.TButton',
-                           command=notif_window.destroy).pack()
-
-        self.root.after(60000, self.check_notifications)
-
-        def edit_user_info(self):
-            dialog = UserInfoDialog(self.root)
+        self.notification_after_id = None
+        now = datetime.now()
 
-            # Fill current info
-            for field, value in self.user_info.items():
-                if field == "notes":
-                    dialog.entries[field].insert("1.0", str(value))
-                elif field == "gender":
-                    dialog.entries[field].set(value)
-                else:
-                    dialog.entries[field].insert(0, str(value))
+        # 같은 프로필, 같은 시각에 도래한 약은 알림 하나로 묶는다
+        batches = {}
+        for (profile_id, product_name), due_at in self.scheduler.pop_due(now):
+            profile = self.registry.get(profile_id)
+            medication = self.find_medication(profile, product_name)
+            if medication is not None:
+                batches.setdefault((due_at, profile_id), (profile, []))[1].append(medication)
+
+        for due_at, profile_id in sorted(batches):
+            profile, medications = batches[(due_at, profile_id)]
+            self.notification_window.add_batch(due_at, medications, now, profile)
+
+        self.arm_notifications()
 
-            self.root.wait_window(dialog.window)
 
-            if dialog.result:
-                self.user_info = dialog.result
-                with open('user_info.json', 'w', encoding='utf-8') as f:
-                    json.dump(self.user_info, f, ensure_ascii=False, indent=2)
+def print_adherence_report(log, date_from=None, date_to=None):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = datetime.strptime(date_from, "%Y-%m-%d") if date_from else today.replace(day=1)
+    end = datetime.strptime(date_to, "%Y-%m-%d") if date_to else today
+    summary = log.summary(start, end + timedelta(days=1))
 
-                # Refresh medinote screen
-                self.main_frame.destroy()
-                self.create_main_screen()
+    print(f"복용 기록 {start:%Y-%m-%d} ~ {end:%Y-%m-%d} (예정 복용일 기준)")
+    if not summary:
+        print("기록이 없습니다.")
+    for name, counts in sorted(summary.items()):
+        rate = f"{counts['rate']:.0%}" if counts['rate'] is not None else "-"
+        print(f"{name}: 복용률 {rate} "
+              f"(복용 {counts['taken']}, 놓침 {counts['missed']}, 미룸 {counts['snoozed']})")
 
 
-def main():
+def import_catalog_file(path):
+    from catalog_cache import load_catalog
+
+    def progress(done, total):
+        if total:
+            print(f"\r{done:,} / {total:,}행 ({done / total:.0%})", end='', file=sys.stderr, flush=True)
+        else:
+            print(f"\r{done:,}행", end='', file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    catalog = load_catalog(path, progress=progress, rebuild=True)
+    catalog.details.close()
+    print(file=sys.stderr)
+    print(f"{path}: 약물 {len(catalog.frame):,}건 ({time.perf_counter() - started:.1f}초)")
+
+
+def given_path(path, invoked_from):
+    """명령줄에서 받은 경로: 실행한 위치가 따로 있으면(python -m medinote) 그 위치 기준으로 바꾼다"""
+    return path if invoked_from is None else os.path.normpath(os.path.join(invoked_from, path))
+
+
+def main(argv=None, invoked_from=None):
+    """invoked_from: 앱 폴더로 옮겨 오기 전의 작업 폴더 (사용자가 준 상대 경로는 그 기준)"""
+    parser = argparse.ArgumentParser(description="복용 약물 관리")
+    parser.add_argument('command', nargs='?', default='gui',
+                        choices=['gui', 'migrate-sqlite', 'report', 'daemon', 'import-catalog'],
+                        help="gui: 프로그램 실행 (기본값), migrate-sqlite: xlsx/저널 데이터를 SQLite로 옮김, "
+                             "report: 기간별 복용률 출력, daemon: 창 없이 복용 알림만 실행, "
+                             "import-catalog: 카탈로그를 다시 읽어 캐시를 만듦")
+    parser.add_argument('--backend', default='journal', choices=['journal', 'sqlite'],
+                        help="복용 약물/카탈로그 저장 방식")
+    parser.add_argument('--db', help="SQLite 데이터베이스 파일 (기본값: medinote.db)")
+    parser.add_argument('--catalog', help="약물 카탈로그 파일 (xlsx 또는 csv, 기본값: medications.xlsx)")
+    parser.add_argument('--from', dest='date_from', help="report 시작일 (YYYY-MM-DD, 기본값: 이번 달 1일)")
+    parser.add_argument('--to', dest='date_to', help="report 종료일 (YYYY-MM-DD, 포함, 기본값: 오늘)")
+    parser.add_argument('--profile', help="report 대상 프로필 id (profiles.json 참고, 기본값: default)")
+    parser.add_argument('--startup-timing', action='store_true',
+                        help="gui: 시작 단계별 경과 시간(ms)을 JSON으로 출력하고 종료")
+    add_daemon_arguments(parser)
+    args = parser.parse_args(argv)
+    # 기본 파일은 앱 폴더의 것을 쓰고, 직접 준 경로만 실행한 위치 기준으로 바꾼다
+    args.db = given_path(args.db, invoked_from) if args.db else 'medinote.db'
+    args.catalog = given_path(args.catalog, invoked_from) if args.catalog else 'medications.xlsx'
+    if args.sinks:
+        args.sinks = ['log:' + given_path(spec[len('log:'):], invoked_from)
+                      if spec.startswith('log:') and spec != 'log:' else spec
+                      for spec in args.sinks]
+
+    if args.command == 'daemon':
+        run_daemon(args.backend, args.db, args.sinks or ('stdout', 'socket'))
+        return
+
+    if args.command == 'report':
+        from adherence import AdherenceLog
+        from profiles import DEFAULT_PROFILE, ProfileRegistry
+
+        registry = ProfileRegistry(backend=args.backend, db_path=args.db)
+        print_adherence_report(AdherenceLog(registry.data_path(args.profile or DEFAULT_PROFILE, 'adherence')),
+                               args.date_from, args.date_to)
+        return
+
+    if args.command == 'migrate-sqlite':
+        from profiles import ProfileRegistry
+        from sqlite_store import migrate_from_files
+
+        # 프로필마다 자기 저널/예전 엑셀 파일을 그 프로필의 행으로 옮긴다
+        registry = ProfileRegistry()
+        profiles = [(profile_id, registry.data_path(profile_id, 'my_medications'),
+                     registry.data_path(profile_id, 'my_medications.xlsx'))
+                    for profile_id in registry.ids()]
+        catalog_rows, medication_rows = migrate_from_files(args.db, args.catalog, profiles,
+                                                           columns=MY_MEDICATION_COLUMNS)
+        print(f"{args.db}: 카탈로그 {catalog_rows}건을 옮겼습니다.")
+        for profile_id, count in medication_rows.items():
+            print(f"  {registry.name_of(profile_id)} ({profile_id}): 복용 약물 {count}건")
+        return
+
+    if args.command == 'import-catalog':
+        import_catalog_file(args.catalog)
+        return
+
     root = tk.Tk()
     root.title("복용 약물 관리")
+    timing = StartupTiming(root) if args.startup_timing else None
+    if timing is not None:
+        timing.mark('imports_ms')
 
     # Set window icon (if available)
     try:
@@ -923,8 +1967,24 @@ def main():
     center_y = int(screen_height / 2 - window_height / 2)
     root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
 
-    app = MedicationManager(root)
+    app = MedicationManager(root, backend=args.backend, db_path=args.db, timing=timing,
+                            catalog_path=args.catalog)
+    if timing is not None:
+        timing.mark('window_ms')
     root.mainloop()
+    # 남은 쓰기를 마친 뒤(데몬에도 알린 뒤) 연결을 닫는다
+    try:
+        if app.registry is not None:
+            app.registry.close()
+    finally:
+        if app.daemon_client is not None:
+            app.daemon_client.close()
+    if app.catalog_details is not None:
+        app.catalog_details.close()
+    if app.catalog_store is not None:
+        app.catalog_store.close()
+    if timing is not None:
+        timing.report()
 
 
 if __name__ == "__main__":
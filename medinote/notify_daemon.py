@@ -0,0 +1,436 @@
+"""Tk 없이 동작하는 복용 알림 데몬
+
+모든 프로필의 복용 약물 저장소를 읽기 전용으로 열어 다음 복용 시각까지 잠들었다가, 알림을 싱크(표준 출력,
+로그 파일, 로컬 소켓)로 내보낸다. GUI는 소켓에 구독해 알림 창만 띄운다.
+
+알림에는 복용자 이름과 약 목록이 들어 있으므로 소켓은 현재 사용자만 쓸 수 있게 연다: AF_UNIX를 쓸 수
+있으면 권한 0600의 소켓 파일, 아니면(Windows) 127.0.0.1 TCP 포트와 권한 0600의 토큰 파일을 쓰고
+연결하자마자 토큰을 보낸 구독자만 받는다.
+
+    python notify_daemon.py --sink stdout --sink log:reminders.log --sink socket
+"""
+import argparse
+import errno
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from scheduler import DoseScheduler
+from search_index import file_signature
+
+
+DEFAULT_PORT = 47623
+SOCKET_PATH = 'medinote.sock'
+TOKEN_PATH = 'medinote.token'  # TCP로 열었을 때의 {'port', 'token'}
+HAS_UNIX_SOCKETS = hasattr(socket, 'AF_UNIX')
+REMINDER_FIELDS = ('Product Name', 'Taking_Condition', 'How to Take It')
+
+
+def reminder_text(reminder):
+    names = []
+    for medication in reminder['medications']:
+        condition = medication.get('Taking_Condition')
+        names.append(f"{medication['Product Name']}({condition})" if condition
+                     else medication['Product Name'])
+    due_at = datetime.fromisoformat(reminder['due_at'])
+    return (f"[{due_at:%Y-%m-%d %H:%M}] {reminder['profile_name']} 복용 알림: "
+            + ', '.join(names))
+
+
+def close_socket(conn):
+    # makefile()로 읽는 스레드가 있어도 상대편이 연결 종료를 알 수 있도록 먼저 shutdown
+    try:
+        conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conn.close()
+
+
+class StdoutSink:
+    def deliver(self, reminder):
+        print(reminder_text(reminder), flush=True)
+
+    def close(self):
+        pass
+
+
+class LogFileSink:
+    def __init__(self, path):
+        self.path = path
+
+    def deliver(self, reminder):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(reminder_text(reminder) + '\n')
+
+    def close(self):
+        pass
+
+
+def unix_socket_in_use(path):
+    """path에 소켓 파일이 있고 누군가 듣고 있는지 (남은 파일만 있으면 False)"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+class SocketSink:
+    """현재 사용자만 쓸 수 있는 로컬 소켓으로 알림을 JSON lines로 보낸다
+
+    port가 없고 AF_UNIX를 쓸 수 있으면 path의 소켓 파일(권한 0600)로, 아니면 127.0.0.1:port로 연다.
+    TCP일 때는 토큰을 TOKEN_PATH에 적어 두고, 첫 줄로 그 토큰을 보낸 구독자에게만 알림을 보낸다.
+    구독자(GUI)가 'reload' 한 줄을 보내면 데몬이 저장소를 바로 다시 읽는다.
+    다른 데몬이 이미 쓰고 있으면 errno.EADDRINUSE인 OSError를 던진다.
+    """
+
+    def __init__(self, daemon, port=None, path=SOCKET_PATH):
+        self.daemon = daemon
+        self.lock = threading.Lock()
+        self.clients = []
+        self.path = None
+        self.token = None
+        if port is None and HAS_UNIX_SOCKETS:
+            self.server = self.open_unix(path)
+            self.path = path
+        else:
+            self.server = socket.create_server(('127.0.0.1', DEFAULT_PORT if port is None else port))
+            self.token = secrets.token_hex(16)
+            # storage는 pandas를 읽으므로 여기서 읽는다 (GUI가 이 모듈을 읽을 때 같이 읽지 않게)
+            from storage import atomic_write
+
+            # atomic_write는 mkstemp로 만든 파일을 옮기므로 권한이 0600이다
+            atomic_write(TOKEN_PATH, lambda f: json.dump(
+                {'port': self.server.getsockname()[1], 'token': self.token}, f))
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    @staticmethod
+    def open_unix(path):
+        if os.path.exists(path):
+            if unix_socket_in_use(path):
+                raise OSError(errno.EADDRINUSE, "다른 알림 데몬이 이미 실행 중입니다", path)
+            os.remove(path)  # 비정상 종료로 남은 소켓 파일
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # bind가 만드는 파일이 처음부터 다른 사용자에게 열려 있지 않도록 umask를 잠시 좁힌다
+        umask = os.umask(0o177)
+        try:
+            server.bind(path)
+        except OSError:
+            server.close()
+            raise
+        finally:
+            os.umask(umask)
+        server.listen()
+        return server
+
+    def accept_loop(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return  # close()로 서버 소켓이 닫힘
+            threading.Thread(target=self.read_loop, args=(client,), daemon=True).start()
+
+    def read_loop(self, client):
+        with client.makefile('r', encoding='utf-8') as lines:
+            try:
+                if self.token is not None:
+                    # 토큰 파일을 읽을 수 있는 사용자만 구독할 수 있다
+                    client.settimeout(5)
+                    line = lines.readline().strip()
+                    client.settimeout(None)
+                    if not hmac.compare_digest(line.encode('utf-8'), self.token.encode('utf-8')):
+                        raise OSError("잘못된 토큰")
+                with self.lock:
+                    self.clients.append(client)
+                for line in lines:
+                    if line.strip() == 'reload':
+                        self.daemon.request_reload()
+            except (OSError, ValueError):
+                pass
+        self.drop(client)
+
+    def drop(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+        close_socket(client)
+
+    def deliver(self, reminder):
+        data = (json.dumps(reminder, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.sendall(data)
+            except OSError:
+                self.drop(client)
+
+    def close(self):
+        self.server.close()
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            close_socket(client)
+        for path in (self.path, TOKEN_PATH if self.token is not None else None):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+
+def parse_sink(spec):
+    """'stdout', 'log:경로', 'socket'(소켓 파일, 안 되면 TCP) 또는 'socket:포트'(토큰을 쓰는 TCP)
+    -> (종류, 값); 잘못된 값이면 ValueError"""
+    kind, _, value = spec.partition(':')
+    if kind == 'stdout' and not value:
+        return kind, None
+    if kind == 'log':
+        return kind, value or 'reminders.log'
+    if kind == 'socket':
+        if not value:
+            return kind, None
+        if value.isdigit() and 0 < int(value) < 65536:
+            return kind, int(value)
+        raise ValueError(f"소켓 포트는 1~65535 사이의 숫자여야 합니다: {spec}")
+    raise ValueError(f"알 수 없는 알림 출력: {spec} (stdout, log:경로, socket[:포트] 중 하나)")
+
+
+def sink_argument(spec):
+    """--sink 값 확인 (잘못되면 argparse가 사용법과 함께 오류를 보여 주고 종료한다)"""
+    try:
+        parse_sink(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return spec
+
+
+def make_sink(spec, daemon):
+    kind, value = parse_sink(spec)
+    if kind == 'stdout':
+        return StdoutSink()
+    if kind == 'log':
+        return LogFileSink(value)
+    return SocketSink(daemon, value)
+
+
+class NotificationDaemon:
+    # 저장소 파일이 바뀌었는지 이 간격마다 확인한다 (GUI가 'reload'를 보내면 바로 다시 읽음)
+    RELOAD_CHECK_SECONDS = 30
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.stores = {}  # profile id -> 읽기 전용 저장소
+        self.sinks = []
+        # 모든 프로필의 알림을 힙 하나로 관리한다 (key = (프로필 id, 약물명))
+        self.scheduler = DoseScheduler()
+        self.medications = {}  # key -> 알림에 보여줄 필드
+        self.signature = None
+        self.checked_at = None
+        self.delivered = set()  # 마지막으로 확인한 분에 이미 내보낸 (key, 예정 시각)
+        self.reload_requested = False
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+
+    def current_signature(self):
+        """프로필 목록 파일과 프로필별 저장소의 변경 여부를 나타내는 값"""
+        return (file_signature(self.registry.path),
+                tuple(self.stores[profile_id].signature() for profile_id in self.registry.ids()))
+
+    def reload(self):
+        # pandas를 쓰는 모듈은 여기서 읽는다 (GUI는 DaemonClient만 쓰므로 시작할 때 읽지 않는다)
+        from schedule_view import SCHEDULE_COLUMNS, ScheduleView
+        from storage import plain_value
+
+        self.reload_requested = False
+        if file_signature(self.registry.path) != self.registry.signature:
+            self.registry.reload_list()
+        for profile_id in list(self.stores):
+            if profile_id not in self.registry.ids():
+                self.stores.pop(profile_id).close()
+        for profile_id in self.registry.ids():
+            if profile_id not in self.stores:
+                self.stores[profile_id] = self.registry.open_store(profile_id, read_only=True)
+        # 읽기 전에 기록해 두어야 읽는 도중 바뀐 내용도 다음 확인 때 잡힌다
+        self.signature = self.current_signature()
+
+        # 마지막으로 확인한 시각부터 다시 계산해 그사이 지난 알림을 놓치지 않되,
+        # 이미 내보낸 알림은 다음 복용 시각으로 넘긴다
+        start = self.checked_at or datetime.now()
+        self.medications = {}
+        entries = []
+        for profile_id in self.registry.ids():
+            frame = self.stores[profile_id].load(SCHEDULE_COLUMNS)
+            for record in frame.to_dict('records'):
+                self.medications[(profile_id, record['Product Name'])] = {
+                    field: plain_value(record.get(field)) for field in REMINDER_FIELDS}
+            for name, recurrence, fire_at in ScheduleView.from_frame(frame).scheduler_entries(start):
+                key = (profile_id, name)
+                if (key, fire_at) in self.delivered:
+                    fire_at = recurrence.next_occurrence(fire_at + timedelta(minutes=1))
+                    if fire_at is None:
+                        continue
+                entries.append((key, recurrence, fire_at))
+        self.scheduler.load(entries)
+
+    def request_reload(self):
+        self.reload_requested = True
+        self.wake.set()
+
+    def deliver_due(self, now):
+        minute = now.replace(second=0, microsecond=0)
+        self.delivered = {item for item in self.delivered if item[1] >= minute}
+        batches = {}
+        for key, due_at in self.scheduler.pop_due(now):
+            if due_at >= minute:
+                self.delivered.add((key, due_at))
+            medication = self.medications.get(key)
+            if medication is not None:
+                batches.setdefault((due_at, key[0]), []).append(medication)
+        self.checked_at = now
+
+        for due_at, profile_id in sorted(batches):
+            reminder = {'type': 'reminder',
+                        'due_at': due_at.isoformat(),
+                        'profile': profile_id,
+                        'profile_name': self.registry.name_of(profile_id),
+                        'medications': batches[(due_at, profile_id)]}
+            for sink in self.sinks:
+                try:
+                    sink.deliver(reminder)
+                except OSError as e:
+                    print(f"알림 전달 실패 ({type(sink).__name__}): {e}", file=sys.stderr)
+
+    def run(self):
+        self.reload()
+        while not self.stopped.is_set():
+            if self.reload_requested or self.current_signature() != self.signature:
+                self.reload()
+            now = datetime.now()
+            self.deliver_due(now)
+
+            # 다음 복용 시각까지 잠든다; 저장소 변경 확인 주기보다 오래 자지는 않는다
+            timeout = self.RELOAD_CHECK_SECONDS
+            next_at = self.scheduler.next_fire_time()
+            if next_at is not None:
+                timeout = min(timeout, max((next_at - datetime.now()).total_seconds(), 0))
+            self.wake.wait(timeout)
+            self.wake.clear()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        for store in self.stores.values():
+            store.close()
+
+
+class DaemonClient:
+    """GUI 쪽 구독자: 데몬 소켓에서 받은 알림을 큐에 쌓아 두면 Tk 루프가 꺼내 간다"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.reminders = queue.Queue()
+        self.connected = True
+        threading.Thread(target=self.read_loop, daemon=True).start()
+
+    @classmethod
+    def connect(cls, path=SOCKET_PATH, timeout=0.5):
+        """데몬이 떠 있으면 연결한 클라이언트, 아니면 None
+
+        소켓 파일이 있으면 그쪽으로, 없으면 토큰 파일에 적힌 TCP 포트로 연결해 토큰을 보낸다.
+        """
+        conn = None
+        try:
+            if HAS_UNIX_SOCKETS and os.path.exists(path):
+                conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                conn.settimeout(timeout)
+                conn.connect(path)
+            elif os.path.exists(TOKEN_PATH):
+                with open(TOKEN_PATH, 'r', encoding='utf-8') as f:
+                    endpoint = json.load(f)
+                conn = socket.create_connection(('127.0.0.1', endpoint['port']), timeout=timeout)
+                conn.sendall((endpoint['token'] + '\n').encode('utf-8'))
+            else:
+                return None
+        except (OSError, ValueError, KeyError):
+            if conn is not None:
+                conn.close()
+            return None
+        conn.settimeout(None)
+        return cls(conn)
+
+    def read_loop(self):
+        with self.conn.makefile('r', encoding='utf-8') as lines:
+            try:
+                for line in lines:
+                    try:
+                        message = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if message.get('type') == 'reminder':
+                        message['due_at'] = datetime.fromisoformat(message['due_at'])
+                        self.reminders.put(message)
+            except OSError:
+                pass
+        self.connected = False
+
+    def request_reload(self):
+        try:
+            self.conn.sendall(b'reload\n')
+        except OSError:
+            self.connected = False
+
+    def close(self):
+        self.connected = False
+        close_socket(self.conn)
+
+
+def run_daemon(backend='journal', db_path='medinote.db', sink_specs=('stdout', 'socket')):
+    from profiles import ProfileRegistry
+
+    daemon = NotificationDaemon(ProfileRegistry(backend=backend, db_path=db_path))
+    try:
+        for spec in sink_specs:
+            daemon.sinks.append(make_sink(spec, daemon))
+    except OSError as e:
+        daemon.close()
+        if e.errno == errno.EADDRINUSE:
+            sys.exit(f"알림 데몬을 시작하지 못했습니다: 다른 알림 데몬이 이미 실행 중입니다 ({spec})")
+        sys.exit(f"알림 데몬을 시작하지 못했습니다 ({spec}): {e}")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+def add_daemon_arguments(parser):
+    parser.add_argument('--sink', dest='sinks', action='append', type=sink_argument,
+                        help="알림 출력: stdout, log:경로, socket[:포트] (여러 번 지정 가능, "
+                             "기본값: stdout과 socket; 포트를 주면 소켓 파일 대신 토큰을 쓰는 TCP)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="복용 알림 데몬")
+    parser.add_argument('--backend', default='journal', choices=['journal', 'sqlite'],
+                        help="복용 약물 저장 방식")
+    parser.add_argument('--db', default='medinote.db', help="SQLite 데이터베이스 파일")
+    add_daemon_arguments(parser)
+    args = parser.parse_args(argv)
+    run_daemon(args.backend, args.db, args.sinks or ('stdout', 'socket'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""여러 사용자(프로필) 관리: 프로필 목록만 들고 있고, 프로필별 데이터는 선택할 때 읽는다
+
+기본 프로필은 예전과 같은 위치(user_info.json, my_medications.*, adherence.*)를 그대로 쓰고,
+추가한 프로필은 profiles/<id>/ 아래에 같은 이름의 파일을 둔다. SQLite 저장소는 하나의
+데이터베이스에서 profile 컬럼으로 구분한다.
+"""
+import json
+import os
+import time
+
+from adherence import AdherenceLog
+from medication_table import MedicationTable
+from schedule_view import SCHEDULE_COLUMNS, ScheduleView
+from search_index import file_signature
+from sqlite_store import SQLiteStore
+from storage import BackgroundWriter, JournalStore, atomic_write
+
+
+DEFAULT_PROFILE = 'default'
+
+
+class Profile:
+    """선택되어 메모리에 올라온 프로필 한 명의 데이터"""
+
+    def __init__(self, profile_id, name, store, medications, user_info, adherence):
+        self.id = profile_id
+        self.name = name
+        self.store = store
+        self.medications = medications  # MedicationTable
+        self.schedule_view = ScheduleView.from_frame(medications.frame)
+        self.user_info = user_info
+        self.adherence = adherence
+        self.interactions = None  # 약물 상호작용 확인용 색인 (처음 약을 추가할 때 만든다)
+        self.screening = None  # 특이사항 선별 결과 (처음 검색할 때 만든다)
+        self.last_used = time.monotonic()
+
+
+class ProfileRegistry:
+    # 이 시간 동안 쓰지 않은 프로필은 메모리에서 내린다 (선택된 프로필은 제외)
+    IDLE_SECONDS = 10 * 60
+
+    def __init__(self, path='profiles.json', backend='journal', db_path='medinote.db',
+                 columns=None, on_flush=None):
+        self.path = path
+        self.backend = backend
+        self.db_path = db_path
+        self.columns = columns
+        self.on_flush = on_flush  # 프로필 저장소의 백그라운드 쓰기가 끝날 때마다 호출
+        self.loaded = {}  # profile id -> Profile
+        # 프로필을 내려도 복용 기록은 하나만 둔다: 알림 창/미루기가 내린 프로필을 아직 들고 있다가
+        # 기록하면, 다시 읽은 프로필과 같은 파일에 서로 다른 약물 번호를 쓰게 된다
+        self.adherence_logs = {}  # profile id -> AdherenceLog
+        self.profiles = []  # [{'id', 'name'}] 등록 순서
+        self.active = DEFAULT_PROFILE
+        self.signature = None
+        self.reload_list()
+
+    def reload_list(self):
+        self.signature = file_signature(self.path)
+        if self.signature is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                registry = json.load(f)
+            self.profiles = registry['profiles']
+            self.active = registry.get('active', DEFAULT_PROFILE)
+        else:
+            # 프로필 목록이 없으면 예전 단일 사용자 데이터를 기본 프로필로 본다
+            info = self.read_user_info(DEFAULT_PROFILE)
+            self.profiles = [{'id': DEFAULT_PROFILE,
+                              'name': info['name'] if info else '기본 사용자'}]
+
+    def save_list(self):
+        atomic_write(self.path,
+                     lambda f: json.dump({'profiles': self.profiles, 'active': self.active},
+                                         f, ensure_ascii=False, indent=2))
+        self.signature = file_signature(self.path)
+
+    def ids(self):
+        return [profile['id'] for profile in self.profiles]
+
+    def name_of(self, profile_id):
+        for profile in self.profiles:
+            if profile['id'] == profile_id:
+                return profile['name']
+        return profile_id
+
+    def data_path(self, profile_id, filename):
+        if profile_id == DEFAULT_PROFILE:
+            return filename
+        return os.path.join('profiles', profile_id, filename)
+
+    def ensure_dir(self, profile_id):
+        if profile_id != DEFAULT_PROFILE:
+            os.makedirs(os.path.join('profiles', profile_id), exist_ok=True)
+
+    def read_user_info(self, profile_id):
+        path = self.data_path(profile_id, 'user_info.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_user_info(self, profile_id, user_info):
+        path = self.data_path(profile_id, 'user_info.json')
+        self.ensure_dir(profile_id)
+        atomic_write(path, lambda f: json.dump(user_info, f, ensure_ascii=False, indent=2))
+        for profile in self.profiles:
+            if profile['id'] == profile_id:
+                profile['name'] = user_info['name']
+        if profile_id in self.loaded:
+            self.loaded[profile_id].user_info = user_info
+            self.loaded[profile_id].name = user_info['name']
+        self.save_list()
+
+    def add_profile(self, user_info):
+        """새 프로필을 등록하고 id를 반환"""
+        existing = set(self.ids())
+        number = len(self.profiles)
+        while f'p{number}' in existing:
+            number += 1
+        profile_id = f'p{number}'
+        self.profiles.append({'id': profile_id, 'name': user_info['name']})
+        self.save_user_info(profile_id, user_info)
+        return profile_id
+
+    def open_store(self, profile_id, read_only=False):
+        if self.backend == 'sqlite':
+            return SQLiteStore(self.db_path, profile=profile_id)
+        return JournalStore(self.data_path(profile_id, 'my_medications'),
+                            legacy_xlsx=self.data_path(profile_id, 'my_medications.xlsx'),
+                            read_only=read_only)
+
+    def get(self, profile_id):
+        """프로필 데이터를 반환; 메모리에 없으면 이때 읽는다"""
+        profile = self.loaded.get(profile_id)
+        if profile is None:
+            self.ensure_dir(profile_id)
+            store = self.open_store(profile_id)
+            medications = MedicationTable.from_frame(store.load(self.columns), self.columns)
+            # 화면에서 바꾼 내용은 백그라운드에서 모아서 쓴다
+            profile = Profile(profile_id, self.name_of(profile_id),
+                              BackgroundWriter(store, self.on_flush), medications,
+                              self.read_user_info(profile_id),
+                              self.adherence_log(profile_id))
+            self.loaded[profile_id] = profile
+        profile.last_used = time.monotonic()
+        return profile
+
+    def adherence_log(self, profile_id):
+        log = self.adherence_logs.get(profile_id)
+        if log is None:
+            log = self.adherence_logs[profile_id] = AdherenceLog(self.data_path(profile_id, 'adherence'))
+        return log
+
+    def activate(self, profile_id):
+        self.active = profile_id
+        self.save_list()
+        return self.get(profile_id)
+
+    def evict_idle(self, now=None):
+        """오래 쓰지 않은 프로필의 저장소를 닫고 메모리에서 내린 id 목록을 반환한다
+
+        남은 쓰기가 실패한 프로필은 변경을 잃지 않도록 메모리에 그대로 두고 (저장소가 계속 재시도),
+        다른 프로필을 모두 처리한 뒤 그 오류를 던진다.
+        """
+        now = now if now is not None else time.monotonic()
+        idle = [profile_id for profile_id, profile in self.loaded.items()
+                if profile_id != self.active and now - profile.last_used >= self.IDLE_SECONDS]
+        evicted, error = [], None
+        for profile_id in idle:
+            store = self.loaded[profile_id].store
+            try:
+                # close()는 실패해도 저장소를 닫으므로, 먼저 flush()로 남은 쓰기가 끝났는지 확인한다
+                store.flush()
+                store.close()
+            except Exception as e:
+                error = error or e
+                continue
+            del self.loaded[profile_id]
+            evicted.append(profile_id)
+        if error is not None:
+            raise error
+        return evicted
+
+    def schedule_view(self, profile_id):
+        """알림 계산용 일정 배열; 메모리에 없는 프로필은 일정 컬럼만 읽고 바로 닫는다"""
+        profile = self.loaded.get(profile_id)
+        if profile is not None:
+            return profile.schedule_view
+        store = self.open_store(profile_id, read_only=True)
+        try:
+            return ScheduleView.from_frame(store.load(SCHEDULE_COLUMNS))
+        finally:
+            store.close()
+
+    def scheduler_entries(self, now):
+        """모든 프로필의 ((프로필 id, 약물명), 반복 규칙, 다음 복용 시각) 목록"""
+        entries = []
+        for profile_id in self.ids():
+            for name, recurrence, fire_at in self.schedule_view(profile_id).scheduler_entries(now):
+                entries.append(((profile_id, name), recurrence, fire_at))
+        return entries
+
+    def flush(self):
+        """메모리에 있는 프로필의 남은 쓰기를 모두 마칠 때까지 기다린다"""
+        for profile in self.loaded.values():
+            profile.store.flush()
+
+    def close(self):
+        """모든 프로필 저장소를 닫는다 (남은 쓰기를 마친 뒤); 실패한 쓰기가 있으면 마지막에 던진다"""
+        error = None
+        for profile in self.loaded.values():
+            try:
+                profile.store.close()
+            except Exception as e:
+                error = error or e
+        self.loaded.clear()
+        if error is not None:
+            raise error
@@ -0,0 +1,150 @@
+"""복용 반복 규칙: 하루 중 복용 시각 목록 + 간격 + 요일 마스크"""
+import bisect
+from datetime import datetime, timedelta
+
+
+MINUTES_PER_DAY = 24 * 60
+WEEKDAY_NAMES = '월화수목금토일'
+EVERY_DAY = 0b1111111
+
+# 하루를 나누어 떨어지는 간격만 허용해 매일 같은 시각에 복용하도록 한다
+INTERVAL_HOURS = (4, 6, 8, 12)
+
+
+def parse_time(time_str):
+    """'HH:MM' -> (hour, minute), 형식이 틀리면 None"""
+    try:
+        parsed = datetime.strptime(str(time_str).strip(), "%H:%M")
+    except ValueError:
+        return None
+    return parsed.hour, parsed.minute
+
+
+def format_minute(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class Recurrence:
+    """times: 하루 중 복용 시각(분, 정렬됨), interval: 반복 간격(분, 0이면 없음),
+    weekdays: 월요일=bit0 ... 일요일=bit6
+    """
+
+    __slots__ = ('times', 'interval', 'weekdays', 'start')
+
+    def __init__(self, times, interval=0, weekdays=EVERY_DAY):
+        # 간격 복용의 기준(첫 복용) 시각
+        self.start = times[0]
+        if interval:
+            # 기준 시각부터 간격마다 반복 -> 하루 중 시각 목록으로 펼친다
+            times = [(self.start + k * interval) % MINUTES_PER_DAY
+                     for k in range(MINUTES_PER_DAY // interval)]
+        self.times = tuple(sorted(set(times)))
+        self.interval = interval
+        self.weekdays = weekdays
+
+    @classmethod
+    def parse(cls, times_text, interval_hours=0, weekdays=EVERY_DAY):
+        """입력값 검증 후 Recurrence 생성; 시각이 비어 있으면 None, 잘못된 값은 ValueError"""
+        parts = [part.strip() for part in str(times_text).replace('，', ',').split(',')]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+
+        times = []
+        for part in parts:
+            parsed = parse_time(part)
+            if parsed is None:
+                raise ValueError(f"올바른 시간 형식을 입력하세요 (HH:MM): {part}")
+            times.append(parsed[0] * 60 + parsed[1])
+
+        interval_hours = int(interval_hours or 0)
+        if interval_hours:
+            if interval_hours not in INTERVAL_HOURS:
+                raise ValueError("복용 간격은 " + ", ".join(f"{h}시간" for h in INTERVAL_HOURS)
+                                 + " 중에서 선택하세요")
+            if len(times) > 1:
+                raise ValueError("간격 복용은 첫 복용 시간 하나만 입력하세요")
+        if not weekdays & EVERY_DAY:
+            raise ValueError("복용 요일을 하나 이상 선택하세요")
+        return cls(times, interval_hours * 60, weekdays & EVERY_DAY)
+
+    @classmethod
+    def from_fields(cls, time_value, rule_value=None):
+        """저장된 'Notification Time'/'Recurrence' 값으로 만든다; 없거나 잘못되었으면 None"""
+        if not isinstance(time_value, str):
+            return None
+        interval_hours, weekdays = 0, EVERY_DAY
+        try:
+            # 손으로 고친 파일의 잘못된 값('every=xh' 등)도 예외 없이 None으로 처리한다
+            if isinstance(rule_value, str):
+                for item in rule_value.split(';'):
+                    key, _, value = item.strip().partition('=')
+                    if key == 'every' and value.endswith('h'):
+                        interval_hours = int(value[:-1])
+                    elif key == 'days':
+                        weekdays = sum(1 << WEEKDAY_NAMES.index(day)
+                                       for day in value if day in WEEKDAY_NAMES)
+            return cls.parse(time_value, interval_hours, weekdays)
+        except ValueError:
+            return None
+
+    def time_text(self):
+        """'Notification Time' 컬럼에 저장할 값 (간격 복용이면 기준 시각)"""
+        if self.interval:
+            return format_minute(self.start)
+        return ', '.join(format_minute(minute) for minute in self.times)
+
+    def rule_text(self):
+        """'Recurrence' 컬럼에 저장할 값, 매일 같은 시각이면 None"""
+        items = []
+        if self.interval:
+            items.append(f"every={self.interval // 60}h")
+        if self.weekdays != EVERY_DAY:
+            items.append("days=" + self.weekday_text())
+        return ';'.join(items) or None
+
+    def weekday_text(self):
+        return ''.join(day for i, day in enumerate(WEEKDAY_NAMES) if self.weekdays >> i & 1)
+
+    def describe(self):
+        if self.interval:
+            text = f"{format_minute(self.start)}부터 {self.interval // 60}시간마다"
+        else:
+            text = ', '.join(format_minute(minute) for minute in self.times)
+        if self.weekdays != EVERY_DAY:
+            text += " · " + '·'.join(self.weekday_text())
+        return text
+
+    def next_occurrence(self, after):
+        """after가 속한 분(포함) 이후 처음 복용할 시각; 최대 일주일만 살펴본다"""
+        after = after.replace(second=0, microsecond=0)
+        midnight = after.replace(hour=0, minute=0)
+        first_minute = after.hour * 60 + after.minute
+        for offset in range(8):
+            day = midnight + timedelta(days=offset)
+            if not self.weekdays >> day.weekday() & 1:
+                continue
+            i = bisect.bisect_left(self.times, first_minute if offset == 0 else 0)
+            if i < len(self.times):
+                return day + timedelta(minutes=self.times[i])
+        return None
+
+    def __eq__(self, other):
+        return (isinstance(other, Recurrence) and
+                (self.times, self.interval, self.weekdays, self.start) ==
+                (other.times, other.interval, other.weekdays, other.start))
+
+    def __repr__(self):
+        return f"Recurrence({self.describe()!r})"
+
+
+def is_enabled(value):
+    # 예전 파일에는 값이 비어 있을 수 있고, 그때는 기존처럼 켜진 것으로 본다
+    if value is None or value != value:
+        return True
+    return bool(value)
+
+
+def recurrence_of(medication):
+    return Recurrence.from_fields(medication.get('Notification Time'),
+                                  medication.get('Recurrence'))
@@ -0,0 +1,134 @@
+"""복용 일정을 NumPy 배열로 들고 있는 뷰 (복용 시각 슬롯, 알림 여부, 요일)"""
+from datetime import timedelta
+
+import numpy as np
+
+from recurrence import EVERY_DAY, is_enabled, recurrence_of
+
+
+MINUTES_PER_DAY = 24 * 60
+
+# 알림 계산에 필요한 컬럼 (효능/주의사항 같은 긴 텍스트는 읽지 않아도 된다)
+SCHEDULE_COLUMNS = ['Product Name', 'How to Take It', 'Notification Time',
+                    'Notifications_Enabled', 'Taking_Condition', 'Recurrence']
+
+
+class ScheduleView:
+    """my_medications와 같은 행 순서를 갖는 일정 배열
+
+    행마다 알림 여부/요일 마스크를 두고, 하루 중 복용 시각은 (행, 분) 슬롯 배열로
+    펼쳐 둔다. 다음 복용이 언제인지를 파이썬 루프 없이 배열 마스크로 계산한다.
+    표가 바뀌면 바뀐 행의 값과 슬롯만 고친다.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.recurrences = []
+        self.enabled = np.empty(0, dtype=bool)
+        self.weekdays = np.empty(0, dtype=np.uint8)
+        self.slot_rows = np.empty(0, dtype=np.int32)
+        self.slot_minutes = np.empty(0, dtype=np.int16)
+
+    @classmethod
+    def from_frame(cls, frame):
+        view = cls()
+        records = frame.to_dict('records')
+        view.names = [record['Product Name'] for record in records]
+        view.recurrences = [recurrence_of(record) for record in records]
+        view.enabled = np.fromiter((is_enabled(r.get('Notifications_Enabled')) for r in records),
+                                   dtype=bool, count=len(records))
+        view.weekdays = np.fromiter((rec.weekdays if rec else EVERY_DAY
+                                     for rec in view.recurrences),
+                                    dtype=np.uint8, count=len(records))
+        rows, minutes = view.slots_for(range(len(records)))
+        view.slot_rows, view.slot_minutes = rows, minutes
+        return view
+
+    def slots_for(self, rows):
+        slot_rows, slot_minutes = [], []
+        for row in rows:
+            recurrence = self.recurrences[row]
+            if recurrence is not None:
+                slot_rows.extend([row] * len(recurrence.times))
+                slot_minutes.extend(recurrence.times)
+        return (np.array(slot_rows, dtype=np.int32),
+                np.array(slot_minutes, dtype=np.int16))
+
+    def append(self, medication):
+        row = len(self.names)
+        recurrence = recurrence_of(medication)
+        self.names.append(medication['Product Name'])
+        self.recurrences.append(recurrence)
+        self.enabled = np.append(self.enabled, is_enabled(medication.get('Notifications_Enabled')))
+        self.weekdays = np.append(self.weekdays,
+                                  np.uint8(recurrence.weekdays if recurrence else EVERY_DAY))
+        self.add_slots(row)
+
+    def set_row(self, row, medication):
+        recurrence = recurrence_of(medication)
+        self.recurrences[row] = recurrence
+        self.enabled[row] = is_enabled(medication.get('Notifications_Enabled'))
+        self.weekdays[row] = recurrence.weekdays if recurrence else EVERY_DAY
+
+        keep = self.slot_rows != row
+        self.slot_rows = self.slot_rows[keep]
+        self.slot_minutes = self.slot_minutes[keep]
+        self.add_slots(row)
+
+    def add_slots(self, row):
+        rows, minutes = self.slots_for([row])
+        self.slot_rows = np.concatenate([self.slot_rows, rows])
+        self.slot_minutes = np.concatenate([self.slot_minutes, minutes])
+
+    def delete_rows(self, rows):
+        rows = np.sort(np.asarray(rows, dtype=np.int32))
+        for row in rows[::-1]:
+            del self.names[row]
+            del self.recurrences[row]
+        self.enabled = np.delete(self.enabled, rows)
+        self.weekdays = np.delete(self.weekdays, rows)
+
+        keep = ~np.isin(self.slot_rows, rows)
+        slot_rows = self.slot_rows[keep]
+        # 지워진 행보다 뒤에 있던 행 번호를 앞으로 당긴다
+        self.slot_rows = slot_rows - np.searchsorted(rows, slot_rows).astype(np.int32)
+        self.slot_minutes = self.slot_minutes[keep]
+
+    def minutes_until(self, now):
+        """행마다 다음 복용까지 남은 분 (now가 속한 분이면 0, 일정 없는 행은 -1)"""
+        minute = now.hour * 60 + now.minute
+        slot_minutes = self.slot_minutes.astype(np.int32)
+        passed = slot_minutes < minute
+        base = slot_minutes - minute + np.where(passed, MINUTES_PER_DAY, 0)
+
+        # 요일 제한이 있으면 최대 7일 뒤까지 복용하는 첫 날을 찾는다
+        extra_days = np.arange(8)[:, None]
+        day = (now.weekday() + passed.astype(np.int32)[None, :] + extra_days) % 7
+        allowed = ((self.weekdays[self.slot_rows][None, :] >> day) & 1) == 1
+        first_day = allowed.argmax(axis=0)
+        delta = base + first_day * MINUTES_PER_DAY
+        valid = allowed.any(axis=0) & self.enabled[self.slot_rows]
+
+        result = np.full(len(self.names), np.iinfo(np.int32).max, dtype=np.int32)
+        np.minimum.at(result, self.slot_rows[valid], delta[valid])
+        return np.where(result == np.iinfo(np.int32).max, -1, result)
+
+    def next_due(self, now):
+        """now 이후 가장 먼저 돌아오는 복용: (행 번호 배열, 남은 분) 또는 None"""
+        delta = self.minutes_until(now)
+        valid = delta >= 0
+        if not valid.any():
+            return None
+        soonest = delta[valid].min()
+        return np.flatnonzero(delta == soonest), int(soonest)
+
+    def scheduler_entries(self, now):
+        """DoseScheduler.load()에 넘길 (약물명, 반복 규칙, 다음 복용 시각) 목록"""
+        now = now.replace(second=0, microsecond=0)
+        minutes_left = self.minutes_until(now)
+        return [(self.names[row], self.recurrences[row],
+                 now + timedelta(minutes=int(minutes_left[row])))
+                for row in np.flatnonzero(minutes_left >= 0)]
+
+    def __len__(self):
+        return len(self.names)
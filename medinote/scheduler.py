@@ -0,0 +1,86 @@
+"""다음 복용 시각을 최소 힙으로 관리하는 알림 스케줄러"""
+import heapq
+import itertools
+from datetime import timedelta
+
+
+class DoseScheduler:
+    """key(약물명)별 다음 알림 시각을 담은 최소 힙
+
+    일정을 바꾸거나 지우면 이전 힙 항목은 그대로 두고 무효 처리만 한다(lazy deletion).
+    그래서 추가/변경/삭제가 모두 O(log n)이고, 무효 항목이 많아지면 힙을 한 번 다시 만든다.
+    """
+
+    # 이보다 오래 지난 복용 시각은 늦게 깨어나도 알리지 않는다
+    CATCH_UP = timedelta(hours=24)
+
+    def __init__(self):
+        self.heap = []
+        self.entries = {}  # key -> [fire_at, seq, key, recurrence]
+        self.counter = itertools.count()
+
+    def schedule(self, key, recurrence, now, enabled=True):
+        """recurrence(Recurrence)의 now 이후(같은 분 포함) 첫 복용 시각으로 등록"""
+        self.entries.pop(key, None)
+        if not enabled or recurrence is None:
+            return
+        fire_at = recurrence.next_occurrence(now)
+        if fire_at is None:
+            return
+        self.push([fire_at, next(self.counter), key, recurrence])
+
+    def push(self, entry):
+        self.entries[entry[2]] = entry
+        heapq.heappush(self.heap, entry)
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def load(self, entries):
+        """(key, recurrence, fire_at) 목록으로 힙을 한 번에 만든다 (heapify, O(n))"""
+        self.clear()
+        for key, recurrence, fire_at in entries:
+            self.entries[key] = [fire_at, next(self.counter), key, recurrence]
+        self.heap = list(self.entries.values())
+        heapq.heapify(self.heap)
+
+    def remove(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.heap.clear()
+        self.entries.clear()
+
+    def discard_stale(self):
+        while self.heap and self.entries.get(self.heap[0][2]) is not self.heap[0]:
+            heapq.heappop(self.heap)
+
+    def next_fire_time(self):
+        self.discard_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now):
+        """now까지 도래한 알림을 (key, 예정 시각) 목록으로 반환하고 다음 복용 시각으로 다시 등록한다
+
+        이벤트 루프가 멈췄다가 늦게 깨어나도 그동안 지난 알림을 빠뜨리지 않는다. 하루에 여러 번
+        먹는 약은 지난 시각마다 하나씩 돌려주고, CATCH_UP보다 오래된 시각은 건너뛴다.
+        """
+        oldest = now - self.CATCH_UP
+        due = []
+        while True:
+            self.discard_stale()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            fire_at, _, key, recurrence = heapq.heappop(self.heap)
+            if fire_at >= oldest:
+                due.append((key, fire_at))
+            # 방금 알린 시각 다음부터 다시 찾으므로, 아직 지난 시각이 남았으면 이 루프에서 또 꺼낸다
+            next_at = recurrence.next_occurrence(max(fire_at + timedelta(minutes=1), oldest))
+            if next_at is None:
+                self.entries.pop(key, None)
+            else:
+                self.push([next_at, next(self.counter), key, recurrence])
+        return due
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,93 @@
+"""사용자 특이사항(알레르기/지병) 선별: 메모의 단어가 주의사항/경고/부작용에 나오는 약을 찾는다
+
+메모는 한 번만 단어로 나누고, 단어 전체를 정규식 하나로 컴파일해 카탈로그 텍스트를 한 번에
+훑는다. 결과(doc id -> 걸린 단어)는 프로필별 파일에 캐시하고, 메모의 단어나 카탈로그가
+바뀌었을 때만 다시 만든다.
+"""
+import bisect
+import re
+
+from catalog_cache import read_cache, write_cache
+from interactions import PARTICLES, TOKEN_PATTERN
+from search_index import normalize_text
+
+
+SCREEN_FIELDS = ('Precautions', 'Warnings', 'Major Side Effects')
+DOC_SEPARATOR = '\x01'
+
+# 메모에 흔히 쓰지만 약 정보와 맞춰 볼 의미가 없는 단어
+STOP_WORDS = frozenset([
+    '알레르기', '알러지', '알레르기가', '있음', '없음', '있다', '없다', '있습니다', '없습니다',
+    '지병', '특이사항', '환자', '복용', '복용중', '중', '약', '과거', '병력', '진단', '수술', '치료',
+    '증상', '매일', '가끔', '조금', '심함', '심한', '약간', '기타',
+])
+# 서술어로 끝나는 단어 ('중입니다', '있어요')는 검사 단어로 쓰지 않는다
+SENTENCE_ENDINGS = ('니다', '어요', '아요', '해요', '에요', '예요')
+MIN_TERM_LENGTH = 2
+
+
+def note_terms(notes):
+    """메모 -> 정규화한 검사 단어 tuple (조사는 떼고, 중복/불용어 제외)"""
+    terms = set()
+    for token in TOKEN_PATTERN.findall(normalize_text(notes)):
+        if token.endswith(SENTENCE_ENDINGS):
+            continue
+        for cut in (2, 1):
+            # 긴 조사부터 떼어 본다 ('페니실린에' -> '페니실린')
+            if token[-cut:] in PARTICLES and len(token) - cut >= MIN_TERM_LENGTH:
+                token = token[:-cut]
+                break
+        if len(token) >= MIN_TERM_LENGTH and token not in STOP_WORDS:
+            terms.add(token)
+    return tuple(sorted(terms))
+
+
+class ScreeningTable:
+    """key = (카탈로그 버전, 검사 단어), matches = doc id -> 걸린 단어 tuple"""
+
+    CACHE_VERSION = 1
+
+    def __init__(self, key, matches):
+        self.key = key
+        self.matches = matches
+
+    @classmethod
+    def build(cls, frame, terms, catalog_version):
+        matches = {}
+        columns = [column for column in SCREEN_FIELDS if column in frame]
+        if terms and columns and len(frame):
+            # 행마다 검사 대상 컬럼을 이어 붙이고, 전체를 문자열 하나로 만들어 한 번에 검색
+            texts = [' '.join(normalize_text(value) for value in row)
+                     for row in frame[columns].itertuples(index=False)]
+            starts, position = [], 0
+            for text in texts:
+                starts.append(position)
+                position += len(text) + 1
+            pattern = re.compile('|'.join(re.escape(term)
+                                          for term in sorted(terms, key=len, reverse=True)))
+            doc_ids = list(frame.index)
+            found = {}
+            for match in pattern.finditer(DOC_SEPARATOR.join(texts)):
+                row = bisect.bisect_right(starts, match.start()) - 1
+                found.setdefault(doc_ids[row], set()).add(match.group())
+            matches = {doc_id: tuple(sorted(words)) for doc_id, words in found.items()}
+        return cls((catalog_version, tuple(terms)), matches)
+
+    def get(self, doc_id):
+        return self.matches.get(doc_id, ())
+
+
+def load_screening(cache_path, load_frame, notes, catalog_version):
+    """캐시된 선별 결과를 반환; 메모 단어나 카탈로그 버전이 다르면 다시 만들어 저장한다
+
+    load_frame(columns)은 다시 만들어야 할 때만 호출된다 (긴 텍스트 컬럼을 읽는 비용).
+    """
+    key = (catalog_version, note_terms(notes))
+    cached = read_cache(cache_path, ScreeningTable.CACHE_VERSION)
+    if cached is not None and cached.get('key') == key:
+        return ScreeningTable(key, cached['matches'])
+    table = ScreeningTable.build(load_frame(SCREEN_FIELDS), key[1], catalog_version)
+    write_cache(cache_path, {'version': ScreeningTable.CACHE_VERSION,
+                             'key': table.key,
+                             'matches': table.matches})
+    return table
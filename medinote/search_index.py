@@ -0,0 +1,187 @@
+"""약물 검색용 n-gram 역색인"""
+import os
+import unicodedata
+from array import array
+
+
+SEARCH_FIELDS = ('Product Name', 'Main Ingredient', 'Effectiveness')
+
+# 필드 사이 구분자. 검색어에서는 제거되므로 필드 경계를 넘는 매치가 생기지 않는다.
+FIELD_SEPARATOR = '\x00'
+
+
+class SearchCancelled(Exception):
+    """더 새로운 검색어가 들어와 진행 중인 검색이 취소됨"""
+
+
+def normalize_text(value):
+    """검색용 정규화: 결측값은 빈 문자열, 한글은 NFC 조합형, 소문자"""
+    if value is None or value != value:  # None / NaN
+        return ''
+    text = unicodedata.normalize('NFC', str(value))
+    return text.replace(FIELD_SEPARATOR, '').lower()
+
+
+def product_key(name):
+    """같은 제품인지 비교하는 약물명 키: 정규화한 뒤 공백을 하나로 줄인다"""
+    return ' '.join(normalize_text(name).split())
+
+
+def product_ids(frame):
+    """약물명 키 -> doc id (같은 키가 여러 번 나오면 첫 행)"""
+    ids = {}
+    for doc_id, name in zip(frame.index.tolist(), frame['Product Name'].tolist()):
+        ids.setdefault(product_key(name), doc_id)
+    return ids
+
+
+def file_signature(path):
+    """파일이 바뀌었는지 판단하기 위한 (mtime, size) 서명"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class SearchIndex:
+    def __init__(self, gram_size=2):
+        self.gram_size = gram_size
+        self.signature = None
+        self.texts = {}  # doc id -> 검색 텍스트 (카탈로그 순서)
+        # doc id -> 카탈로그에서의 위치 (없는 id는 -1). doc id는 다시 읽어도 유지되므로 새 제품이
+        # 카탈로그 중간에 들어가면 id 순서와 카탈로그 순서가 달라진다
+        self.ranks = array('q')
+        # gram -> 슬롯 번호. 문서 id 목록은 하나의 배열에 이어 붙이고
+        # 슬롯 i의 구간은 posting_bounds[i]:posting_bounds[i + 1]
+        self.postings = {}
+        self.posting_bounds = array('q', [0])
+        self.posting_data = array('q')
+
+    @classmethod
+    def build(cls, frame, signature=None, gram_size=2):
+        """DataFrame의 검색 대상 컬럼으로 색인을 만든다 (문서 id = frame index label)"""
+        index = cls(gram_size)
+        columns = [frame[field] if field in frame else [None] * len(frame)
+                   for field in SEARCH_FIELDS]
+
+        postings = {}
+        for doc_id, *values in zip(frame.index, *columns):
+            index.add(doc_id, values, postings)
+        index.pack(postings, signature)
+        return index
+
+    def add(self, doc_id, values, postings):
+        """문서 하나(SEARCH_FIELDS 순서의 값)를 넣는다; 모은 postings(gram -> doc id 배열)는 pack()으로 붙인다"""
+        text = FIELD_SEPARATOR.join(normalize_text(v) for v in values)
+        self.texts[doc_id] = text
+        for gram in self._grams(text):
+            ids = postings.get(gram)
+            if ids is None:
+                ids = postings[gram] = array('q')
+            ids.append(doc_id)
+
+    def pack(self, postings, signature=None):
+        self.signature = signature
+        while postings:
+            # 옮긴 목록은 바로 버려서 두 벌이 동시에 메모리에 있지 않게 한다
+            gram, ids = postings.popitem()
+            self.postings[gram] = len(self.posting_bounds) - 1
+            self.posting_data.extend(ids)
+            self.posting_bounds.append(len(self.posting_data))
+        self.rank_documents()
+
+    def rank_documents(self):
+        ranks = array('q', [-1]) * (max(self.texts, default=-1) + 1)
+        for rank, doc_id in enumerate(self.texts):
+            ranks[doc_id] = rank
+        self.ranks = ranks
+
+    def updated(self, texts, stale_ids, postings, signature=None):
+        """stale_ids 문서를 빼고 postings(바뀌었거나 새로 생긴 문서)를 더한 새 색인
+
+        texts는 새 색인의 문서 id -> 검색 텍스트 (카탈로그 순서). 이 색인은 그대로 두므로
+        진행 중인 검색은 이전 색인으로 끝까지 돌 수 있다.
+        """
+        # numpy는 다시 읽을 때만 필요하다 (프로그램 시작 시 이 모듈을 읽을 때는 불러오지 않는다)
+        import numpy as np
+
+        index = SearchIndex(self.gram_size)
+        index.texts = texts
+        index.signature = signature
+        index.postings = dict(self.postings)
+
+        data = np.frombuffer(self.posting_data, dtype=np.int64)
+        bounds = np.frombuffer(self.posting_bounds, dtype=np.int64)
+        slots = np.repeat(np.arange(len(bounds) - 1, dtype=np.int64), np.diff(bounds))
+        keep = ~np.isin(data, np.fromiter(stale_ids, dtype=np.int64, count=len(stale_ids)))
+
+        added_slots, added_ids = [], []
+        for gram, ids in postings.items():
+            slot = index.postings.setdefault(gram, len(index.postings))
+            added_slots.append(np.full(len(ids), slot, dtype=np.int64))
+            added_ids.append(np.frombuffer(ids, dtype=np.int64))
+        all_slots = np.concatenate([slots[keep]] + added_slots)
+        all_ids = np.concatenate([data[keep]] + added_ids)
+
+        # 같은 gram의 문서는 이어 붙어 있도록 슬롯 번호 순으로 정렬 (빈 슬롯은 그대로 둔다)
+        order = np.argsort(all_slots, kind='stable')
+        counts = np.bincount(all_slots, minlength=len(index.postings))
+        index.posting_data = array('q', all_ids[order].tobytes())
+        index.posting_bounds = array('q', np.concatenate([[0], np.cumsum(counts)]).astype(np.int64).tobytes())
+        index.rank_documents()
+        return index
+
+    def _posting(self, gram):
+        slot = self.postings.get(gram)
+        if slot is None:
+            return None
+        bounds = self.posting_bounds
+        return memoryview(self.posting_data)[bounds[slot]:bounds[slot + 1]]
+
+    def _grams(self, text):
+        n = self.gram_size
+        return {text[i:i + n] for i in range(len(text) - n + 1)} - {''}
+
+    def search(self, query, cancelled=None):
+        """기존 부분 문자열 검색과 동일한 결과를 카탈로그 순서로 반환
+
+        cancelled가 주어지면 중간중간 호출해 True이면 SearchCancelled를 던진다.
+        """
+        query = normalize_text(query)
+        if not query:
+            return list(self.texts)
+
+        if len(query) < self.gram_size:
+            return self._verify(query, self.texts, cancelled)
+
+        posting_lists = []
+        for gram in self._grams(query):
+            ids = self._posting(gram)
+            if ids is None:
+                return []
+            posting_lists.append(ids)
+        posting_lists.sort(key=len)
+
+        # 가장 짧은 목록 몇 개만 교집합하고 나머지는 원문 확인으로 거른다
+        candidates = set(posting_lists[0])
+        for ids in posting_lists[1:3]:
+            if len(ids) > 8 * len(candidates):
+                break
+            candidates.intersection_update(ids)
+
+        return self._verify(query, sorted(candidates, key=self.ranks.__getitem__), cancelled)
+
+    def _verify(self, query, doc_ids, cancelled, chunk=2048):
+        texts = self.texts
+        doc_ids = list(doc_ids)
+        matches = []
+        for start in range(0, len(doc_ids), chunk):
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+            matches.extend(doc_id for doc_id in doc_ids[start:start + chunk]
+                           if query in texts[doc_id])
+        return matches
+
+    def __len__(self):
+        return len(self.texts)
@@ -0,0 +1,304 @@
+"""카탈로그와 프로필별 복용 약물을 담는 SQLite 저장소 (선택 사항)
+
+`python medinote.py migrate-sqlite`로 기존 xlsx/저널 데이터를 한 번 옮긴 뒤
+`python medinote.py --backend sqlite`로 실행한다.
+"""
+import sqlite3
+import threading
+
+import pandas as pd
+
+from column_store import HEAVY_COLUMNS, RESIDENT_COLUMNS
+from medication_table import compact_catalog
+from search_index import SEARCH_FIELDS, SearchCancelled, normalize_text
+from storage import plain_value
+
+
+CATALOG_COLUMNS = [
+    'Product Name', 'Company Name', 'Main Ingredient',
+    'Effectiveness', 'How to Take It', 'Precautions',
+    'Warnings', 'Medications to Avoid', 'Major Side Effects',
+    'Storage Instructions'
+]
+
+
+def sql_name(column):
+    """'How to Take It' -> how_to_take_it"""
+    return column.lower().replace(' ', '_')
+
+
+def has_fts5_trigram(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.fts_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+class SQLiteStore:
+    def __init__(self, db_path='medinote.db', profile='default'):
+        self.db_path = db_path
+        self.profile = profile
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.use_fts = has_fts5_trigram(self.conn)
+        self.user_columns = []
+        self.create_schema()
+
+    def create_schema(self):
+        catalog_columns = ', '.join(f'{sql_name(c)} TEXT' for c in CATALOG_COLUMNS[1:])
+        with self.lock, self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS catalog (
+                    id INTEGER PRIMARY KEY,
+                    product_name TEXT NOT NULL,
+                    {catalog_columns}
+                )""")
+            self.conn.execute('CREATE INDEX IF NOT EXISTS catalog_product_name '
+                              'ON catalog(product_name)')
+            if self.use_fts:
+                fts_columns = ', '.join(sql_name(c) for c in SEARCH_FIELDS)
+                self.conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+                        {fts_columns},
+                        content='catalog', content_rowid='id', tokenize='trigram'
+                    )""")
+
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS user_medications (
+                    profile TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    product_name TEXT NOT NULL,
+                    {catalog_columns},
+                    notification_time TEXT,
+                    notifications_enabled INTEGER,
+                    taking_condition TEXT,
+                    recurrence TEXT,
+                    PRIMARY KEY (profile, product_name)
+                )""")
+            # 반복 규칙 컬럼이 생기기 전에 만든 데이터베이스
+            existing = {row[1] for row in self.conn.execute('PRAGMA table_info(user_medications)')}
+            if 'recurrence' not in existing:
+                self.conn.execute('ALTER TABLE user_medications ADD COLUMN recurrence TEXT')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS user_medications_position '
+                              'ON user_medications(profile, position)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS user_medications_time '
+                              'ON user_medications(profile, notification_time)')
+
+    # ---- 카탈로그 ----
+
+    def replace_catalog(self, frame):
+        columns = [c for c in CATALOG_COLUMNS if c in frame]
+        names = ', '.join(sql_name(c) for c in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        rows = ([plain_value(v) for v in record]
+                for record in frame[columns].itertuples(index=False, name=None))
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM catalog')
+            self.conn.executemany(f'INSERT INTO catalog ({names}) VALUES ({placeholders})', rows)
+            if self.use_fts:
+                self.conn.execute("INSERT INTO catalog_fts(catalog_fts) VALUES ('rebuild')")
+
+    def load_catalog(self, columns=RESIDENT_COLUMNS):
+        """카탈로그 DataFrame (index = catalog.id, 검색 결과 id와 같음)
+
+        기본값은 검색/목록용 좁은 컬럼만; 긴 텍스트는 catalog_details()로 행 id마다 읽는다.
+        """
+        names = ', '.join(sql_name(c) for c in columns)
+        with self.lock:
+            frame = pd.read_sql_query(f'SELECT id, {names} FROM catalog ORDER BY id',
+                                      self.conn, index_col='id')
+        frame.columns = list(columns)
+        return compact_catalog(frame)
+
+    def catalog_search(self):
+        return SQLiteCatalogSearch(self)
+
+    def catalog_details(self):
+        return SQLiteCatalogDetails(self)
+
+    # ---- 복용 약물 ----
+
+    def load(self, columns):
+        self.user_columns = list(columns)
+        names = ', '.join(sql_name(c) for c in columns)
+        with self.lock:
+            frame = pd.read_sql_query(
+                f'SELECT {names} FROM user_medications WHERE profile = ? ORDER BY position',
+                self.conn, params=(self.profile,))
+        frame.columns = columns
+        if 'Notifications_Enabled' in frame:
+            frame['Notifications_Enabled'] = frame['Notifications_Enabled'].astype(bool)
+        return frame
+
+    def known_fields(self, fields):
+        unknown = set(fields) - set(CATALOG_COLUMNS) - set(self.user_columns)
+        if unknown:
+            raise KeyError(f'알 수 없는 필드: {sorted(unknown)}')
+        return list(fields)
+
+    def add(self, row):
+        with self.lock, self.conn:
+            self.insert_medication(row)
+
+    def insert_medication(self, row):
+        fields = self.known_fields(row)
+        names = ', '.join(sql_name(f) for f in fields)
+        placeholders = ', '.join('?' for _ in fields)
+        position = self.conn.execute(
+            'SELECT COALESCE(MAX(position), -1) + 1 FROM user_medications WHERE profile = ?',
+            (self.profile,)).fetchone()[0]
+        self.conn.execute(
+            f'INSERT OR REPLACE INTO user_medications (profile, position, {names}) '
+            f'VALUES (?, ?, {placeholders})',
+            [self.profile, position] + [plain_value(row[f]) for f in fields])
+
+    def update(self, product_name, fields):
+        with self.lock, self.conn:
+            self.update_medication(product_name, fields)
+
+    def update_medication(self, product_name, fields):
+        names = self.known_fields(fields)
+        assignments = ', '.join(f'{sql_name(f)} = ?' for f in names)
+        self.conn.execute(
+            f'UPDATE user_medications SET {assignments} WHERE profile = ? AND product_name = ?',
+            [plain_value(fields[f]) for f in names] + [self.profile, product_name])
+
+    def delete(self, product_name):
+        with self.lock, self.conn:
+            self.delete_medication(product_name)
+
+    def delete_medication(self, product_name):
+        self.conn.execute('DELETE FROM user_medications WHERE profile = ? AND product_name = ?',
+                          (self.profile, product_name))
+
+    def write_batch(self, operations):
+        """(op, 약물명, 값) 목록을 트랜잭션 하나로 쓴다"""
+        with self.lock, self.conn:
+            for op, product_name, value in operations:
+                if op == 'add':
+                    self.insert_medication(value)
+                elif op == 'update':
+                    self.update_medication(product_name, value)
+                else:
+                    self.delete_medication(product_name)
+
+    def signature(self):
+        """다른 연결이 커밋할 때마다 바뀌는 값 (알림 데몬의 변경 감지용)"""
+        with self.lock:
+            return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def export_xlsx(self, path, columns):
+        self.load(columns).to_excel(path, index=False)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SQLiteCatalogDetails:
+    """HeavyColumnStore와 같은 인터페이스로 긴 텍스트 컬럼을 기본 키로 읽는다"""
+
+    def __init__(self, store, columns=HEAVY_COLUMNS):
+        self.store = store
+        self.columns = list(columns)
+
+    def fetch(self, doc_id):
+        names = ', '.join(sql_name(c) for c in self.columns)
+        with self.store.lock:
+            row = self.store.conn.execute(f'SELECT {names} FROM catalog WHERE id = ?',
+                                          (int(doc_id),)).fetchone()
+        return dict(zip(self.columns, row or [None] * len(self.columns)))
+
+    def frame(self, columns):
+        return self.store.load_catalog(columns)
+
+    def close(self):
+        pass
+
+
+class SQLiteCatalogSearch:
+    """SearchIndex와 같은 인터페이스로 FTS5(trigram) 검색을 제공한다"""
+
+    def __init__(self, store):
+        self.store = store
+        self.signature = None
+
+    def search(self, query, cancelled=None):
+        query = normalize_text(query)
+        conn = self.store.conn
+        with self.store.lock:
+            if not query:
+                return [row[0] for row in conn.execute('SELECT id FROM catalog ORDER BY id')]
+
+            if cancelled is not None:
+                conn.set_progress_handler(lambda: 1 if cancelled() else 0, 10000)
+            try:
+                if self.store.use_fts and len(query) >= 3:
+                    phrase = '"' + query.replace('"', '""') + '"'
+                    cursor = conn.execute(
+                        'SELECT rowid FROM catalog_fts WHERE catalog_fts MATCH ? ORDER BY rowid',
+                        (phrase,))
+                else:
+                    # trigram은 3글자 미만을 찾지 못하므로 짧은 검색어는 직접 비교
+                    conditions = ' OR '.join(f"instr(lower(IFNULL({sql_name(c)}, '')), ?) > 0"
+                                             for c in SEARCH_FIELDS)
+                    cursor = conn.execute(f'SELECT id FROM catalog WHERE {conditions} ORDER BY id',
+                                          [query] * len(SEARCH_FIELDS))
+                return [row[0] for row in cursor]
+            except sqlite3.OperationalError as e:
+                if cancelled is not None and cancelled():
+                    raise SearchCancelled() from e
+                raise
+            finally:
+                if cancelled is not None:
+                    conn.set_progress_handler(None, 0)
+
+    def __len__(self):
+        with self.store.lock:
+            return self.store.conn.execute('SELECT COUNT(*) FROM catalog').fetchone()[0]
+
+
+def migrate_from_files(db_path='medinote.db', catalog_xlsx='medications.xlsx', profiles=None,
+                       columns=None):
+    """기존 xlsx 카탈로그와 프로필별 복용 약물 목록을 SQLite로 한 번에 옮긴다
+
+    profiles는 [(프로필 id, 저널 경로, 예전 xlsx 경로)] (기본값: 기본 프로필의 파일만).
+    (카탈로그 행 수, {프로필 id: 복용 약물 수})를 반환한다.
+    """
+    from catalog_cache import full_frame, load_catalog
+    from storage import JournalStore
+
+    if profiles is None:
+        profiles = [('default', 'my_medications', 'my_medications.xlsx')]
+    store = SQLiteStore(db_path)
+    loaded = None
+    try:
+        loaded = load_catalog(catalog_xlsx)
+        catalog = full_frame(loaded)
+        store.replace_catalog(catalog)
+
+        store.user_columns = list(columns)
+        counts = {}
+        for profile, journal_base, legacy_xlsx in profiles:
+            journal = JournalStore(journal_base, legacy_xlsx=legacy_xlsx, read_only=True)
+            medications = journal.load(columns)
+            journal.close()
+
+            # 같은 연결에서 프로필만 바꿔 가며 그 프로필의 행을 새로 쓴다
+            store.profile = profile
+            with store.lock, store.conn:
+                store.conn.execute('DELETE FROM user_medications WHERE profile = ?', (profile,))
+                for record in medications.to_dict('records'):
+                    store.insert_medication({key: value for key, value in record.items()
+                                             if key == 'Product Name' or plain_value(value) is not None})
+            counts[profile] = len(medications)
+        return len(catalog), counts
+    finally:
+        # 긴 텍스트 파일의 메모리 맵을 닫아야 (Windows에서) 오래된 파일을 지울 수 있다
+        if loaded is not None:
+            loaded.details.close()
+        store.close()
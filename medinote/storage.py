@@ -0,0 +1,328 @@
+"""복용 약물 목록 저장소: 변경분만 로그에 덧붙이고 백그라운드에서 스냅샷으로 압축한다"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from search_index import file_signature
+
+
+def plain_value(value):
+    """JSON으로 저장할 수 있는 파이썬 기본형으로 변환 (NaN -> None, numpy 스칼라 -> 파이썬 값)"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def atomic_write(path, write, mode='w'):
+    """같은 디렉터리의 임시 파일에 쓴 뒤 rename 한다 (바이너리는 mode='wb')"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '-',
+                                    suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JournalStore:
+    """스냅샷(JSON) + 추가 전용 저널(JSON lines)
+
+    모든 변경 기록에는 증가하는 seq가 붙는다. 스냅샷은 자신이 반영한 마지막 seq를 함께
+    저장하므로, 로드할 때는 스냅샷 이후의 저널 기록만 다시 적용하면 된다.
+    """
+
+    COMPACT_THRESHOLD = 200
+
+    def __init__(self, base_path='my_medications', legacy_xlsx='my_medications.xlsx',
+                 read_only=False):
+        self.snapshot_path = base_path + '.snapshot.json'
+        self.journal_path = base_path + '.journal'
+        self.legacy_xlsx = legacy_xlsx
+        # 다른 프로세스(알림 데몬 등)가 읽기만 할 때: 파일을 만들거나 압축하지 않는다
+        self.read_only = read_only
+
+        self.lock = threading.Lock()
+        self.rows = {}  # Product Name -> row dict (추가된 순서 유지)
+        self.seq = 0
+        self.journal_records = 0
+        self.journal_file = None
+        self.compactor = None
+
+    def load(self, columns):
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot['seq']
+            self.rows = {row['Product Name']: row for row in snapshot['rows']}
+        elif os.path.exists(self.legacy_xlsx):
+            # 예전 버전의 엑셀 파일을 한 번 가져와 첫 스냅샷으로 저장
+            legacy = pd.read_excel(self.legacy_xlsx)
+            self.rows = {}
+            for record in legacy.to_dict('records'):
+                row = {key: plain_value(value) for key, value in record.items()}
+                self.rows[row['Product Name']] = row
+            if not self.read_only:
+                self.write_snapshot(list(self.rows.values()), 0)
+        else:
+            self.rows = {}
+
+        self.seq = snapshot_seq
+        self.journal_records = 0
+        if os.path.exists(self.journal_path):
+            complete = 0  # 온전한 마지막 줄이 끝나는 위치 (바이트)
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # 기록 도중 종료되어 잘린 마지막 줄
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    complete += len(line)
+                    if record['seq'] <= snapshot_seq:
+                        continue
+                    self.apply(record)
+                    self.seq = record['seq']
+                    self.journal_records += 1
+            if not self.read_only and complete < os.path.getsize(self.journal_path):
+                # 잘린 줄을 남겨 두면 뒤에 덧붙이는 기록이 그 줄에 이어져 다음에 읽을 때 모두 버려진다
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(complete)
+
+        if not self.read_only:
+            self.journal_file = open(self.journal_path, 'a', encoding='utf-8')
+            if self.journal_records >= self.COMPACT_THRESHOLD:
+                self.compact_in_background()
+
+        return pd.DataFrame(list(self.rows.values()), columns=columns)
+
+    def signature(self):
+        """스냅샷/저널 파일이 바뀌었는지 확인하기 위한 값"""
+        return file_signature(self.snapshot_path), file_signature(self.journal_path)
+
+    def apply(self, record):
+        op = record['op']
+        if op == 'add':
+            row = record['row']
+            self.rows[row['Product Name']] = row
+        elif op == 'update':
+            row = self.rows.get(record['name'])
+            if row is not None:
+                row.update(record['fields'])
+        elif op == 'delete':
+            self.rows.pop(record['name'], None)
+
+    def add(self, row):
+        self.write_batch([('add', row['Product Name'], row)])
+
+    def update(self, product_name, fields):
+        self.write_batch([('update', product_name, fields)])
+
+    def delete(self, product_name):
+        self.write_batch([('delete', product_name, None)])
+
+    def write_batch(self, operations):
+        """(op, 약물명, 값) 목록을 저널에 한 번에 덧붙인다 (fsync는 한 번)"""
+        records = []
+        for op, product_name, value in operations:
+            if op == 'add':
+                records.append({'op': 'add',
+                                'row': {key: plain_value(v) for key, v in value.items()}})
+            elif op == 'update':
+                records.append({'op': 'update',
+                                'name': product_name,
+                                'fields': {key: plain_value(v) for key, v in value.items()}})
+            else:
+                records.append({'op': 'delete', 'name': product_name})
+        self.append(records)
+
+    def append(self, records):
+        with self.lock:
+            for record in records:
+                self.seq += 1
+                record['seq'] = self.seq
+                self.apply(record)
+                self.journal_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+            self.journal_records += len(records)
+            needs_compaction = self.journal_records >= self.COMPACT_THRESHOLD
+
+        if needs_compaction:
+            self.compact_in_background()
+
+    def compact_in_background(self):
+        if self.compactor is not None and self.compactor.is_alive():
+            return
+        self.compactor = threading.Thread(target=self.compact, daemon=True)
+        self.compactor.start()
+
+    def compact(self):
+        """현재 상태를 스냅샷으로 쓰고, 스냅샷에 반영된 저널 기록을 잘라낸다"""
+        with self.lock:
+            rows = [dict(row) for row in self.rows.values()]
+            snapshot_seq = self.seq
+
+        # 스냅샷 쓰기는 잠금 없이 진행; 그동안의 변경은 저널에 계속 쌓인다
+        self.write_snapshot(rows, snapshot_seq)
+
+        with self.lock:
+            self.journal_file.close()
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                remaining = []
+                for line in f:
+                    try:
+                        if json.loads(line)['seq'] > snapshot_seq:
+                            remaining.append(line)
+                    except json.JSONDecodeError:
+                        break
+            atomic_write(self.journal_path, lambda out: out.writelines(remaining))
+            self.journal_records = len(remaining)
+            self.journal_file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def write_snapshot(self, rows, seq):
+        atomic_write(self.snapshot_path,
+                     lambda f: json.dump({'seq': seq, 'rows': rows}, f, ensure_ascii=False))
+
+    def export_xlsx(self, path, columns):
+        """현재 목록을 엑셀 파일로 내보낸다 (요청이 있을 때만)"""
+        with self.lock:
+            rows = [dict(row) for row in self.rows.values()]
+        pd.DataFrame(rows, columns=columns).to_excel(path, index=False)
+
+    def close(self):
+        if self.compactor is not None:
+            self.compactor.join()
+        if self.journal_file is not None:
+            self.journal_file.close()
+            self.journal_file = None
+
+
+class BackgroundWriter:
+    """저장소(JournalStore/SQLiteStore)의 쓰기를 백그라운드 스레드에서 처리한다
+
+    변경이 들어오면 WINDOW_SECONDS 동안 더 기다렸다가 그 사이의 변경을 모아 한 번에 쓴다.
+    아직 쓰지 않은 같은 약의 수정은 하나로 합친다. 화면 스레드는 쓰기를 기다리지 않고,
+    flush()/close()만 남은 변경을 다 쓸 때까지 기다린다.
+    """
+
+    WINDOW_SECONDS = 0.25
+    RETRY_SECONDS = 2
+
+    def __init__(self, store, on_flush=None):
+        self.store = store
+        self.on_flush = on_flush  # 변경을 쓴 뒤 (쓰기 스레드에서) 호출
+        self.pending = []  # [op, 약물명, 값]
+        self.last_ops = {}  # 약물명 -> pending 안의 그 약 마지막 항목
+        self.writing = False
+        self.urgent = False
+        self.closed = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def add(self, row):
+        self.enqueue('add', row['Product Name'],
+                     {key: plain_value(value) for key, value in row.items()})
+
+    def update(self, product_name, fields):
+        self.enqueue('update', product_name,
+                     {key: plain_value(value) for key, value in fields.items()})
+
+    def delete(self, product_name):
+        self.enqueue('delete', product_name, None)
+
+    def enqueue(self, op, product_name, value):
+        with self.condition:
+            last = self.last_ops.get(product_name)
+            if op == 'update' and last is not None and last[0] in ('add', 'update'):
+                # 아직 쓰지 않은 추가/수정에 합친다
+                last[2].update(value)
+            else:
+                if op == 'delete' and last is not None and last[0] == 'update':
+                    self.pending.remove(last)  # 지울 약의 쓰지 않은 수정은 버린다
+                entry = [op, product_name, value]
+                self.pending.append(entry)
+                self.last_ops[product_name] = entry
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if self.closed and (not self.pending or self.error is not None):
+                    return
+                # 잠시 더 기다려 그 사이 들어온 변경도 함께 쓴다
+                deadline = time.monotonic() + self.WINDOW_SECONDS
+                while not (self.closed or self.urgent):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch, self.pending, self.last_ops = self.pending, [], {}
+                self.writing = True
+
+            try:
+                self.store.write_batch([tuple(entry) for entry in batch])
+                error = None
+            except Exception as e:
+                error = e
+
+            with self.condition:
+                self.writing = False
+                self.error = error
+                if error is not None:
+                    # 실패한 변경은 새 변경보다 앞에 다시 넣고 잠시 뒤 재시도
+                    self.pending[:0] = batch
+                self.condition.notify_all()
+                if error is not None and not self.closed:
+                    self.condition.wait(self.RETRY_SECONDS)
+            if error is None and self.on_flush is not None:
+                self.on_flush()
+
+    def flush(self):
+        """남은 변경을 다 쓸 때까지 기다린다; 쓰기에 실패하면 그 오류를 던진다"""
+        with self.condition:
+            self.urgent = True
+            self.condition.notify_all()
+            try:
+                while (self.pending or self.writing) and self.error is None:
+                    self.condition.wait()
+                if self.pending and self.error is not None:
+                    raise self.error
+            finally:
+                self.urgent = False
+
+    def export_xlsx(self, path, columns):
+        self.flush()
+        self.store.export_xlsx(path, columns)
+
+    def signature(self):
+        return self.store.signature()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            self.thread.join()
+            self.store.close()
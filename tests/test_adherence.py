@@ -0,0 +1,40 @@
+import os
+from datetime import datetime
+
+from adherence import MISSED, RECORD_DTYPE, TAKEN, AdherenceLog
+
+
+def test_report_counts_doses_by_due_day(tmp_path):
+    log = AdherenceLog(str(tmp_path / 'adherence'))
+    # 23:50 알림을 다음 날 확인해도 예정일의 기록이다
+    log.record('약A', TAKEN, datetime(2026, 10, 1, 23, 50), at=datetime(2026, 10, 2, 0, 10))
+    log.record('약A', MISSED, datetime(2026, 10, 2, 8, 0), at=datetime(2026, 10, 2, 9, 0))
+
+    first = log.summary(datetime(2026, 10, 1), datetime(2026, 10, 2))
+    second = log.summary(datetime(2026, 10, 2), datetime(2026, 10, 3))
+    assert first == {'약A': {'taken': 1, 'snoozed': 0, 'missed': 0, 'rate': 1.0}}
+    assert second == {'약A': {'taken': 0, 'snoozed': 0, 'missed': 1, 'rate': 0.0}}
+
+
+def test_record_time_is_never_before_due_time(tmp_path):
+    log = AdherenceLog(str(tmp_path / 'adherence'))
+    # 시계가 되돌아가 예정 시각보다 이른 시각에 기록해도 예정 기간 조회에서 빠지지 않는다
+    log.record('약A', TAKEN, datetime(2026, 10, 5, 8, 0), at=datetime(2026, 10, 4, 23, 0))
+    records = log.all_records()
+    assert records['time'][0] >= records['due'][0]
+    assert log.summary(datetime(2026, 10, 5), datetime(2026, 10, 6))['약A']['taken'] == 1
+
+
+def test_partial_last_record_is_truncated_on_open(tmp_path):
+    base = str(tmp_path / 'adherence')
+    log = AdherenceLog(base)
+    log.record('약A', TAKEN, datetime(2026, 10, 1, 8, 0))
+    with open(log.log_path, 'ab') as f:
+        f.write(b'\x01\x02\x03')  # 기록 도중 종료
+
+    log = AdherenceLog(base)
+    log.record('약B', MISSED, datetime(2026, 10, 1, 20, 0))
+    records = log.all_records()
+    assert len(records) * RECORD_DTYPE.itemsize == os.path.getsize(log.log_path)
+    assert [log.names[med] for med in records['med']] == ['약A', '약B']
+    assert records['event'].tolist() == [TAKEN, MISSED]
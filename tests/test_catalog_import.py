@@ -0,0 +1,97 @@
+import csv
+import os
+
+from catalog_cache import load_catalog
+from fuzzy import FuzzyIndex
+from interactions import InteractionIndex
+from search_index import SearchIndex
+
+
+HEADER = ['Product Name', 'Main Ingredient', 'Effectiveness', 'Medications to Avoid']
+
+
+def write_catalog(path, rows, mtime):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def record_calls(monkeypatch, cls, name):
+    """cls.name 호출의 첫 인자(doc id 등)를 기록한다"""
+    calls = []
+    original = getattr(cls, name)
+
+    def wrapper(self, *args, **kwargs):
+        calls.append(args[0] if args else None)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(cls, name, wrapper)
+    return calls
+
+
+def test_reload_reuses_unchanged_rows_by_row_hash(tmp_path, monkeypatch):
+    path = str(tmp_path / 'medications.csv')
+    write_catalog(path, [
+        ['가해시정', '와파린', '혈전 예방', None],
+        ['나해시정', '아스피린', '해열', '와파린과 함께 복용 금지'],
+        ['다해시정', '아스피린', '진통', None],
+    ], 1)
+    first = load_catalog(path)
+    first.details.close()
+    ids = dict(zip(first.frame['Product Name'], first.frame.index))
+
+    added = record_calls(monkeypatch, SearchIndex, 'add')
+    profiled = record_calls(monkeypatch, InteractionIndex, 'add_product')
+    fuzzy_builds = record_calls(monkeypatch, FuzzyIndex, 'build')
+
+    # 나해시정만 내용이 바뀌고, 다해시정은 빠지고, 라해시정이 새로 생긴다
+    write_catalog(path, [
+        ['가해시정', '와파린', '혈전 예방', None],
+        ['나해시정', '아스피린', '두통', '와파린과 함께 복용 금지'],
+        ['라해시정', '와파린', '항응고', None],
+    ], 2)
+    catalog = load_catalog(path)
+    try:
+        reloaded = dict(zip(catalog.frame['Product Name'], catalog.frame.index))
+        assert reloaded['가해시정'] == ids['가해시정']
+        assert reloaded['나해시정'] == ids['나해시정']
+        assert reloaded['라해시정'] not in ids.values()
+
+        # 바뀌었거나 새로 생긴 행만 검색 텍스트와 상호작용을 다시 계산한다
+        assert sorted(added) == sorted([ids['나해시정'], reloaded['라해시정']])
+        assert sorted(profiled) == sorted([ids['나해시정'], reloaded['라해시정']])
+        # 제품명이 바뀌었으므로 오타 허용 색인은 다시 만든다
+        assert len(fuzzy_builds) == 1
+
+        def names(query):
+            return catalog.frame.loc[catalog.index.search(query), 'Product Name'].tolist()
+
+        assert names('두통') == ['나해시정']
+        assert names('해열') == []
+        assert names('진통') == []
+        assert names('혈전') == ['가해시정']
+
+        warfarin = catalog.interactions.vocabulary['와파린']
+        assert catalog.interactions.product_avoids[reloaded['나해시정']] == (warfarin,)
+        assert catalog.interactions.ingredient_products[warfarin] == (reloaded['가해시정'],
+                                                                      reloaded['라해시정'])
+    finally:
+        catalog.details.close()
+
+    # 제품명과 순서가 그대로면 오타 허용 색인도 다시 쓴다
+    del added[:], profiled[:], fuzzy_builds[:]
+    write_catalog(path, [
+        ['가해시정', '와파린', '혈전 예방', None],
+        ['나해시정', '아스피린', '두통 완화', '와파린과 함께 복용 금지'],
+        ['라해시정', '와파린', '항응고', None],
+    ], 3)
+    catalog = load_catalog(path)
+    try:
+        assert added == [reloaded['나해시정']]
+        assert profiled == [reloaded['나해시정']]
+        assert fuzzy_builds == []
+        assert catalog.fuzzy.search('라해시정')[0] == reloaded['라해시정']
+    finally:
+        catalog.details.close()
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from column_store import HeavyColumnStore
+
+
+def test_write_rows_keeps_non_text_values_and_marks_missing(tmp_path):
+    path = str(tmp_path / 'catalog.heavy.bin')
+    rows = [(10, ('하루 2회', 3, None)),
+            (7, (float('nan'), datetime(2026, 10, 1), '실온 보관'))]
+    store = HeavyColumnStore.write_rows(path, ['How to Take It', 'Warnings', 'Storage Instructions'],
+                                        iter(rows))
+    try:
+        assert store.is_valid()
+        assert store.fetch(10) == {'How to Take It': '하루 2회', 'Warnings': '3',
+                                   'Storage Instructions': None}
+        assert store.fetch(7) == {'How to Take It': None, 'Warnings': '2026-10-01 00:00:00',
+                                  'Storage Instructions': '실온 보관'}
+        frame = store.frame(['Storage Instructions', 'Precautions'])
+        assert frame.index.tolist() == [10, 7]
+        assert frame['Storage Instructions'].isna().tolist() == [True, False]
+        assert frame.loc[7, 'Storage Instructions'] == '실온 보관'
+        assert frame['Precautions'].isna().all()
+    finally:
+        store.close()
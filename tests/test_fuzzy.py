@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from fuzzy import FuzzyIndex
+from search_index import SearchCancelled
+
+
+NAMES = ['어린이타이레놀현탁액', '타이레놀정500밀리그램', '타이레놀정', '타이래놀', '게보린정', '부루펜정']
+
+
+def search(index, query):
+    return [NAMES[doc_id - 11] for doc_id in index.search(query)]
+
+
+def make_index():
+    return FuzzyIndex.build(pd.DataFrame({'Product Name': NAMES}, index=range(11, 17)))
+
+
+def test_results_rank_by_distance_then_position_then_length():
+    index = make_index()
+    # 정확히 일치하는 이름이 먼저, 그중 앞쪽에서 일치하는 이름, 같으면 짧은 이름; 한 글자 오타는 마지막
+    expected = ['타이레놀정', '타이레놀정500밀리그램', '어린이타이레놀현탁액', '타이래놀']
+    assert search(index, '타이레놀') == expected
+    # 띄어쓰기는 무시한다
+    assert search(index, '타이 레놀') == expected
+    # 오타로 검색하면 그 오타와 같은 이름이 먼저 온다
+    assert search(index, '타이래놀')[0] == '타이래놀'
+    assert search(index, '개보린') == ['게보린정']
+
+
+def test_initials_rank_by_position_then_length():
+    index = make_index()
+    assert search(index, 'ㅌㅇㄹㄴ') == ['타이래놀', '타이레놀정', '타이레놀정500밀리그램', '어린이타이레놀현탁액']
+    assert search(index, 'ㄱㅂㄹ') == ['게보린정']
+    assert search(index, '') == NAMES
+
+
+def test_search_stops_when_cancelled():
+    with pytest.raises(SearchCancelled):
+        make_index().search('타이레놀', cancelled=lambda: True)
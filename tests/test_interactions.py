@@ -0,0 +1,44 @@
+import pandas as pd
+
+from interactions import InteractionIndex, MedicationInteractions
+
+
+def make_frame():
+    return pd.DataFrame({
+        'Product Name': ['와파린정', '아스피린정', '철분정', '복합정'],
+        'Main Ingredient': ['와파린', '아스피린', '철분', '아스피린, 철분'],
+        'Medications to Avoid': ['아스피린과 함께 복용하지 마세요', None, '철분식품은 괜찮습니다', '와파린'],
+    }, index=[10, 20, 30, 40])
+
+
+def test_avoid_text_matches_ingredients_by_word_prefix():
+    index = InteractionIndex.build(make_frame())
+    warfarin, aspirin, iron = (index.vocabulary[name] for name in ('와파린', '아스피린', '철분'))
+
+    assert index.profile_of(10) == ((warfarin,), (aspirin,))
+    assert index.profile_of(40) == (tuple(sorted((aspirin, iron))), (warfarin,))
+    # 짧은 성분명은 조사/접미사가 붙을 때만 일치한다 ('철분식품'은 아님)
+    assert index.profile_of(30) == ((iron,), ())
+    assert index.avoided_in('철분제 복용 중에는 피하세요') == (iron,)
+
+    # 성분 -> 제품 색인은 카탈로그 순서를 따른다
+    assert index.ingredient_products[aspirin] == (20, 40)
+
+    # 카탈로그에 없는 약은 문장에서 바로 계산한다
+    assert index.profile_of(None, '와파린', '아스피린을 피하세요') == ((warfarin,), (aspirin,))
+
+
+def test_medication_conflicts_follow_adds_and_removes():
+    index = InteractionIndex.build(make_frame())
+    taking = MedicationInteractions(index)
+    taking.add('와파린정', *index.profile_of(10))
+    taking.add('철분정', *index.profile_of(30))
+
+    # 새 약이 피하라는 성분이 든 약, 새 약의 성분을 피하라는 약을 모두 찾는다
+    assert taking.conflicts(*index.profile_of(20)) == {'와파린정': ['아스피린']}
+    assert taking.conflicts(*index.profile_of(40)) == {'와파린정': ['와파린', '아스피린']}
+
+    taking.remove('와파린정')
+    assert taking.conflicts(*index.profile_of(40)) == {}
+    assert taking.holders == {index.vocabulary['철분']: {'철분정'}}
+    assert taking.avoiders == {}
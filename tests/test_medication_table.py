@@ -0,0 +1,86 @@
+import pandas as pd
+
+from medication_table import MedicationTable, compact_catalog
+
+COLUMNS = ['Product Name', 'Company Name', 'Notification Time', 'Notifications_Enabled',
+           'Taking_Condition']
+
+
+def medication(name, company='제약A', time=None, enabled=True, condition=None):
+    return {'Product Name': name, 'Company Name': company, 'Notification Time': time,
+            'Notifications_Enabled': enabled, 'Taking_Condition': condition}
+
+
+def test_appends_grow_buffers_and_keep_typed_columns():
+    table = MedicationTable(COLUMNS)
+    for number in range(40):  # 처음 용량(16)을 두 번 넘긴다
+        assert table.append(medication(f'약{number}', company=f'제약{number % 3}',
+                                       enabled=number % 2 == 0, condition='식후')) == number
+    frame = table.frame
+    assert len(frame) == 40
+    assert frame['Product Name'].tolist() == [f'약{number}' for number in range(40)]
+    assert isinstance(frame['Company Name'].dtype, pd.CategoricalDtype)
+    assert frame['Notifications_Enabled'].dtype == bool
+    assert frame['Notifications_Enabled'].tolist() == [number % 2 == 0 for number in range(40)]
+    assert table.row(39)['Company Name'] == '제약0'
+    assert table.row(39)['Taking_Condition'] == '식후'
+
+
+def test_update_and_delete_change_rows_in_place():
+    table = MedicationTable.from_frame(pd.DataFrame([medication('약A'), medication('약B'),
+                                                     medication('약C')]), COLUMNS)
+    assert table.update('약B', {'Notification Time': '08:00', 'Taking_Condition': '공복'}).tolist() == [1]
+    assert table.row(1)['Notification Time'] == '08:00'
+    assert table.row(1)['Taking_Condition'] == '공복'
+
+    # 지운 행 뒤의 행은 앞으로 당겨지고 새 행은 끝에 붙는다
+    assert table.delete('약A').tolist() == [0]
+    table.append(medication('약D', company=None))
+    frame = table.frame
+    assert frame['Product Name'].tolist() == ['약B', '약C', '약D']
+    assert frame['Notification Time'].tolist() == ['08:00', None, None]
+    assert frame['Company Name'].isna().tolist() == [False, False, True]
+
+
+def test_compact_catalog_turns_repeated_text_into_categories():
+    catalog = pd.DataFrame({'Product Name': [f'약{number}' for number in range(10)],
+                            'Company Name': ['제약A', '제약B'] * 5})
+    compact = compact_catalog(catalog)
+    assert not isinstance(compact['Product Name'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact['Company Name'].dtype, pd.CategoricalDtype)
+    assert compact['Company Name'].tolist() == catalog['Company Name'].tolist()
+
+
+def test_name_index_follows_deletes_and_renames():
+    table = MedicationTable(COLUMNS)
+    for name in ('약A', '약B', '약 C', '약D'):
+        table.append(medication(name))
+
+    # 공백/대소문자만 다른 이름도 같은 약으로 보지만, 행은 정확히 같은 이름만 돌려준다
+    assert table.contains('약  c')
+    assert table.rows_of('약 C').tolist() == [2]
+    assert table.rows_of('약  c').tolist() == []
+
+    table.delete('약A')
+    assert not table.contains('약A')
+    assert [table.rows_of(name).tolist() for name in ('약B', '약 C', '약D')] == [[0], [1], [2]]
+
+    table.update('약D', {'Product Name': '약E'})
+    assert not table.contains('약D')
+    assert table.rows_of('약E').tolist() == [2]
+    assert table.positions == {key: [row] for row, key in enumerate(['약b', '약 c', '약e'])}
+
+
+def test_index_matches_a_full_scan_after_mixed_changes():
+    table = MedicationTable(COLUMNS)
+    names = []
+    for step in range(60):
+        name = f'약{step % 17}'
+        if step % 5 == 4 and names:
+            table.delete(names.pop(step % len(names)))
+        elif name not in names:
+            table.append(medication(name))
+            names.append(name)
+    assert table.frame['Product Name'].tolist() == names
+    for row, name in enumerate(names):
+        assert table.rows_of(name).tolist() == [row]
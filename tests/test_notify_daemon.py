@@ -0,0 +1,77 @@
+import errno
+import os
+import socket
+import stat
+import time
+
+import pytest
+
+import notify_daemon
+
+
+class FakeDaemon:
+    def __init__(self):
+        self.reloads = 0
+
+    def request_reload(self):
+        self.reloads += 1
+
+
+REMINDER = {'type': 'reminder', 'due_at': '2026-10-01T08:00:00', 'medications': []}
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.mark.skipif(not notify_daemon.HAS_UNIX_SOCKETS, reason="AF_UNIX 없음")
+def test_unix_socket_is_private_and_second_daemon_is_refused(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sink = notify_daemon.SocketSink(FakeDaemon())
+    try:
+        assert stat.S_IMODE(os.stat(notify_daemon.SOCKET_PATH).st_mode) == 0o600
+        with pytest.raises(OSError) as raised:
+            notify_daemon.SocketSink(FakeDaemon())
+        assert raised.value.errno == errno.EADDRINUSE
+    finally:
+        sink.close()
+    assert not os.path.exists(notify_daemon.SOCKET_PATH)
+
+
+def test_tcp_socket_only_serves_clients_with_token(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(notify_daemon, 'HAS_UNIX_SOCKETS', False)
+    owner = FakeDaemon()
+    sink = notify_daemon.SocketSink(owner, port=0)
+    stranger = None
+    try:
+        client = notify_daemon.DaemonClient.connect()
+        assert client is not None
+        stranger = socket.create_connection(('127.0.0.1', sink.server.getsockname()[1]))
+        stranger.sendall(b'guess\nreload\n')
+        assert wait_for(lambda: len(sink.clients) == 1)
+        # 토큰이 틀린 연결은 끊기고 'reload'도 무시된다
+        assert stranger.recv(100) == b''
+
+        sink.deliver(REMINDER)
+        client.request_reload()
+        assert wait_for(lambda: client.reminders.qsize() == 1 and owner.reloads == 1)
+        client.close()
+    finally:
+        if stranger is not None:
+            stranger.close()
+        sink.close()
+    assert not os.path.exists(notify_daemon.TOKEN_PATH)
+
+
+def test_bad_sink_is_reported_as_usage_error(capsys):
+    with pytest.raises(SystemExit) as exited:
+        notify_daemon.main(['--sink', 'mail:me'])
+    assert exited.value.code == 2
+    assert '알 수 없는 알림 출력' in capsys.readouterr().err
+    assert notify_daemon.parse_sink('socket:47700') == ('socket', 47700)
+    with pytest.raises(ValueError):
+        notify_daemon.parse_sink('socket:abc')
@@ -0,0 +1,62 @@
+import time
+from datetime import datetime
+
+from adherence import TAKEN
+from profiles import ProfileRegistry
+
+
+def test_evicted_profile_shares_adherence_log_with_reloaded_one(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = ProfileRegistry(columns=['Product Name'])
+    profile_id = registry.add_profile({'name': '둘째'})
+
+    # 알림 창이 들고 있는 프로필이 내려간 뒤 다시 읽혀도 같은 복용 기록을 쓴다
+    held = registry.get(profile_id)
+    assert registry.evict_idle(now=held.last_used + registry.IDLE_SECONDS) == [profile_id]
+    reloaded = registry.get(profile_id)
+    assert reloaded is not held
+    assert reloaded.adherence is held.adherence
+
+    due_at = datetime(2026, 10, 1, 8, 0)
+    held.adherence.record('약A', TAKEN, due_at)
+    reloaded.adherence.record('약B', TAKEN, due_at)
+    assert reloaded.adherence.names == ['약A', '약B']
+    registry.close()
+
+
+def test_evict_keeps_profile_whose_pending_write_failed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = ProfileRegistry(columns=['Product Name'])
+    profile_id = registry.add_profile({'name': '둘째'})
+    profile = registry.get(profile_id)
+    writer = profile.store
+    writer.RETRY_SECONDS = 0.01
+
+    write_batch = writer.store.write_batch
+    failures = []
+
+    def failing_write(batch):
+        failures.append(batch)
+        raise OSError("디스크 가득 참")
+
+    writer.store.write_batch = failing_write
+    writer.add({'Product Name': '약A'})
+    idle_at = profile.last_used + registry.IDLE_SECONDS
+    try:
+        registry.evict_idle(now=idle_at)
+    except OSError:
+        pass
+    else:
+        raise AssertionError("쓰기 실패가 전달되지 않음")
+    # 저장하지 못한 변경이 있는 프로필은 그대로 남아 있다
+    assert registry.loaded[profile_id] is profile
+
+    # 저장소가 다시 쓸 수 있게 되면 쓰기 스레드의 재시도가 성공하고 다음 확인 때 내려간다
+    writer.store.write_batch = write_batch
+    deadline = time.monotonic() + 2
+    while (writer.error is not None or writer.pending) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.evict_idle(now=idle_at) == [profile_id]
+    assert profile_id not in registry.loaded
+    assert '약A' in registry.get(profile_id).medications.frame['Product Name'].tolist()
+    registry.close()
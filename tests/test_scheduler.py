@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from recurrence import Recurrence
+from scheduler import DoseScheduler
+
+
+def test_pop_due_catches_up_every_missed_time():
+    recurrence = Recurrence.parse('08:00, 12:00, 16:00')
+    scheduler = DoseScheduler()
+    scheduler.schedule('약', recurrence, datetime(2026, 10, 1, 7, 0))
+
+    # 07:00부터 17:00까지 이벤트 루프가 멈춘 경우
+    due = scheduler.pop_due(datetime(2026, 10, 1, 17, 0))
+
+    assert [fire_at.hour for _, fire_at in due] == [8, 12, 16]
+    assert scheduler.next_fire_time() == datetime(2026, 10, 2, 8, 0)
+
+
+def test_pop_due_skips_times_older_than_catch_up_window():
+    recurrence = Recurrence.parse('08:00, 20:00')
+    scheduler = DoseScheduler()
+    scheduler.schedule('약', recurrence, datetime(2026, 10, 1, 7, 0))
+
+    now = datetime(2026, 10, 4, 9, 0)
+    due = scheduler.pop_due(now)
+
+    assert [fire_at for _, fire_at in due] == [datetime(2026, 10, 3, 20, 0),
+                                               datetime(2026, 10, 4, 8, 0)]
+    assert all(now - fire_at <= DoseScheduler.CATCH_UP for _, fire_at in due)
+    assert scheduler.next_fire_time() == datetime(2026, 10, 4, 20, 0)
+
+
+def test_pop_due_returns_nothing_before_first_time():
+    scheduler = DoseScheduler()
+    scheduler.schedule('약', Recurrence.parse('08:00'), datetime(2026, 10, 1, 7, 0))
+
+    assert scheduler.pop_due(datetime(2026, 10, 1, 7, 59)) == []
+    assert scheduler.next_fire_time() == datetime(2026, 10, 1, 8, 0)
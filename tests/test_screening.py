@@ -0,0 +1,53 @@
+import pandas as pd
+
+from screening import ScreeningTable, load_screening, note_terms
+
+
+def make_frame():
+    return pd.DataFrame({
+        'Precautions': ['페니실린 과민증 환자는 주의', None],
+        'Warnings': [None, '천식 환자에게 발작을 일으킬 수 있음'],
+        'Major Side Effects': ['두드러기', '두통'],
+    }, index=[7, 8])
+
+
+def test_note_terms_drop_particles_stop_words_and_sentence_endings():
+    notes = '페니실린에 알레르기가 있습니다. 천식 환자, 두드러기'
+    assert note_terms(notes) == ('두드러기', '천식', '페니실린')
+    assert note_terms('') == ()
+
+
+def test_table_maps_matches_to_their_rows():
+    table = ScreeningTable.build(make_frame(), ('두드러기', '천식', '페니실린'), 'v1')
+    assert table.get(7) == ('두드러기', '페니실린')
+    assert table.get(8) == ('천식',)
+    assert table.key == ('v1', ('두드러기', '천식', '페니실린'))
+
+    # 앞 행의 끝과 다음 행의 시작에 걸친 글자('천' + '식사')는 일치로 치지 않는다
+    spanning = pd.DataFrame({'Precautions': ['밤에 천', '식사 후 복용']}, index=[1, 2])
+    assert ScreeningTable.build(spanning, ('천식',), 'v1').matches == {}
+
+
+def test_load_screening_rebuilds_only_when_notes_or_catalogue_change(tmp_path):
+    cache_path = str(tmp_path / 'screening.cache.pkl')
+    loads = []
+
+    def load_frame(columns):
+        loads.append(columns)
+        return make_frame()[list(columns)]
+
+    first = load_screening(cache_path, load_frame, '천식 있음', 'v1')
+    assert first.get(8) == ('천식',)
+    assert len(loads) == 1
+
+    # 같은 검사 단어면 (메모 문장이 달라도) 캐시를 쓴다
+    cached = load_screening(cache_path, load_frame, '천식이 있습니다', 'v1')
+    assert cached.matches == first.matches
+    assert len(loads) == 1
+
+    load_screening(cache_path, load_frame, '천식 있음', 'v2')
+    assert len(loads) == 2
+    changed = load_screening(cache_path, load_frame, '두통', 'v2')
+    assert len(loads) == 3
+    assert changed.get(8) == ('두통',)
+    assert changed.get(7) == ()
@@ -0,0 +1,30 @@
+import csv
+import os
+
+from catalog_cache import load_catalog
+
+
+def write_catalog(path, names):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Product Name', 'Main Ingredient', 'Effectiveness'])
+        for name in names:
+            writer.writerow([name, '성분', '효능'])
+
+
+def test_search_keeps_catalogue_order_after_mid_catalogue_insert(tmp_path):
+    path = str(tmp_path / 'medications.csv')
+    write_catalog(path, ['가삽입정', '나삽입정', '다삽입정'])
+    load_catalog(path).details.close()
+
+    # 다시 읽으면 새 제품은 가장 큰 doc id를 받지만 검색 결과는 카탈로그 순서를 따른다
+    write_catalog(path, ['가삽입정', '새삽입정', '나삽입정', '다삽입정'])
+    os.utime(path, ns=(1, 1))
+    catalog = load_catalog(path)
+    try:
+        assert catalog.frame.loc[catalog.index.search('새삽입'), 'Product Name'].tolist() == ['새삽입정']
+        for query in ('삽입', '삽', ''):
+            names = catalog.frame.loc[catalog.index.search(query), 'Product Name'].tolist()
+            assert names == ['가삽입정', '새삽입정', '나삽입정', '다삽입정']
+    finally:
+        catalog.details.close()
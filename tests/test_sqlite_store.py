@@ -0,0 +1,82 @@
+import pandas as pd
+
+import catalog_cache
+from sqlite_store import SQLiteStore, migrate_from_files
+
+
+def write_catalog(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Product Name,Main Ingredient,Effectiveness,How to Take It\n')
+        for row in rows:
+            f.write(','.join(row) + '\n')
+
+
+def test_migrate_closes_catalogue_text_file(tmp_path, monkeypatch):
+    catalog_path = str(tmp_path / 'medications.csv')
+    write_catalog(catalog_path, [('타이레놀정', '아세트아미노펜', '해열', '하루 3회')])
+    loaded = []
+    original = catalog_cache.load_catalog
+
+    def load_catalog(path):
+        loaded.append(original(path))
+        return loaded[-1]
+
+    monkeypatch.setattr(catalog_cache, 'load_catalog', load_catalog)
+    catalog_rows, counts = migrate_from_files(str(tmp_path / 'medinote.db'), catalog_path,
+                                              profiles=[], columns=['Product Name'])
+    assert (catalog_rows, counts) == (1, {})
+    # 긴 텍스트를 읽느라 연 메모리 맵은 옮긴 뒤 닫혀 있다
+    assert loaded[0].details.data is None
+
+    store = SQLiteStore(str(tmp_path / 'medinote.db'))
+    try:
+        doc_id, = store.catalog_search().search('타이레놀')
+        assert store.catalog_details().fetch(doc_id)['How to Take It'] == '하루 3회'
+    finally:
+        store.close()
+
+
+def catalog_store(tmp_path, names):
+    store = SQLiteStore(str(tmp_path / 'medinote.db'))
+    store.replace_catalog(pd.DataFrame({'Product Name': names,
+                                        'Main Ingredient': ['아세트아미노펜'] * len(names),
+                                        'Effectiveness': ['해열'] * len(names)}))
+    return store
+
+
+def test_catalog_search_matches_substrings_in_catalogue_order(tmp_path):
+    store = catalog_store(tmp_path, ['타이레놀정500', '게보린정', '어린이타이레놀현탁액'])
+    try:
+        frame = store.load_catalog()
+        search = store.catalog_search()
+        # 3글자 이상은 FTS(trigram), 짧은 검색어와 FTS가 없는 SQLite는 직접 비교로 찾는다
+        for use_fts in (store.use_fts, False):
+            store.use_fts = use_fts
+            for query in ('타이레놀', '타이', '이레'):
+                assert frame.loc[search.search(query), 'Product Name'].tolist() == [
+                    '타이레놀정500', '어린이타이레놀현탁액']
+            assert len(search.search('아세트아미노펜')) == 3
+            assert search.search('없는약') == []
+            assert len(search.search('')) == 3
+    finally:
+        store.close()
+
+
+def test_write_batch_applies_operations_per_profile(tmp_path):
+    path = str(tmp_path / 'medinote.db')
+    columns = ['Product Name', 'Notification Time']
+    first, second = SQLiteStore(path, 'default'), SQLiteStore(path, 'p1')
+    try:
+        first.load(columns)
+        second.load(columns)
+        first.write_batch([('add', '약A', {'Product Name': '약A', 'Notification Time': None}),
+                           ('add', '약B', {'Product Name': '약B'}),
+                           ('update', '약A', {'Notification Time': '08:00'}),
+                           ('delete', '약B', None)])
+        second.add({'Product Name': '약A', 'Notification Time': '21:00'})
+
+        assert first.load(columns).values.tolist() == [['약A', '08:00']]
+        assert second.load(columns).values.tolist() == [['약A', '21:00']]
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'medinote')
+
+
+def test_import_does_not_load_pandas_or_numpy():
+    # 창을 먼저 띄우기 위해 pandas/numpy는 시작할 때 읽지 않는다
+    code = ("import sys, medinote; "
+            "print(sorted(name for name in ('pandas', 'numpy') if name in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    assert output.strip() == '[]'
+
+
+def test_module_entry_point_resolves_paths_from_invoking_directory(tmp_path):
+    (tmp_path / 'small.csv').write_text('Product Name,Main Ingredient\n가정,아세트아미노펜\n',
+                                        encoding='utf-8')
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(APP_DIR))
+    # python -m medinote는 앱 폴더에서 실행되지만 ./small.csv는 실행한 위치의 파일이다
+    result = subprocess.run([sys.executable, '-m', 'medinote', 'import-catalog', '--catalog', './small.csv'],
+                            cwd=tmp_path, env=env, check=True, capture_output=True, text=True)
+    assert '약물 1건' in result.stdout
+    assert (tmp_path / 'small.cache.pkl').exists()
@@ -0,0 +1,134 @@
+import json
+import os
+import time
+
+import pytest
+
+from storage import BackgroundWriter, JournalStore
+
+COLUMNS = ['Product Name', 'Notification Time']
+
+
+def open_store(tmp_path, **kwargs):
+    store = JournalStore(str(tmp_path / 'my_medications'), str(tmp_path / 'legacy.xlsx'), **kwargs)
+    return store, store.load(COLUMNS)
+
+
+def names_and_times(frame):
+    return list(zip(frame['Product Name'], frame['Notification Time']))
+
+
+def test_journal_replays_changes_after_reopen(tmp_path):
+    store, frame = open_store(tmp_path)
+    assert frame.empty
+    store.add({'Product Name': '약A', 'Notification Time': '08:00'})
+    store.add({'Product Name': '약B', 'Notification Time': None})
+    store.update('약A', {'Notification Time': '09:00'})
+    store.delete('약B')
+    store.close()
+
+    store, frame = open_store(tmp_path)
+    assert names_and_times(frame) == [('약A', '09:00')]
+    store.close()
+
+
+def test_torn_last_line_is_dropped_and_later_writes_survive(tmp_path):
+    store, _ = open_store(tmp_path)
+    store.add({'Product Name': '약A', 'Notification Time': '08:00'})
+    store.close()
+    with open(store.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "row": {"Product Na')  # 기록 도중 종료
+
+    store, frame = open_store(tmp_path)
+    assert names_and_times(frame) == [('약A', '08:00')]
+    store.add({'Product Name': '약C', 'Notification Time': '20:00'})
+    store.close()
+
+    store, frame = open_store(tmp_path)
+    assert names_and_times(frame) == [('약A', '08:00'), ('약C', '20:00')]
+    store.close()
+
+
+def test_compaction_moves_journal_into_snapshot(tmp_path):
+    store, _ = open_store(tmp_path)
+    store.COMPACT_THRESHOLD = 5
+    for number in range(6):
+        store.add({'Product Name': f'약{number}', 'Notification Time': '08:00'})
+    store.update('약0', {'Notification Time': '07:00'})
+    store.close()  # 백그라운드 압축이 끝날 때까지 기다린다
+
+    with open(store.snapshot_path, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    with open(store.journal_path, 'r', encoding='utf-8') as f:
+        journal = [json.loads(line) for line in f]
+    # 스냅샷에 반영된 기록은 저널에서 빠지고 그 뒤의 기록만 남는다
+    assert len(snapshot['rows']) >= 5
+    assert all(record['seq'] > snapshot['seq'] for record in journal)
+    assert len(journal) < 7
+
+    store, frame = open_store(tmp_path)
+    assert len(frame) == 6
+    assert frame.loc[frame['Product Name'] == '약0', 'Notification Time'].item() == '07:00'
+    store.close()
+
+
+def test_read_only_store_does_not_touch_files(tmp_path):
+    store, _ = open_store(tmp_path, read_only=True)
+    store.close()
+    assert not os.path.exists(store.journal_path)
+    assert not os.path.exists(store.snapshot_path)
+
+
+class RecordingStore:
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+
+    def write_batch(self, operations):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("쓰기 실패")
+        self.batches.append(operations)
+
+    def close(self):
+        pass
+
+
+def test_background_writer_merges_pending_changes_into_one_batch():
+    store = RecordingStore()
+    writer = BackgroundWriter(store)
+    writer.WINDOW_SECONDS = 5  # flush()가 기다리지 않고 바로 쓰게 한다
+    writer.add({'Product Name': '약A', 'Notification Time': None})
+    writer.update('약A', {'Notification Time': '08:00'})
+    writer.update('약B', {'Notification Time': '09:00'})
+    writer.update('약B', {'Taking_Condition': '식후'})
+    writer.update('약C', {'Notification Time': '10:00'})
+    writer.delete('약C')
+    writer.close()
+
+    # 쓰지 않은 추가/수정은 하나로 합치고, 지울 약의 수정은 버린다
+    assert store.batches == [[
+        ('add', '약A', {'Product Name': '약A', 'Notification Time': '08:00'}),
+        ('update', '약B', {'Notification Time': '09:00', 'Taking_Condition': '식후'}),
+        ('delete', '약C', None),
+    ]]
+
+
+def test_background_writer_retries_failed_batch():
+    store = RecordingStore(failures=1)
+    flushed = []
+    writer = BackgroundWriter(store, on_flush=lambda: flushed.append(True))
+    writer.RETRY_SECONDS = 0.01
+    writer.add({'Product Name': '약A'})
+    with pytest.raises(OSError):
+        writer.flush()
+
+    # 실패한 변경은 새 변경보다 앞에 다시 넣고 재시도한다
+    writer.add({'Product Name': '약B'})
+    deadline = time.monotonic() + 2
+    while (writer.pending or writer.writing or writer.error is not None) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    written = [product_name for batch in store.batches for _, product_name, _ in batch]
+    assert written == ['약A', '약B']
+    assert flushed